@@ -0,0 +1,126 @@
+"""
+Routes for user registration, login and the public institute list.
+"""
+from datetime import datetime, timedelta
+
+import jwt
+from flask import Blueprint, current_app, jsonify, request
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from db_utils import get_db_connection
+
+auth_bp = Blueprint('auth', __name__)
+
+# --- User Management Routes ---
+
+@auth_bp.route('/register', methods=['POST'])
+def register():
+    db_conn = None
+    cursor = None
+    try:
+        data = request.get_json()
+        full_name = data.get('fullName')
+        username = data.get('username')
+        email = data.get('email')
+        institution_code = data.get('institution_code')
+        password = data.get('password')
+
+        # New users default to 'Staff' role for security. Admin roles should be granted manually.
+        role = 'Staff'
+
+        if not all([full_name, username, email, role, password, institution_code]):
+            return jsonify({'error': 'All fields are required.'}), 400
+
+        db_conn = get_db_connection()
+        cursor = db_conn.cursor(dictionary=True)
+
+        cursor.execute("SELECT * FROM users WHERE email = %s OR username = %s", (email, username))
+        if cursor.fetchone():
+            return jsonify({'error': 'A user with this email or username already exists.'}), 409
+
+        hashed_password = generate_password_hash(password)
+        
+        insert_query = """
+            INSERT INTO users (full_name, username, email, role, password_hash, institution_code)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        """
+        cursor.execute(insert_query, (full_name, username, email, role, hashed_password, institution_code))
+        db_conn.commit()
+
+        return jsonify({'message': 'Registration successful. You can now log in.'}), 201
+
+    except Exception as e:
+        print(f"Registration Error: {e}")
+        return jsonify({'error': 'An internal server error occurred during registration.'}), 500
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+@auth_bp.route('/login', methods=['POST'])
+def login():
+    db_conn = None
+    cursor = None
+    try:
+        data = request.get_json()
+        email = data.get('email')
+        password = data.get('password')
+
+        if not email or not password:
+            return jsonify({'error': 'Email and password are required.'}), 400
+        
+        db_conn = get_db_connection()
+        cursor = db_conn.cursor(dictionary=True)
+
+        cursor.execute("SELECT * FROM users WHERE email = %s", (email,))
+        user = cursor.fetchone()
+
+        if not user or not check_password_hash(user['password_hash'], password):
+            return jsonify({'error': 'Invalid credentials. Please try again.'}), 401
+
+        # Update last_login timestamp
+        update_query = "UPDATE users SET last_login = %s WHERE id = %s"
+        cursor.execute(update_query, (datetime.utcnow(), user['id']))
+        db_conn.commit()
+
+        # Generate JWT token
+        token = jwt.encode({
+            'user_id': user['id'],
+            'username': user['username'],
+            'full_name': user['full_name'],
+            'role': user['role'],
+            'institution_code': user.get('institution_code'),
+            'exp': datetime.utcnow() + timedelta(days=1) # Session expires in 1 day
+        }, current_app.config['SECRET_KEY'], algorithm="HS256")
+        
+        return jsonify({'token': token}), 200
+
+    except Exception as e:
+        print(f"Login Error: {e}")
+        return jsonify({'error': 'An internal server error occurred during login.'}), 500
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+# --- Public Route to Get Institutions ---
+# This endpoint is now public so it can be called from the registration page
+@auth_bp.route('/institutes', methods=['GET'])
+def get_institutes():
+    db_conn = None
+    cursor = None
+    try:
+        db_conn = get_db_connection()
+        cursor = db_conn.cursor(dictionary=True)
+        
+        query = "SELECT institute_name, institution_code FROM institutions ORDER BY institute_name ASC"
+        cursor.execute(query)
+        institutes = cursor.fetchall()
+        
+        return jsonify(institutes)
+
+    except Exception as e:
+        print(f"Error fetching institutes: {e}")
+        return jsonify({'error': 'Could not fetch institute list from the database.'}), 500
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
@@ -0,0 +1,103 @@
+"""
+This module contains the authentication helpers shared by the route blueprints.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+import jwt
+from flask import current_app, g, jsonify, request
+
+import metrics_utils
+import tracing_utils
+
+# --- Verified token cache ---
+# The dashboard sends the same token on every one of its parallel API calls, so verified claims are kept in a
+# small LRU keyed by a digest of the token until the token's exp. Expired tokens are decoded again, so
+# jwt.decode still rejects them. Tokens without exp are re-verified after TOKEN_CACHE_MAX_AGE seconds.
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 1024))
+TOKEN_CACHE_MAX_AGE = 300
+
+TOKEN_CACHE_LOOKUPS = metrics_utils.counter(
+    'auth_token_cache_lookups_total', "Token verifications, by whether the claims came from the cache.", ('result',))
+
+_token_cache = OrderedDict()
+_token_cache_lock = threading.Lock()
+
+
+def _token_cache_key(token, secret):
+    # The secret is part of the key so claims verified with one key are never served for another.
+    return hashlib.sha256(f"{secret}\0{token}".encode('utf-8')).digest()
+
+
+def verify_token(token):
+    """
+    Returns the claims of a valid HS256 token, from the cache when it was verified before.
+    Raises jwt.ExpiredSignatureError / jwt.InvalidTokenError like jwt.decode.
+    """
+    secret = current_app.config['SECRET_KEY']
+    key = _token_cache_key(token, secret)
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+        if cached is not None:
+            claims, expires_at = cached
+            if expires_at > now:
+                _token_cache.move_to_end(key)
+                TOKEN_CACHE_LOOKUPS.inc(('hit',))
+                return dict(claims)
+            del _token_cache[key]
+    TOKEN_CACHE_LOOKUPS.inc(('miss',))
+
+    with tracing_utils.span('jwt_decode'):
+        claims = jwt.decode(token, secret, algorithms=["HS256"])
+
+    expires_at = claims['exp'] if isinstance(claims.get('exp'), (int, float)) else now + TOKEN_CACHE_MAX_AGE
+    with _token_cache_lock:
+        _token_cache[key] = (claims, expires_at)
+        while len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+    return dict(claims)
+
+
+def default_institution_code():
+    """Institution of the logged-in user (from the token), or None outside an authenticated request."""
+    return g.get('institution_code')
+
+
+def apply_default_institution(filters):
+    """
+    Scopes filters to the user's institution when the client did not send institution_code.
+    An explicit institution_code, including 'all', is left as it is.
+    """
+    if not filters.get('institution_code') and default_institution_code():
+        filters['institution_code'] = default_institution_code()
+    return filters
+
+
+# --- Authentication Token Decorator ---
+def token_required(f):
+    """Verifies the x-access-token header and puts the claims on g.current_user and g.institution_code."""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        token = None
+        if 'x-access-token' in request.headers:
+            token = request.headers['x-access-token']
+
+        if not token:
+            return jsonify({'message': 'Authentication token is missing!'}), 401
+
+        try:
+            data = verify_token(token)
+        except jwt.ExpiredSignatureError:
+            return jsonify({'message': 'Token has expired! Please log in again.'}), 401
+        except jwt.InvalidTokenError:
+            return jsonify({'message': 'Token is invalid!'}), 401
+
+        g.current_user = data
+        g.institution_code = data.get('institution_code')
+        return f(*args, **kwargs)
+    return decorated
@@ -0,0 +1,201 @@
+"""
+End-to-end pipeline benchmark.
+
+For each generated file size this times:
+  - read_file and process_and_validate_columns (in process)
+  - /upload and /process_upload (over HTTP against a running server and a local MySQL/MariaDB)
+  - the student and fees dashboard aggregations (in process, against the same database)
+
+Results are written to benchmarks/results/pipeline-<timestamp>.json. Pass --compare with an earlier
+result file to print the change per stage.
+
+Usage:
+    python benchmarks/datagen.py --rows 1000,10000
+    python app.py   # in another shell, with a seeded local database
+    python benchmarks/bench_pipeline.py --rows 1000,10000 --base-url http://localhost:5000
+    python benchmarks/bench_pipeline.py --rows 1000 --skip-db     # file parsing stages only
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+import uuid
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import datagen
+
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# kind -> (table_type, institution_code) as sent by the upload page
+UPLOAD_TARGETS = {
+    'students_sdcce': ('Student Details', 'SDCCE'),
+    'students_rms': ('Student Details', 'RMS'),
+    'students_vva': ('Student Details', 'VVA'),
+    'fees_sdcce': ('Fees Summary Report', 'SDCCE'),
+    'fees_vva': ('Fees Summary Report', 'VVA'),
+}
+
+
+def timed(func, repeat=1):
+    """Runs func `repeat` times and returns (last_result, [seconds...])."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def summarize(timings, rows=None):
+    summary = {'runs': len(timings), 'min_s': min(timings), 'median_s': statistics.median(timings)}
+    if rows:
+        summary['rows_per_s'] = rows / summary['median_s'] if summary['median_s'] else None
+    return summary
+
+
+# --- HTTP helpers (standard library only) ---
+def _post_multipart(url, fields, file_field, file_path):
+    boundary = uuid.uuid4().hex
+    body = bytearray()
+    for name, value in fields.items():
+        body += f"--{boundary}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n".encode()
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    body += (f"--{boundary}\r\nContent-Disposition: form-data; name=\"{file_field}\"; "
+             f"filename=\"{os.path.basename(file_path)}\"\r\nContent-Type: text/csv\r\n\r\n").encode()
+    body += content + f"\r\n--{boundary}--\r\n".encode()
+    request = urllib.request.Request(url, data=bytes(body), method='POST',
+                                     headers={'Content-Type': f'multipart/form-data; boundary={boundary}'})
+    with urllib.request.urlopen(request, timeout=3600) as response:
+        return json.loads(response.read())
+
+
+def _post_json(url, payload):
+    request = urllib.request.Request(url, data=json.dumps(payload).encode(), method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=3600) as response:
+        return json.loads(response.read())
+
+
+# --- Stages ---
+def bench_parsing(kind, path, rows, repeat):
+    from mappings import COLUMN_MAPPING
+    from upload_utils import process_and_validate_columns, read_file
+
+    mapping_key, _ = datagen.KINDS[kind]
+    column_map = COLUMN_MAPPING[mapping_key]
+
+    def read():
+        with open(path, 'rb') as f:
+            return read_file(f, os.path.basename(path), column_map)
+
+    (df, _), read_timings = timed(read, repeat)
+    _, process_timings = timed(lambda: process_and_validate_columns(df.copy(), column_map), repeat)
+    return {
+        'read_file': summarize(read_timings, rows),
+        'process_and_validate_columns': summarize(process_timings, rows),
+    }
+
+
+def bench_upload(base_url, kind, path, rows):
+    table_type, institution_code = UPLOAD_TARGETS[kind]
+    fields = {'tableType': table_type, 'institution_code': institution_code,
+              'academicYear': '2025-26', 'academicQuarter': 'Q1'}
+    upload_result, upload_timings = timed(lambda: _post_multipart(f"{base_url}/upload", fields, 'file', path))
+    payload = {'uploaded_file_id': upload_result['uploaded_file_id'], 'table_type': table_type,
+               'institution_code': institution_code}
+    process_result, process_timings = timed(lambda: _post_json(f"{base_url}/process_upload", payload))
+    return {
+        'upload_file': summarize(upload_timings, rows),
+        'process_upload': dict(summarize(process_timings, rows),
+                               processed=process_result.get('processed_count'),
+                               errors=process_result.get('error_count')),
+    }
+
+
+def bench_dashboards(repeat):
+    import dashboard_utils
+    import fees_dashboard_utils
+
+    results = {}
+    for label, filters in [('all', {}), ('SDCCE', {'institution_code': 'SDCCE'})]:
+        _, student_timings = timed(lambda: dashboard_utils.get_student_dashboard_data(dict(filters)), repeat)
+        _, fees_timings = timed(lambda: fees_dashboard_utils.get_fees_dashboard_data(dict(filters)), repeat)
+        results[f'student_dashboard[{label}]'] = summarize(student_timings)
+        results[f'fees_dashboard[{label}]'] = summarize(fees_timings)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCH_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, previous_path):
+    with open(previous_path, encoding='utf-8') as f:
+        previous = json.load(f)
+    print(f"\nChange vs {previous_path} ({previous.get('commit')}):")
+    for key, stages in current['results'].items():
+        for stage, summary in stages.items():
+            before = previous['results'].get(key, {}).get(stage)
+            if not before:
+                continue
+            change = (summary['median_s'] - before['median_s']) / before['median_s'] * 100 if before['median_s'] else 0
+            print(f"  {key:<28} {stage:<32} {before['median_s']:9.4f}s -> {summary['median_s']:9.4f}s  ({change:+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the upload pipeline and dashboard aggregations.")
+    parser.add_argument('--kind', default='all', help=f"One of: all, {', '.join(datagen.KINDS)}")
+    parser.add_argument('--rows', default='1000,10000', help="Comma-separated sizes: 1000,10000,100000,500000")
+    parser.add_argument('--data-dir', default=os.path.join(BENCH_DIR, 'data'))
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--repeat', type=int, default=3, help="Repetitions for the in-process stages.")
+    parser.add_argument('--skip-db', action='store_true', help="Only run the file parsing stages.")
+    parser.add_argument('--compare', help="Earlier result file to compare against.")
+    args = parser.parse_args(argv)
+
+    kinds = list(datagen.KINDS) if args.kind == 'all' else [args.kind]
+    results = {}
+    for rows in (int(r) for r in args.rows.split(',')):
+        for kind in kinds:
+            path = os.path.join(args.data_dir, f"{kind}_{rows}.csv")
+            if not os.path.exists(path):
+                path = datagen.write_file(kind, rows, args.data_dir)
+            key = f"{kind}@{rows}"
+            print(f"Benchmarking {key} ...")
+            results[key] = bench_parsing(kind, path, rows, args.repeat)
+            if not args.skip_db:
+                results[key].update(bench_upload(args.base_url, kind, path, rows))
+        if not args.skip_db:
+            results[f"dashboards@{rows}"] = bench_dashboards(args.repeat)
+
+    output = {
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, f"pipeline-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2)
+    print(f"Results written to {out_path}")
+
+    if args.compare:
+        compare(output, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Worker cold-start benchmark.
+
+Starts a fresh interpreter for each run, imports the app (which builds it with create_app()) and reports
+the import time, the resident memory afterwards and which heavy modules were loaded. With --first-request
+it also times a first request through the test client, which is what a newly spawned gunicorn worker pays
+before it serves traffic.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --first-request /metrics
+    python benchmarks/bench_startup.py --output benchmarks/results/startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+HEAVY_MODULES = ['pandas', 'numpy', 'xlsxwriter', 'pyarrow', 'mappings', 'validation_students', 'validation_fees']
+
+# Runs in the child interpreter; prints one JSON line.
+CHILD_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import app
+import_s = time.perf_counter() - start
+
+def rss_kb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+result = {'import_s': import_s, 'rss_kb': rss_kb(), 'loaded': [m for m in HEAVY if m in sys.modules]}
+if PATH:
+    start = time.perf_counter()
+    app.app.test_client().get(PATH)
+    result['first_request_s'] = time.perf_counter() - start
+    result['rss_after_request_kb'] = rss_kb()
+print(json.dumps(result))
+"""
+
+
+def run_once(first_request):
+    script = f"HEAVY = {HEAVY_MODULES!r}\nPATH = {first_request!r}\n" + CHILD_SCRIPT
+    output = subprocess.check_output([sys.executable, '-c', script], cwd=REPO_DIR, text=True,
+                                     stderr=subprocess.DEVNULL)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure app import time and per-worker RSS.")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--first-request', default='', help="Also time a first GET to this path, e.g. /metrics.")
+    parser.add_argument('--output', help="Write the summary to this JSON file.")
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.first_request) for _ in range(args.runs)]
+    summary = {
+        'runs': args.runs,
+        'import_median_s': statistics.median(r['import_s'] for r in runs),
+        'import_min_s': min(r['import_s'] for r in runs),
+        'rss_median_mb': statistics.median(r['rss_kb'] for r in runs) / 1024,
+        'heavy_modules_loaded': runs[-1]['loaded'],
+    }
+    if args.first_request:
+        summary['first_request_median_s'] = statistics.median(r['first_request_s'] for r in runs)
+        summary['rss_after_request_median_mb'] = statistics.median(r['rss_after_request_kb'] for r in runs) / 1024
+
+    print(f"import app:      {summary['import_median_s'] * 1000:8.1f} ms median ({summary['import_min_s'] * 1000:.1f} ms min)")
+    print(f"RSS after start: {summary['rss_median_mb']:8.1f} MB")
+    if args.first_request:
+        print(f"first request:   {summary['first_request_median_s'] * 1000:8.1f} ms ({args.first_request})")
+        print(f"RSS after it:    {summary['rss_after_request_median_mb']:8.1f} MB")
+    print(f"heavy modules loaded at start: {', '.join(summary['heavy_modules_loaded']) or 'none'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
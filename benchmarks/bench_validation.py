@@ -0,0 +1,182 @@
+"""
+Micro-benchmarks for the upload validation functions.
+
+Each benchmark runs a validator over a fixed sample of realistic values (see validation_samples.py) for
+several rounds and reports the time per call. The record validators run against a cursor that reports
+no duplicates, so only the validation work itself is measured, and only on records they accept.
+
+Usage:
+    python benchmarks/bench_validation.py                     # run and compare with the saved baseline
+    python benchmarks/bench_validation.py --save-baseline     # record a new baseline
+    python benchmarks/bench_validation.py --threshold 15       # fail when a validator is >15% slower
+    python benchmarks/bench_validation.py --profile cprofile  # write a .prof file per validator
+    python benchmarks/bench_validation.py --profile pyinstrument   # write an HTML flame view per validator
+"""
+import argparse
+import cProfile
+import json
+import os
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import datagen
+import validation_samples
+from validation_fees import _validate_and_prepare_fees_data, _validate_and_standardize_phone_number
+from validation_students import (
+    _validate_and_prepare_student_rms,
+    _validate_and_prepare_student_sdcce,
+    validate_and_clean_mobile_number,
+    validate_and_format_name,
+    validate_and_standardize_occupation,
+)
+
+BASELINE_PATH = os.path.join(BENCH_DIR, 'validation_baseline.json')
+PROFILES_DIR = os.path.join(BENCH_DIR, 'profiles')
+
+
+def _records(kind, count):
+    """
+    Records the validator accepts, with some values swapped for messy but valid ones
+    (validation_samples.dirty_record), so the benchmarks time normal validation rather than error paths.
+    Exits when the generated data itself mostly fails validation.
+    """
+    validate = datagen.record_validator(kind)
+    generated = list(datagen.generate_records(kind, count * 3, seed=11))
+    passed = sum(datagen.passes_validation(validate, record) for record in generated)
+    if passed < len(generated) * datagen.MIN_CLEAN_RATE:
+        raise SystemExit(f"Only {passed}/{len(generated)} generated {kind} rows pass validation; "
+                         f"see python benchmarks/datagen.py --check --kind {kind}")
+
+    records = []
+    for i, record in enumerate(generated):
+        record = validation_samples.dirty_record(record, seed=i)
+        if datagen.passes_validation(validate, record):
+            records.append(record)
+            if len(records) == count:
+                return records
+    raise SystemExit(f"Only {len(records)} of {count} {kind} records still pass validation after dirty_record.")
+
+
+def build_benchmarks(sample_size):
+    """Returns {name: (func, args_list)}; func is called once per args tuple in args_list."""
+    cursor = datagen.NoDuplicatesCursor()
+    names = validation_samples.sample(validation_samples.NAMES, sample_size)
+    mobiles = validation_samples.sample(validation_samples.MOBILE_NUMBERS, sample_size)
+    occupations = validation_samples.sample(validation_samples.OCCUPATIONS, sample_size)
+    record_count = max(sample_size // 10, 50)
+
+    return {
+        'validate_and_format_name': (validate_and_format_name, [(v,) for v in names]),
+        'validate_and_clean_mobile_number': (validate_and_clean_mobile_number, [(v,) for v in mobiles]),
+        'validate_and_standardize_occupation': (validate_and_standardize_occupation, [(v,) for v in occupations]),
+        '_validate_and_standardize_phone_number': (
+            _validate_and_standardize_phone_number, [(v, 'mobile_no') for v in mobiles]),
+        '_validate_and_prepare_student_sdcce': (
+            _validate_and_prepare_student_sdcce,
+            [(cursor, r, 'SDCCE', 'students_details_master') for r in _records('students_sdcce', record_count)]),
+        '_validate_and_prepare_student_rms': (
+            _validate_and_prepare_student_rms,
+            [(cursor, r, 'RMS', 'students_details_master', '2025-26', 'Q1') for r in _records('students_rms', record_count)]),
+        '_validate_and_prepare_fees_data': (
+            _validate_and_prepare_fees_data,
+            [(cursor, r, 1, 'student_fee_transactions', '2025-26', 'Q1', 'VVA') for r in _records('fees_vva', record_count)]),
+    }
+
+
+def run_benchmark(func, args_list, rounds):
+    """Returns per-call timings (nanoseconds) for each round."""
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter_ns()
+        for args in args_list:
+            func(*args)
+        per_call.append((time.perf_counter_ns() - start) / len(args_list))
+    return per_call
+
+
+def profile_benchmark(name, func, args_list, mode):
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    if mode == 'cprofile':
+        path = os.path.join(PROFILES_DIR, f"{name}.prof")
+        profiler = cProfile.Profile()
+        profiler.enable()
+        for args in args_list:
+            func(*args)
+        profiler.disable()
+        profiler.dump_stats(path)
+    else:
+        from pyinstrument import Profiler
+        path = os.path.join(PROFILES_DIR, f"{name}.html")
+        profiler = Profiler(interval=0.0001)
+        profiler.start()
+        for args in args_list:
+            func(*args)
+        profiler.stop()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(profiler.output_html())
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the upload validation functions.")
+    parser.add_argument('--sample-size', type=int, default=2000, help="Values per scalar validator.")
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--only', help="Run only benchmarks whose name contains this text.")
+    parser.add_argument('--threshold', type=float, default=10.0,
+                        help="Fail when the median is this many percent slower than the baseline.")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--profile', choices=['cprofile', 'pyinstrument'])
+    args = parser.parse_args(argv)
+
+    benchmarks = build_benchmarks(args.sample_size)
+    if args.only:
+        benchmarks = {name: b for name, b in benchmarks.items() if args.only in name}
+
+    if args.profile:
+        for name, (func, args_list) in benchmarks.items():
+            print(f"{name}: {profile_benchmark(name, func, args_list, args.profile)}")
+        return 0
+
+    results = {}
+    print(f"{'benchmark':<42} {'median':>12} {'min':>12}  calls")
+    for name, (func, args_list) in benchmarks.items():
+        timings = run_benchmark(func, args_list, args.rounds)
+        results[name] = {'median_ns': statistics.median(timings), 'min_ns': min(timings), 'calls': len(args_list)}
+        print(f"{name:<42} {results[name]['median_ns'] / 1000:>10.2f}us {results[name]['min_ns'] / 1000:>10.2f}us  {len(args_list)}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --save-baseline to create one.")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        change = (result['median_ns'] - before['median_ns']) / before['median_ns'] * 100
+        marker = 'REGRESSION' if change > args.threshold else ''
+        print(f"  {name:<42} {change:+7.1f}% {marker}")
+        if marker:
+            regressions.append(name)
+
+    if regressions:
+        print(f"\n{len(regressions)} validator(s) slower than the {args.threshold}% threshold: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
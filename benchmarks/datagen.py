@@ -0,0 +1,357 @@
+"""
+Synthetic upload files for benchmarking.
+
+Generates SDCCE/GRKCL student files, RMS/VVA student files and fee summary reports whose headers come
+from COLUMN_MAPPING, with values drawn from the sets the validators accept, so an upload of a generated
+file takes the insert path rather than the rollback path. Dates are relative to REFERENCE_DATE, so the
+output is deterministic for a given seed. --check runs the generated rows through the upload validators
+and fails when fewer than MIN_CLEAN_RATE of them pass.
+
+Usage:
+    python benchmarks/datagen.py --kind all --rows 1000,10000 --out benchmarks/data
+    python benchmarks/datagen.py --check --rows 1000
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mappings import COLUMN_MAPPING
+
+FIRST_NAMES = ['Aarav', 'Aditi', 'Akshay', 'Ananya', 'Ashwin', 'Diya', 'Gaurav', 'Isha', 'Karan', 'Kavya',
+               'Meera', 'Nikhil', 'Pooja', 'Prathamesh', 'Riya', 'Rohan', 'Sanjana', 'Shreya', 'Siddhesh',
+               'Sneha', 'Tanvi', 'Varun', 'Vedant', 'Yash', 'Joel', 'Maria', 'Fatima', 'Imran', 'Clive', 'Leona']
+LAST_NAMES = ['Naik', 'Kamat', 'Prabhu', 'Shet', 'Gaonkar', 'Desai', 'Pai', 'Sawant', 'Fernandes', 'Dias',
+              'Rodrigues', 'Khan', 'Shaikh', 'Parab', 'Borkar', 'Dessai', 'Kenkre', 'Salgaonkar', 'Lotlikar']
+CITIES = ['Margao', 'Panaji', 'Vasco', 'Ponda', 'Mapusa', 'Curchorem', 'Quepem', 'Canacona']
+# Spellings both student validators accept (SDCCE takes only these names; RMS/VVA also map 'Hindu' etc.)
+RELIGIONS = ['Hinduism', 'Christianity', 'Islam', 'HINDUISM', 'Christianity ', 'Sikhism', 'Jainism']
+BLOOD_GROUPS = ['A+', 'B+', 'O+', 'AB+', 'A-', 'O-', 'B +ve', 'O Positive']
+OCCUPATIONS = ['Business', 'Service', 'Teacher', 'Farmer', 'Housewife', 'Doctor', 'Engineer', 'Driver',
+               'Govt. Service', 'Self Employed', 'Home Maker', 'Retired', 'NA', '-']
+CATEGORIES = ['GENERAL', 'OBC', 'SC', 'ST', 'UNRESERVED', 'Other Backward Classes']
+PROGRAMMES = ['B.Com', 'BBA', 'M.Com', 'B.Voc', 'BCA', 'PGDFT']
+MOTHER_TONGUES = ['Konkani', 'Marathi', 'Hindi', 'English', 'Kannada', 'Urdu']
+XII_DIVISIONS = ['First Division', 'Second Division', 'Distinction', 'Pass Division']
+# SDCCE/GRKCL fee files have only online modes; the RMS/VVA validators also map cash and cheque.
+ONLINE_PAYMENT_MODES = ['UPI', 'Net Banking', 'Debit Card', 'RuPay Debit Card', 'Credit Card']
+PAYMENT_MODES = ONLINE_PAYMENT_MODES + ['Cash', 'Cheque']
+# VVA fee rows: branch -> courses the validator accepts for it
+VVA_BRANCH_COURSES = {
+    'Pre Primary': ['Nursery', 'Junior KG', 'Senior KG'],
+    'Primary': [str(grade) for grade in range(1, 5)],
+    'Secondary': [str(grade) for grade in range(5, 11)],
+    'Senior Secondary': ['11', '12'],
+}
+PAYMENT_OPTIONS = ['Full Payment', 'Installment']
+FEE_HEADS = ['Term 1', 'Term 2', 'Admission Fees', 'Installment 1', 'Installment 2', 'Installment 3']
+
+# Birth dates are generated relative to this date instead of today, so a seed always gives the same file.
+REFERENCE_DATE = date(2025, 6, 1)
+# Share of generated rows that must pass validation for --check to succeed
+MIN_CLEAN_RATE = 0.95
+
+KINDS = {
+    'students_sdcce': ('students_sdcce_grkcl', 'SDCCE'),
+    'students_rms': ('students_rms_vva', 'RMS'),
+    'students_vva': ('students_rms_vva', 'VVA'),
+    'fees_sdcce': ('fees', 'SDCCE'),
+    'fees_vva': ('fees', 'VVA'),
+}
+
+
+def _headers(mapping_key):
+    """Returns {db_column: header} using the first header that maps to each database column."""
+    headers = {}
+    for source_col, db_col in COLUMN_MAPPING[mapping_key].items():
+        headers.setdefault(db_col, source_col)
+    return headers
+
+
+def _name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _mobile(rng, country_code=True):
+    # The fee validators take 10 digits only; the student validators also strip a +91 prefix.
+    number = str(rng.randint(7000000000, 9999999999))
+    style = rng.random()
+    if style < 0.1 and country_code:
+        return f"+91 {number}"
+    if style < 0.15:
+        return f"{number[:5]} {number[5:]}"
+    return number
+
+
+def _birth_date(rng, min_age, max_age):
+    return REFERENCE_DATE - timedelta(days=rng.randint(min_age * 365, max_age * 365))
+
+
+def _sdcce_student(rng, seq, institution_code):
+    dob = _birth_date(rng, 17, 24)
+    paid_on = datetime(2025, 6, 1) + timedelta(minutes=rng.randint(0, 90 * 24 * 60))
+    city = rng.choice(CITIES)
+    return {
+        'form_number': f"{institution_code[:2]}F{seq:07d}",
+        'programme_name': rng.choice(PROGRAMMES),
+        'admission_scheme': 'NEP',
+        'enrollment_number': f"EN{seq:08d}",
+        'admission_category': rng.choice(CATEGORIES),
+        'admission_transaction_number': f"TXN{seq:09d}",
+        'admission_fee_paid_on': paid_on.strftime('%Y-%m-%d %H:%M:%S'),
+        'state': 'Goa',
+        'name_of_the_applicant': _name(rng).upper() if rng.random() < 0.3 else _name(rng),
+        'gender': rng.choice(['Male', 'Female']),
+        'alternate_mobile': _mobile(rng) if rng.random() < 0.4 else '',
+        'dob_day': dob.day, 'dob_month': dob.month, 'dob_year': dob.year,
+        'blood_group': rng.choice(BLOOD_GROUPS),
+        'religion': rng.choice(RELIGIONS),
+        'are_you_citizen_of_india': 'YES',
+        'email': f"student{seq}@example.com",
+        'mobile': _mobile(rng),
+        'name_of_father': _name(rng),
+        'father_occupation': rng.choice(OCCUPATIONS),
+        'father_mobile': _mobile(rng),
+        'name_of_mother': _name(rng),
+        'mother_occupation': rng.choice(OCCUPATIONS),
+        'mother_mobile': _mobile(rng) if rng.random() < 0.7 else '',
+        'add_line_1': f"H.No. {rng.randint(1, 999)}, Ward {rng.randint(1, 20)}",
+        'add_line_2': city,
+        'city': city,
+        'pincode': rng.randint(403001, 403806),
+        'xii_passing_year': rng.choice([2023, 2024, 2025]),
+        'xii_stream': rng.choice(['Commerce', 'Science', 'Arts']),
+        'xii_maximum_marks': 600,
+        'xii_marks_obtained': rng.randint(250, 590),
+        'xii_percentage': round(rng.uniform(40, 98), 2),
+        'xii_name_of_the_institution': 'R M Salgaocar Higher Secondary School',
+        'xii_board': 'GBSHSE',
+        'xii_division': rng.choice(XII_DIVISIONS),
+        'urban_rural_semi_urban_metro_area': rng.choice(['Urban', 'Rural', 'Semi-urban']),
+    }
+
+
+def _rms_vva_student(rng, seq, institution_code):
+    dob = _birth_date(rng, 3, 18)
+    admission_date = date(2025, 4, 1) + timedelta(days=rng.randint(0, 120))
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    city = rng.choice(CITIES)
+    if institution_code == 'RMS':
+        batch = f"{rng.choice(['XI', 'XII'])}-{rng.choice(['COM', 'SCI'])} - 2025-26 {rng.choice('ABC')}"
+    else:
+        batch = f"CL-{rng.randint(1, 10)} - {rng.choice('ABC')} 25-26"
+    # Mixed date formats, as found in real exports.
+    date_format = rng.choice(['%d/%m/%Y', '%d-%m-%Y', '%Y-%m-%d'])
+    return {
+        'sl_no': seq,
+        'admission_date': admission_date.strftime(date_format),
+        'country': 'India',
+        'date_of_birth': dob.strftime(date_format),
+        'nationality': 'Indian',
+        'student_category': rng.choice(['GEN', 'OBC', 'SC', 'ST']),
+        'batch': batch,
+        'admission_no': f"{institution_code}{seq:07d}",
+        'first_name': first,
+        'last_name': last,
+        'full_name': f"{first} {last}",
+        'gender': rng.choice(['Male', 'Female', 'M', 'F']),
+        'blood_group': rng.choice(BLOOD_GROUPS),
+        'mother_tongue': rng.choice(MOTHER_TONGUES),
+        'religion': rng.choice(RELIGIONS),
+        'address_line_1': f"H.No. {rng.randint(1, 999)}, {city}",
+        'city': city,
+        'state': 'Goa',
+        'pin_code': rng.randint(403001, 403806),
+        'mobile': _mobile(rng),
+        'e_mail': f"parent{seq}@example.com",
+        'roll_number': rng.randint(1, 60),
+        'father_full_name': f"{rng.choice(FIRST_NAMES)} {last}",
+        'father_occupation': rng.choice(OCCUPATIONS),
+        'father_mobile_phone': _mobile(rng),
+        'mother_full_name': f"{rng.choice(FIRST_NAMES)} {last}",
+        'mother_occupation': rng.choice(OCCUPATIONS),
+        'mother_mobile_phone': _mobile(rng) if rng.random() < 0.7 else '',
+    }
+
+
+def _fee(rng, seq, institution_code):
+    total = rng.choice([5000, 12000, 18500, 25000, 42000])
+    status = rng.choices(['PAID', 'UNPAID', 'PARTIAL_PAID'], weights=[70, 20, 10])[0]
+    paid = total if status == 'PAID' else (0 if status == 'UNPAID' else round(total * rng.uniform(0.2, 0.8), 2))
+    due = date(2025, 6, 1) + timedelta(days=rng.randint(0, 240))
+    paid_on = datetime(2025, 4, 1) + timedelta(minutes=rng.randint(0, 180 * 24 * 60))
+    if institution_code in ('SDCCE', 'GRKCL'):
+        paid_date = paid_on.strftime('%d/%m/%y')
+        branch = institution_code
+        course = rng.choice(PROGRAMMES)
+        registration_code = f"{institution_code}R{seq:07d}"
+        payment_mode = rng.choice(ONLINE_PAYMENT_MODES)
+    else:
+        paid_date = paid_on.strftime('%Y-%m-%d %H:%M:%S')
+        branch = rng.choice(list(VVA_BRANCH_COURSES))
+        course = rng.choice(VVA_BRANCH_COURSES[branch])
+        # Numeric, with a PP prefix for pre-primary
+        registration_code = f"PP{seq}" if branch == 'Pre Primary' else str(100000 + seq)
+        payment_mode = rng.choice(PAYMENT_MODES)
+    return {
+        'institute': 'Vidya Vikas Mandal',
+        'branch': branch,
+        'student': _name(rng),
+        'fees_id': 100000 + seq,
+        'e_mail_address': f"student{seq}@example.com",
+        'mobile_number': _mobile(rng, country_code=False),
+        'standard_course': course,
+        'division': rng.choice('ABC'),
+        'roll_number': rng.randint(1, 60),
+        'registration_code': registration_code,
+        'fee_head': rng.choice(FEE_HEADS),
+        'due_date': due.strftime('%d/%m/%Y'),
+        'fees_category': 'Regular',
+        'total_amount': total,
+        'late_payment_charges': rng.choice([0, 0, 0, 100, 250]),
+        'payment_status': status,
+        'paid_amount': paid,
+        'remaining_amount': round(total - paid, 2),
+        'fees_paid_date': paid_date if status != 'UNPAID' else '',
+        'qfix_reference_number': f"QF{seq:010d}",
+        'payment_gateway_transaction_id': f"PG{seq:010d}",
+        'bank_reference_no': f"BR{seq:010d}",
+        'payment_option': rng.choice(PAYMENT_OPTIONS),
+        'payment_mode': payment_mode,
+        'payment_reference_details': f"REF{seq:08d}",
+        'payment_details': rng.choice(['Online', 'Offline']),
+        'settlement_date': (paid_on + timedelta(days=2)).strftime('%Y-%m-%d') if status != 'UNPAID' else '',
+        'tuition_fees': round(total * 0.6, 2),
+        'term_fees': round(total * 0.2, 2),
+        'activity_fees': round(total * 0.1, 2),
+        'development_fund': round(total * 0.1, 2),
+    }
+
+
+ROW_BUILDERS = {
+    'students_sdcce_grkcl': _sdcce_student,
+    'students_rms_vva': _rms_vva_student,
+    'fees': _fee,
+}
+
+
+def generate_rows(kind, rows, seed=42):
+    """Yields (header_row, data rows...) for one file kind."""
+    mapping_key, institution_code = KINDS[kind]
+    headers = _headers(mapping_key)
+    db_cols = list(headers)
+    build_row = ROW_BUILDERS[mapping_key]
+    rng = random.Random(f"{seed}-{kind}")
+
+    yield [headers[col] for col in db_cols]
+    for seq in range(1, rows + 1):
+        values = build_row(rng, seq, institution_code)
+        yield [values.get(col, '') for col in db_cols]
+
+
+class NoDuplicatesCursor:
+    """Stands in for the DB cursor in the record validators: every duplicate check finds nothing."""
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchall(self):
+        return []
+
+    def fetchone(self):
+        return None
+
+
+def generate_records(kind, rows, seed=42):
+    """Yields the generated rows as staging-table records: {db_column: string, or None for blanks}."""
+    generated = generate_rows(kind, rows, seed)
+    db_cols = list(_headers(KINDS[kind][0]))
+    next(generated)
+    for row in generated:
+        yield {col: None if value == '' else str(value) for col, value in zip(db_cols, row)}
+
+
+def record_validator(kind):
+    """Returns validate(cursor, record) -> (query, values, errors), the upload validator for a file kind."""
+    from validation_fees import _validate_and_prepare_fees_data
+    from validation_students import _validate_and_prepare_student_rms, _validate_and_prepare_student_sdcce
+
+    mapping_key, institution_code = KINDS[kind]
+    if mapping_key == 'students_sdcce_grkcl':
+        return lambda cursor, record: _validate_and_prepare_student_sdcce(
+            cursor, record, institution_code, 'students_details_master')
+    if mapping_key == 'students_rms_vva':
+        return lambda cursor, record: _validate_and_prepare_student_rms(
+            cursor, record, institution_code, 'students_details_master', '2025-26', 'Q1')
+    return lambda cursor, record: _validate_and_prepare_fees_data(
+        cursor, record, 1, 'student_fee_transactions', '2025-26', 'Q1', institution_code)
+
+
+def passes_validation(validate, record, cursor=None):
+    """True when the validator accepts the record for insertion."""
+    query, _, errors = validate(cursor or NoDuplicatesCursor(), record)
+    return query is not None and not errors
+
+
+def check_kind(kind, rows, seed=42):
+    """Returns (passed, errors by count): how many generated rows pass the upload validator."""
+    validate = record_validator(kind)
+    cursor = NoDuplicatesCursor()
+    passed = 0
+    errors = {}
+    for record in generate_records(kind, rows, seed):
+        query, _, record_errors = validate(cursor, record)
+        if query is not None and not record_errors:
+            passed += 1
+        for error in record_errors:
+            errors[error] = errors.get(error, 0) + 1
+    return passed, errors
+
+
+def write_file(kind, rows, out_dir, seed=42):
+    """Writes one CSV file and returns its path."""
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{kind}_{rows}.csv")
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(generate_rows(kind, rows, seed))
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic upload files for benchmarks.")
+    parser.add_argument('--kind', default='all', help=f"One of: all, {', '.join(KINDS)}")
+    parser.add_argument('--rows', default='1000,10000', help="Comma-separated row counts, e.g. 1000,10000,100000,500000")
+    parser.add_argument('--out', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data'))
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--check', action='store_true',
+                        help="Validate the generated rows instead of writing files; fails below MIN_CLEAN_RATE.")
+    args = parser.parse_args(argv)
+
+    kinds = list(KINDS) if args.kind == 'all' else [args.kind]
+    if args.check:
+        failed = []
+        rows = int(args.rows.split(',')[0])
+        for kind in kinds:
+            passed, errors = check_kind(kind, rows, args.seed)
+            print(f"{kind:<16} {passed}/{rows} rows pass validation")
+            for error, count in sorted(errors.items(), key=lambda item: -item[1])[:5]:
+                print(f"    {count:>6}  {error}")
+            if passed < rows * MIN_CLEAN_RATE:
+                failed.append(kind)
+        if failed:
+            print(f"Below the {MIN_CLEAN_RATE:.0%} clean rate: {', '.join(failed)}")
+            return 1
+        return 0
+
+    for kind in kinds:
+        for rows in (int(r) for r in args.rows.split(',')):
+            print(write_file(kind, rows, args.out, args.seed))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
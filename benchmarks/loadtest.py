@@ -0,0 +1,182 @@
+"""
+Load test for the authenticated API.
+
+Logs in through /login, then replays a weighted mix of dashboard, list and data-viewer requests with
+varied filters from a pool of worker threads. Reports p50/p95/p99 latency, throughput and error rate per
+endpoint. Run it against a server backed by a locally seeded database (see datagen.py / bench_pipeline.py).
+
+Usage:
+    python benchmarks/loadtest.py --email admin@example.com --password secret \\
+        --concurrency 8 --duration 60 --base-url http://localhost:5000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+INSTITUTIONS = ['all', 'SDCCE', 'GRKCL', 'RMS', 'VVA']
+DATE_RANGES = [('', ''), ('2025-04-01', '2025-06-30'), ('2025-01-01', '2025-12-31'), ('2024-06-01', '2025-05-31')]
+PAYMENT_STATUSES = ['all', 'PAID', 'UNPAID', 'PARTIAL_PAID']
+GENDERS = ['all', 'Male', 'Female']
+
+
+def _student_filters(rng):
+    return {'institution_code': rng.choice(INSTITUTIONS), 'gender': rng.choice(GENDERS), 'batch_year': 'all'}
+
+
+def _fee_filters(rng):
+    start, end = rng.choice(DATE_RANGES)
+    return {'institution_code': rng.choice(INSTITUTIONS), 'payment_status': rng.choice(PAYMENT_STATUSES),
+            'start_date': start, 'end_date': end}
+
+
+def _student_list(rng):
+    filters = _student_filters(rng)
+    filters.update(rng.choice([{}, {'filterType': 'gender', 'filterValue': rng.choice(['Male', 'Female'])},
+                               {'filterType': 'age_group', 'filterValue': '18-20'}]))
+    return filters
+
+
+def _transaction_list(rng):
+    filters = _fee_filters(rng)
+    filters.update(rng.choice([{}, {'filterType': 'payment_mode', 'filterValue': 'Online'},
+                               {'filterType': 'due_date_status', 'filterValue': 'Overdue Unpaid'}]))
+    return filters
+
+
+def _table_data(rng):
+    params = {'page': rng.randint(1, 20), 'limit': rng.choice([20, 50])}
+    if rng.random() < 0.3:
+        params.update({'search': rng.choice(['Naik', 'Kamat', '98765']), 'column': rng.choice(['', 'student_name'])})
+    return params
+
+
+# (label, path, weight, params factory). Weights approximate a morning of dashboard use.
+REQUEST_MIX = [
+    ('dashboard/students', '/api/dashboard/students', 20, _student_filters),
+    ('dashboard/fees', '/api/dashboard/fees', 25, _fee_filters),
+    ('students/list', '/api/students/list', 15, _student_list),
+    ('transactions/list', '/api/transactions/list', 20, _transaction_list),
+    ('table-data/students', '/api/table-data/students_details_master', 10, _table_data),
+    ('table-data/fees', '/api/table-data/student_fee_transactions', 10, _table_data),
+]
+
+
+def login(base_url, email, password):
+    request = urllib.request.Request(
+        f"{base_url}/login", data=json.dumps({'email': email, 'password': password}).encode(),
+        headers={'Content-Type': 'application/json'}, method='POST')
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())['token']
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.status_counts = defaultdict(lambda: defaultdict(int))
+        self.lock = threading.Lock()
+
+    def record(self, label, latency, status):
+        with self.lock:
+            self.latencies[label].append(latency)
+            self.status_counts[label][status] += 1
+            if not (200 <= status < 400):
+                self.errors[label] += 1
+
+
+def worker(base_url, token, deadline, stats, seed, timeout):
+    rng = random.Random(seed)
+    labels = [item for item in REQUEST_MIX]
+    weights = [item[2] for item in REQUEST_MIX]
+    headers = {'x-access-token': token, 'Accept-Encoding': 'gzip'}
+
+    while time.monotonic() < deadline:
+        label, path, _, make_params = rng.choices(labels, weights=weights)[0]
+        url = f"{base_url}{path}?{urllib.parse.urlencode(make_params(rng))}"
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=timeout) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            status = e.code
+        except (urllib.error.URLError, OSError):
+            status = 0
+        stats.record(label, time.perf_counter() - start, status)
+
+
+def report(stats, elapsed):
+    print(f"\n{'endpoint':<22} {'requests':>9} {'req/s':>8} {'errors':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    total_requests = total_errors = 0
+    summary = {}
+    for label, _, _, _ in REQUEST_MIX:
+        latencies = sorted(stats.latencies.get(label, []))
+        if not latencies:
+            continue
+        count, errors = len(latencies), stats.errors.get(label, 0)
+        total_requests += count
+        total_errors += errors
+        p50, p95, p99 = (percentile(latencies, p) * 1000 for p in (50, 95, 99))
+        summary[label] = {'requests': count, 'throughput': count / elapsed, 'error_rate': errors / count,
+                          'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99,
+                          'statuses': dict(stats.status_counts[label])}
+        print(f"{label:<22} {count:>9} {count / elapsed:>8.1f} {errors / count:>6.1%} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f}")
+    if total_requests:
+        print(f"{'total':<22} {total_requests:>9} {total_requests / elapsed:>8.1f} {total_errors / total_requests:>6.1%}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the authenticated API.")
+    parser.add_argument('--base-url', default='http://localhost:5000')
+    parser.add_argument('--email', default=os.environ.get('LOADTEST_EMAIL'))
+    parser.add_argument('--password', default=os.environ.get('LOADTEST_PASSWORD'))
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=30, help="Seconds to run.")
+    parser.add_argument('--timeout', type=float, default=60, help="Per-request timeout in seconds.")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help="Write the per-endpoint summary to this JSON file.")
+    args = parser.parse_args(argv)
+
+    if not args.email or not args.password:
+        parser.error("--email and --password (or LOADTEST_EMAIL / LOADTEST_PASSWORD) are required.")
+
+    token = login(args.base_url, args.email, args.password)
+    stats = Stats()
+    deadline = time.monotonic() + args.duration
+    threads = [threading.Thread(target=worker, args=(args.base_url, token, deadline, stats, args.seed + i, args.timeout),
+                                daemon=True)
+               for i in range(args.concurrency)]
+
+    print(f"Running {args.concurrency} workers for {args.duration:.0f}s against {args.base_url} ...")
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    summary = report(stats, elapsed)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'concurrency': args.concurrency, 'duration_s': elapsed, 'endpoints': summary}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
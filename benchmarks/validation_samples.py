@@ -0,0 +1,64 @@
+"""
+Value distributions for the validation benchmarks, modelled on values seen in real institute exports:
+well-formed values mixed with typos, placeholders, spreadsheet artefacts (9876543210.0, 9.87654E+09)
+and mixed date formats. Each list is (value, weight) pairs; sample() expands them deterministically.
+"""
+import random
+
+NAMES = [
+    ('Riya Naik', 30), ('ROHAN KAMAT', 15), ('  sneha   prabhu ', 8), ('K. Shreya Pai', 6),
+    ("Leona D'Souza", 4), ('Jean-Pierre Fernandes', 2), ('Aarav Naik2', 2), ('-', 3), ('NA', 3),
+    ('', 4), (None, 4), ('Mohd. Imran Shaikh', 5), ('Prathamesh  Gaonkar', 6), ('sanjana.desai', 2),
+    ('Vedant Sawant Jr', 3), ('ANANYA P. BORKAR', 3),
+]
+
+MOBILE_NUMBERS = [
+    ('9876543210', 35), ('+91 98765 43210', 8), ('919876543210', 5), ('09876543210', 4),
+    ('9876543210.0', 10), (9876543210.0, 6), (9876543210, 6), ('9.87654E+09', 2), ('98765-43210', 3),
+    ('5123456789', 2), ('12345', 2), ('NA', 3), ('-', 2), ('', 6), (None, 6),
+    ('9876543210 / 9123456780', 2),
+]
+
+OCCUPATIONS = [
+    ('Business', 15), ('Govt. Service', 8), ('Government Servant', 5), ('House Wife', 8), ('Housewife', 8),
+    ('Home Maker', 4), ('Teacher', 6), ('Self Employed', 6), ('Privat Service', 3), ('Bussiness', 3),
+    ('Enginer', 2), ('Docter', 2), ('Software Engineer', 3), ('Farmer', 4), ('Driver', 3),
+    ('Retired', 3), ('Indian Navy', 2), ('Shop keeper', 2), ('NA', 5), ('N/A', 2), ('-', 3),
+    ('', 5), (None, 5), ('Merchant Navy (Sailor)', 1), ('Labour', 2),
+]
+
+# Date strings in the formats found in uploads, including invalid ones.
+DATES = [
+    ('15/06/2025', 20), ('15-06-2025', 10), ('2025-06-15', 15), ('2025-06-15 10:32:00', 10),
+    ('15/06/25', 8), ('2025/06/15', 3), ('31/02/2025', 2), ('15.06.2025', 2), ('', 5), (None, 5),
+]
+
+
+def sample(distribution, count, seed=7):
+    """Returns `count` values drawn from a (value, weight) distribution."""
+    rng = random.Random(seed)
+    values = [value for value, _ in distribution]
+    weights = [weight for _, weight in distribution]
+    return rng.choices(values, weights=weights, k=count)
+
+
+def dirty_record(record, seed, rate=0.15):
+    """
+    Converts a generated row into a staging-table style record (strings, None for blanks) and replaces
+    some name, phone, occupation and date fields with values from the distributions above.
+    """
+    rng = random.Random(seed)
+    dirty = {}
+    for key, value in record.items():
+        value = None if value == '' or value is None else str(value)
+        if value is not None and rng.random() < rate:
+            if 'mobile' in key or key == 'phone':
+                value = sample(MOBILE_NUMBERS, 1, rng.random())[0]
+            elif 'occupation' in key:
+                value = sample(OCCUPATIONS, 1, rng.random())[0]
+            elif 'name' in key and 'institution' not in key:
+                value = sample(NAMES, 1, rng.random())[0]
+            elif 'date' in key:
+                value = sample(DATES, 1, rng.random())[0]
+        dirty[key] = value
+    return dirty
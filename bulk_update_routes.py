@@ -0,0 +1,198 @@
+"""
+Routes for bulk updates: template download, preview of an uploaded update sheet and execution.
+pandas is imported inside the views that need it so it is not loaded at worker start.
+"""
+import io
+import json
+
+import mysql.connector
+from flask import Blueprint, jsonify, make_response, request
+
+import data_version_utils
+import fees_dashboard_utils
+from auth_utils import token_required
+from db_utils import get_db_connection
+
+bulk_update_bp = Blueprint('bulk_update', __name__)
+
+@bulk_update_bp.route('/api/bulk-update/download-template', methods=['GET'])
+@token_required
+def download_bulk_template():
+    table_name = request.args.get('table_name')
+    identifier_column = request.args.get('identifier_column')
+    update_columns_json = request.args.get('update_columns')
+
+    if not all([table_name, identifier_column, update_columns_json]):
+        return jsonify({'error': 'Missing required parameters'}), 400
+
+    try:
+        import pandas as pd
+
+        update_columns = json.loads(update_columns_json)
+        headers = [identifier_column] + update_columns
+        df = pd.DataFrame(columns=headers)
+
+        output = io.BytesIO()
+        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+            df.to_excel(writer, index=False, sheet_name='Bulk Update Template')
+            worksheet = writer.sheets['Bulk Update Template']
+            for i, col in enumerate(df.columns):
+                worksheet.set_column(i, i, len(col) + 5)
+        output.seek(0)
+        
+        filename = f"bulk_update_{table_name}_template.xlsx"
+        response = make_response(output.getvalue())
+        response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response.headers['Access-Control-Expose-Headers'] = 'Content-Disposition'
+        return response
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bulk_update_bp.route('/api/bulk-update/preview-upload', methods=['POST'])
+@token_required
+def preview_bulk_upload():
+    if 'file' not in request.files:
+        return jsonify({'error': 'No file part'}), 400
+    
+    file = request.files['file']
+    table_name = request.form.get('table_name')
+    identifier_column = request.form.get('identifier_column')
+
+    if not all([file, table_name, identifier_column]):
+        return jsonify({'error': 'Missing required form data'}), 400
+
+    db_conn = None
+    cursor = None
+    try:
+        import pandas as pd
+
+        df = pd.read_excel(file)
+        df.columns = df.columns.str.strip()
+
+        if identifier_column not in df.columns:
+            return jsonify({'error': f"Identifier column '{identifier_column}' not found in the uploaded file."}), 400
+
+        ids_to_check = df[identifier_column].dropna().unique().tolist()
+        
+        # *** BUG FIX STARTS HERE ***
+        # If there are no IDs in the identifier column, there's nothing to check.
+        if not ids_to_check:
+            return jsonify({
+                'valid_updates': [],
+                'invalid_rows': []
+            })
+        # *** BUG FIX ENDS HERE ***
+
+        db_conn = get_db_connection()
+        cursor = db_conn.cursor(dictionary=True)
+
+        query = f"SELECT `{identifier_column}` FROM {table_name} WHERE `{identifier_column}` IN ({', '.join(['%s'] * len(ids_to_check))})"
+        cursor.execute(query, ids_to_check)
+        existing_ids = {str(row[identifier_column]) for row in cursor.fetchall()}
+
+        valid_updates = []
+        invalid_rows = []
+        
+        update_columns = [col for col in df.columns if col != identifier_column]
+
+        for index, row in df.iterrows():
+            identifier_value = str(row[identifier_column])
+            if identifier_value in existing_ids:
+                updates = {}
+                for col in update_columns:
+                    if pd.notna(row[col]):
+                        updates[col] = row[col]
+                if updates:
+                    valid_updates.append({'id': identifier_value, 'updates': updates})
+            else:
+                invalid_rows.append({'id': identifier_value, 'reason': 'Not found in database'})
+
+        return jsonify({
+            'valid_updates': valid_updates,
+            'invalid_rows': invalid_rows
+        })
+
+    except Exception as e:
+        return jsonify({'error': f'Error processing file: {str(e)}'}), 500
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+@bulk_update_bp.route('/api/bulk-update/execute', methods=['POST'])
+@token_required
+def execute_bulk_update():
+    data = request.get_json()
+    table_name = data.get('table_name')
+    identifier_column = data.get('identifier_column')
+    updates = data.get('updates')
+
+    if not all([table_name, identifier_column, updates]):
+        return jsonify({'error': 'Missing data for execution.'}), 400
+    
+    db_conn = None
+    cursor = None
+    updated_count = 0
+    try:
+        db_conn = get_db_connection()
+        cursor = db_conn.cursor()
+        db_conn.start_transaction()
+
+        updated_columns = {col for item in updates for col in item['updates']}
+        syncs_components = table_name == 'student_fee_transactions' and any(
+            col in fees_dashboard_utils.FEE_COMPONENTS for col in updated_columns)
+        updates_revenue = table_name == 'student_fee_transactions' and any(
+            col in fees_dashboard_utils.FEE_REVENUE_COLUMNS for col in updated_columns)
+        fees_trans_ids = []
+        previous_dates = set()
+        if syncs_components or updates_revenue:
+            # Looked up before the update, with the paid dates the revenue rollup has to re-aggregate
+            record_ids = [item['id'] for item in updates]
+            cursor.execute(
+                f"SELECT fees_trans_id FROM student_fee_transactions WHERE `{identifier_column}` IN ({', '.join(['%s'] * len(record_ids))})",
+                record_ids
+            )
+            fees_trans_ids = [row[0] for row in cursor.fetchall()]
+            if updates_revenue:
+                previous_dates = fees_dashboard_utils.fee_revenue_dates(cursor, fees_trans_ids)
+
+        for update_item in updates:
+            record_id = update_item['id']
+            changes = update_item['updates']
+            
+            set_clauses = []
+            params = []
+            for col, val in changes.items():
+                set_clauses.append(f"`{col}` = %s")
+                params.append(val)
+            
+            params.append(record_id)
+            
+            query = f"UPDATE {table_name} SET {', '.join(set_clauses)} WHERE `{identifier_column}` = %s"
+            cursor.execute(query, params)
+            updated_count += cursor.rowcount
+
+        if syncs_components:
+            fees_dashboard_utils.sync_fee_component_lines(cursor, fees_trans_ids)
+        if updates_revenue:
+            fees_dashboard_utils.refresh_fee_revenue_daily(cursor, fees_trans_ids, previous_dates)
+
+        db_conn.commit()
+        data_version_utils.invalidate_data_version()
+        return jsonify({
+            'message': 'Bulk update completed successfully.',
+            'updated_count': updated_count,
+            'skipped_count': len(updates) - updated_count
+        })
+    except mysql.connector.Error as err:
+        if db_conn: db_conn.rollback()
+        return jsonify({'error': f"Database error during update: {err.msg}"}), 500
+    except Exception as e:
+        if db_conn: db_conn.rollback()
+        return jsonify({'error': f'An unexpected error occurred: {str(e)}'}), 500
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+
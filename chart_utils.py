@@ -1,20 +1,9 @@
-import mysql.connector
 from flask import jsonify
 from datetime import date, datetime, timedelta
-import pandas as pd
 import io
 
 # --- Database Connection ---
-DB_CONFIG = {
-    'host': 'localhost',
-    'user': 'root',
-    'password': '',
-    'database': 'new_VVM_Process_db'
-}
-
-def get_db_connection():
-    """Establishes a connection to the MySQL database."""
-    return mysql.connector.connect(**DB_CONFIG)
+from db_utils import get_db_connection
 
 def _build_where_clause(filters):
     """
@@ -284,6 +273,9 @@ def get_distinct_filter_values(column_name):
         if db_conn and db_conn.is_connected(): db_conn.close()
 
 def export_students_to_excel(students):
+    # Imported here so pandas is only loaded when an export is requested.
+    import pandas as pd
+
     df = pd.DataFrame(students)
     output = io.BytesIO()
     with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
@@ -0,0 +1,251 @@
+"""
+Routes for the student and fees dashboards: aggregated chart data, drill-down lists, student details
+and filter options.
+"""
+from flask import Blueprint, jsonify, request
+
+import chart_utils
+import dashboard_utils
+import fees_dashboard_utils
+import response_utils
+import student_details_utils
+from auth_utils import apply_default_institution, token_required
+
+dashboards_bp = Blueprint('dashboards', __name__)
+
+
+# --- Helpers for list endpoints ---
+def _wants_columnar_layout(filters):
+    """Pops the optional layout query parameter; layout=columns returns {columns, rows} instead of a list of objects."""
+    return filters.pop('layout', None) == 'columns'
+
+def _paged_list_response(data, next_cursor):
+    """List response with the next page's cursor in X-Next-Cursor (absent on the last page)."""
+    response = jsonify(data)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+
+#-----------------------------dashboard-----------------------------------------------------------
+@dashboards_bp.route('/api/dashboard/kpis', methods=['GET'])
+@token_required
+@response_utils.etag_by_data_version
+def get_dashboard_kpis():
+    try:
+        filters = apply_default_institution({
+            'institution_code': request.args.get('institution_code'),
+            'batch_year': request.args.get('batch') # Note: frontend might send 'batch'
+        })
+        kpi_data = chart_utils.get_kpi_data(filters)
+        return jsonify(kpi_data)
+    except Exception as e:
+        print(f"KPI Fetch Error: {e}")
+        return jsonify({'error': 'Could not fetch KPI data.'}), 500
+
+# --- NEW STUDENT DASHBOARD ENDPOINTS ---
+@dashboards_bp.route('/api/dashboard/students', methods=['GET'])
+@token_required
+@response_utils.etag_by_data_version
+def get_students_data():
+    try:
+        filters = apply_default_institution({key: request.args.get(key) for key in request.args})
+        data = dashboard_utils.get_student_dashboard_data(filters)
+        return jsonify(data)
+    except Exception as e:
+        return jsonify({'message': f'Could not fetch student dashboard data: {e}'}), 500
+        
+@dashboards_bp.route('/api/dashboard/fees', methods=['GET'])
+@token_required
+@response_utils.etag_by_data_version
+def get_fees_data():
+    try:
+        filters = apply_default_institution({key: request.args.get(key) for key in request.args})
+        # Handle empty date parameters
+        if 'start_date' in filters and filters['start_date'] == '':
+            del filters['start_date']
+        if 'end_date' in filters and filters['end_date'] == '':
+            del filters['end_date']
+            
+        data = fees_dashboard_utils.get_fees_dashboard_data(filters)
+        return jsonify(data)
+    except Exception as e:
+        return jsonify({'message': f'Could not fetch fees dashboard data: {e}'}), 500
+
+@dashboards_bp.route('/api/students/list', methods=['GET'])
+@token_required
+@response_utils.etag_by_data_version
+def get_student_list_for_popup():
+    try:
+        filters = apply_default_institution({key: request.args.get(key) for key in request.args})
+        columnar = _wants_columnar_layout(filters)
+        student_list, next_cursor = dashboard_utils.get_filtered_student_list(filters, is_full_list=False, columnar=columnar)
+        return _paged_list_response(student_list, next_cursor)
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Could not fetch student list.'}), 500
+
+@dashboards_bp.route('/api/fees/revenue-series', methods=['GET'])
+@token_required
+@response_utils.etag_by_data_version
+def get_revenue_series():
+    """Revenue per day/week/month/term/academic_year, optionally grouped and cumulative (see get_revenue_series)."""
+    try:
+        filters = apply_default_institution({key: request.args.get(key) for key in request.args})
+        data = fees_dashboard_utils.get_revenue_series(filters)
+        return jsonify(data)
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        print(f"Revenue Series Error: {e}")
+        return jsonify({'error': 'Could not fetch revenue series.'}), 500
+
+@dashboards_bp.route('/api/transactions/list', methods=['GET'])
+@token_required
+@response_utils.etag_by_data_version
+def get_transaction_list_for_popup():
+    try:
+        filters = apply_default_institution({key: request.args.get(key) for key in request.args})
+        columnar = _wants_columnar_layout(filters)
+        # Handle empty date parameters
+        if 'start_date' in filters and filters['start_date'] == '':
+            del filters['start_date']
+        if 'end_date' in filters and filters['end_date'] == '':
+            del filters['end_date']
+            
+        transaction_list = fees_dashboard_utils.get_filtered_transaction_list(filters, is_full_list=False, columnar=columnar)
+        return jsonify(transaction_list)
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Could not fetch transaction list.'}), 500
+
+@dashboards_bp.route('/api/students/full-list', methods=['GET'])
+@token_required
+@response_utils.etag_by_data_version
+def get_full_student_list():
+    try:
+        filters = apply_default_institution({key: request.args.get(key) for key in request.args})
+        columnar = _wants_columnar_layout(filters)
+        student_list, next_cursor = dashboard_utils.get_filtered_student_list(filters, is_full_list=True, columnar=columnar)
+        return _paged_list_response(student_list, next_cursor)
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Could not fetch full student list.'}), 500
+
+@dashboards_bp.route('/api/students/details/<identifier>', methods=['GET'])
+@token_required
+def get_student_details(identifier):
+    try:
+        identifier_type = request.args.get('identifier_type', 'student_reference_id')
+        # Without institution_code the lookup is scoped to the user's institution
+        profile = student_details_utils.get_student_profile(identifier, identifier_type, request.args.get('institution_code'))
+        if not profile:
+            return jsonify({'error': 'Student not found'}), 404
+        return jsonify(profile)
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        print(f"Error in student details: {e}")
+        return jsonify({'error': 'Could not fetch student details'}), 500
+
+@dashboards_bp.route('/api/students/details/batch', methods=['POST'])
+@token_required
+def get_student_details_batch():
+    """Profiles of several students: {"identifiers": [...], "identifier_type": "master_id", "institution_code": "VVA"}."""
+    data = request.get_json() or {}
+    identifiers = data.get('identifiers')
+    if not isinstance(identifiers, list) or not identifiers:
+        return jsonify({'error': 'identifiers must be a non-empty list.'}), 400
+    try:
+        profiles = student_details_utils.get_student_profiles(
+            identifiers, data.get('identifier_type', 'student_reference_id'), data.get('institution_code'))
+        return jsonify({
+            'students': profiles,
+            'missing': [str(identifier) for identifier in identifiers if str(identifier) not in profiles],
+        })
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        print(f"Error in student details batch: {e}")
+        return jsonify({'error': 'Could not fetch student details'}), 500
+
+@dashboards_bp.route('/api/filter-options', methods=['GET'])
+@token_required
+@response_utils.etag_by_data_version
+def get_filter_options():
+    try:
+        batches = dashboard_utils.get_distinct_filter_values('batch_year')
+        genders = dashboard_utils.get_distinct_filter_values('gender')
+        categories = dashboard_utils.get_distinct_filter_values('student_category')
+        return jsonify({
+            'batches': [b['batch_year'] for b in batches],
+            'genders': [g['gender'] for g in genders],
+            'student_categories': [c['student_category'] for c in categories]
+        })
+    except Exception as e:
+        return jsonify({'error': 'Could not fetch filter options.'}), 500
+
+@dashboards_bp.route('/api/fees/filter-options', methods=['GET'])
+@token_required
+@response_utils.etag_by_data_version
+def get_fees_filter_options():
+    try:
+        options = fees_dashboard_utils.get_fees_filter_options()
+        return jsonify(options)
+    except Exception as e:
+        return jsonify({'error': 'Could not fetch fees filter options.'}), 500
+@dashboards_bp.route('/api/transactions/revenue-details', methods=['GET'])
+@token_required
+@response_utils.etag_by_data_version
+def get_revenue_details():
+    try:
+        filters = apply_default_institution({key: request.args.get(key) for key in request.args})
+        # Handle empty date parameters
+        if 'start_date' in filters and filters['start_date'] == '':
+            del filters['start_date']
+        if 'end_date' in filters and filters['end_date'] == '':
+            del filters['end_date']
+            
+        # You'll need to implement this function in fees_dashboard_utils
+        revenue_data = fees_dashboard_utils.get_revenue_transaction_details(filters)
+        return jsonify(revenue_data)
+    except Exception as e:
+        return jsonify({'error': 'Could not fetch revenue details.'}), 500
+
+@dashboards_bp.route('/api/dashboard/fee-summary')
+def get_fee_summary():
+    try:
+        filters = {
+            'institution_code': request.args.get('institution_code', 'all'),
+            'batch_year': request.args.get('batch_year')
+        }
+        data = chart_utils.get_fee_summary_data(filters)
+        return jsonify(data)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@dashboards_bp.route('/api/dashboard/student-demographics')
+def get_student_demographics():
+    try:
+        filters = {
+            'institution_code': request.args.get('institution_code', 'all'),
+            'batch_year': request.args.get('batch_year')
+        }
+        data = chart_utils.get_student_demographics(filters)
+        return jsonify(data)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+@dashboards_bp.route('/api/transactions/kpi-details', methods=['GET'])
+@token_required
+@response_utils.etag_by_data_version
+def get_kpi_details_route():
+    try:
+        filters = apply_default_institution(request.args.to_dict())
+        data = fees_dashboard_utils.get_kpi_details(filters)
+        return jsonify(data)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
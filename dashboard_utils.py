@@ -1,20 +1,43 @@
+import base64
+import json
+
 import mysql.connector
 from flask import jsonify
 from datetime import date, datetime, timedelta
-import pandas as pd
 import io
 
 # --- Database Connection ---
-DB_CONFIG = {
-    'host': 'localhost',
-    'user': 'root',
-    'password': '',
-    'database': 'new_VVM_Process_db'
-}
+from db_utils import get_db_connection
+import data_version_utils
+import student_details_utils
+
+# Age groups as date_of_birth ranges: born after CURDATE() - N years is the same as
+# TIMESTAMPDIFF(YEAR, date_of_birth, CURDATE()) < N, but the comparison can use an index on date_of_birth
+# and the cut-off dates are computed once per query instead of once per row.
+# (label, lower age bound), youngest first; each group runs up to the next group's bound.
+AGE_GROUPS = [('Under 18', None), ('18-20', 18), ('21-23', 21), ('Over 23', 24)]
+
+def _age_group_condition(label):
+    """date_of_birth range of an age group, or None for an unknown label."""
+    bounds = [bound for _, bound in AGE_GROUPS]
+    labels = [name for name, _ in AGE_GROUPS]
+    if label not in labels:
+        return None
+    index = labels.index(label)
+    conditions = []
+    if bounds[index] is not None:
+        conditions.append(f"date_of_birth <= CURDATE() - INTERVAL {bounds[index]} YEAR")
+    if index + 1 < len(bounds):
+        conditions.append(f"date_of_birth > CURDATE() - INTERVAL {bounds[index + 1]} YEAR")
+    return " AND ".join(conditions)
 
-def get_db_connection():
-    """Establishes a connection to the MySQL database."""
-    return mysql.connector.connect(**DB_CONFIG)
+def _age_group_case():
+    """CASE expression labelling date_of_birth with its age group."""
+    whens = " ".join(
+        f"WHEN date_of_birth > CURDATE() - INTERVAL {next_bound} YEAR THEN '{label}'"
+        for (label, _), (_, next_bound) in zip(AGE_GROUPS, AGE_GROUPS[1:])
+    )
+    return f"CASE {whens} ELSE '{AGE_GROUPS[-1][0]}' END"
 
 def _build_where_clause(filters):
     """
@@ -57,15 +80,9 @@ def _build_where_clause(filters):
         if filter_type in allowed_columns:
             # Special handling for age_group (calculated field)
             if filter_type == 'age_group':
-                age_conditions = {
-                    'Under 18': "TIMESTAMPDIFF(YEAR, date_of_birth, CURDATE()) < 18",
-                    '18-20': "TIMESTAMPDIFF(YEAR, date_of_birth, CURDATE()) BETWEEN 18 AND 20",
-                    '21-23': "TIMESTAMPDIFF(YEAR, date_of_birth, CURDATE()) BETWEEN 21 AND 23",
-                    'Over 23': "TIMESTAMPDIFF(YEAR, date_of_birth, CURDATE()) > 23"
-                }
-                
-                if filter_value in age_conditions:
-                    where_clauses.append(age_conditions[filter_value])
+                age_condition = _age_group_condition(filter_value)
+                if age_condition:
+                    where_clauses.append(age_condition)
             else:
                 where_clauses.append(f"{filter_type} = %s")
                 params.append(filter_value)
@@ -149,11 +166,7 @@ def get_student_dashboard_data(filters):
             age_where_clause = " WHERE date_of_birth IS NOT NULL"
             
         age_query = f"""
-            SELECT CASE
-                WHEN TIMESTAMPDIFF(YEAR, date_of_birth, CURDATE()) < 18 THEN 'Under 18'
-                WHEN TIMESTAMPDIFF(YEAR, date_of_birth, CURDATE()) BETWEEN 18 AND 20 THEN '18-20'
-                WHEN TIMESTAMPDIFF(YEAR, date_of_birth, CURDATE()) BETWEEN 21 AND 23 THEN '21-23'
-                ELSE 'Over 23' END AS age_group, COUNT(*) as count
+            SELECT {_age_group_case()} AS age_group, COUNT(*) as count
             FROM students_details_master {age_where_clause}
             GROUP BY age_group ORDER BY age_group
         """
@@ -179,27 +192,103 @@ def get_student_dashboard_data(filters):
         if cursor: cursor.close()
         if db_conn and db_conn.is_connected(): db_conn.close()
 
-def get_filtered_student_list(filters, is_full_list=False):
+# --- Student lists ---
+# Columns a client may request with fields=; the popup columns are covered by the student list indexes
+# (migrations/0007_student_list_covering_indexes.sql), so a popup page is read from the index alone.
+STUDENT_POPUP_FIELDS = ['master_id', 'student_reference_id', 'student_name', 'institution_code',
+                        'student_category', 'admission_date', 'gender', 'mobile_number']
+STUDENT_LIST_FIELDS = STUDENT_POPUP_FIELDS + ['admission_no', 'batch_year', 'class', 'section', 'stream']
+STUDENT_LIST_PAGE_SIZE = {False: 100, True: 1000}  # popup, full list
+STUDENT_LIST_MAX_PAGE_SIZE = 5000
+
+def _parse_student_list_fields(fields):
+    """Validates a comma-separated fields parameter; master_id and student_name are always returned (page keys)."""
+    requested = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in requested if field not in STUDENT_LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(STUDENT_LIST_FIELDS)}.")
+    return ['master_id', 'student_name'] + [field for field in requested if field not in ('master_id', 'student_name')]
+
+def encode_student_list_cursor(student_name, master_id):
+    """Opaque page cursor for the row a page ended on."""
+    return base64.urlsafe_b64encode(json.dumps([student_name, master_id]).encode('utf-8')).decode('ascii')
+
+def _decode_student_list_cursor(cursor_token):
+    try:
+        student_name, master_id = json.loads(base64.urlsafe_b64decode(cursor_token.encode('ascii')))
+        return student_name, int(master_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor.")
+
+def _build_student_list_query(filters, is_full_list=False, fields=None, after=None, limit=None):
+    """
+    Builds the student list query and its parameters without executing it.
+    Rows are ordered by (student_name, master_id). after=(student_name, master_id) starts the page after that
+    row (keyset pagination); limit=None with is_full_list returns every row (exports). filters['since'] (a data
+    version) keeps only the students updated since that version was read.
+    """
+    where_clause, params = _build_where_clause(filters)
+
+    if filters.get('since'):
+        _, students_updated, _ = data_version_utils.parse_data_version(filters['since'])
+        # >= because updated_at has one-second resolution; rows written in that second are sent again
+        where_clause = f"{where_clause} AND updated_at >= FROM_UNIXTIME(%s)" if where_clause else " WHERE updated_at >= FROM_UNIXTIME(%s)"
+        params = params + [students_updated]
+
+    if after is not None:
+        after_name, after_id = after
+        if after_name is None:
+            # NULL names sort first
+            keyset = "((student_name IS NULL AND master_id > %s) OR student_name IS NOT NULL)"
+            keyset_params = [after_id]
+        else:
+            keyset = "student_name >= %s AND (student_name > %s OR master_id > %s)"
+            keyset_params = [after_name, after_name, after_id]
+        where_clause = f"{where_clause} AND {keyset}" if where_clause else f" WHERE {keyset}"
+        params = params + keyset_params
+
+    if fields:
+        columns = ", ".join(fields)
+    elif is_full_list:
+        columns = "*"
+    else:
+        columns = ", ".join(STUDENT_POPUP_FIELDS)
+
+    if limit is None and not is_full_list:
+        limit = STUDENT_LIST_PAGE_SIZE[False]
+    limit_clause = f"LIMIT {int(limit)}" if limit is not None else ""
+
+    query = f"SELECT {columns} FROM students_details_master {where_clause} ORDER BY student_name, master_id {limit_clause}"
+    return query, params
+
+def get_filtered_student_list(filters, is_full_list=False, columnar=False):
+    """
+    Returns (students, next_cursor): one page of the filtered student list as a list of dicts, or with
+    columnar=True as {'columns': [...], 'rows': [[...], ...]} so column names are not repeated in every row.
+    filters may hold fields (see STUDENT_LIST_FIELDS), limit and cursor (the next_cursor of the previous page);
+    next_cursor is None on the last page; since (a data version) returns only students updated after it.
+    Raises ValueError for invalid fields, limit, cursor or since.
+    """
+    fields = _parse_student_list_fields(filters['fields']) if filters.get('fields') else None
+    after = _decode_student_list_cursor(filters['cursor']) if filters.get('cursor') else None
+    try:
+        limit = int(filters.get('limit') or STUDENT_LIST_PAGE_SIZE[is_full_list])
+    except ValueError:
+        raise ValueError("limit must be a number.")
+    if not 1 <= limit <= STUDENT_LIST_MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {STUDENT_LIST_MAX_PAGE_SIZE}.")
+
     db_conn = None
     cursor = None
     try:
         db_conn = get_db_connection()
-        cursor = db_conn.cursor(dictionary=True)
-        where_clause, params = _build_where_clause(filters)
-        
-        limit_clause = "" if is_full_list else "LIMIT 100"
-        
-        if is_full_list:
-            query = f"SELECT * FROM students_details_master {where_clause} ORDER BY student_name {limit_clause}"
-        else:
-            query = f"""
-                SELECT master_id, student_reference_id, student_name, institution_code, 
-                       student_category, admission_date, gender, mobile_number 
-                FROM students_details_master {where_clause} ORDER BY student_name {limit_clause}
-            """
-        
+        cursor = db_conn.cursor()
+        # One extra row tells whether there is a next page
+        query, params = _build_student_list_query(filters, is_full_list, fields=fields, after=after, limit=limit + 1)
+
         cursor.execute(query, params)
-        return cursor.fetchall()
+        columns = list(cursor.column_names)
+        rows = cursor.fetchall()
     except Exception as e:
         print(f"Error in get_filtered_student_list: {str(e)}")
         raise
@@ -207,65 +296,49 @@ def get_filtered_student_list(filters, is_full_list=False):
         if cursor: cursor.close()
         if db_conn and db_conn.is_connected(): db_conn.close()
 
-def get_student_details_with_fees(student_identifier, identifier_type="student_reference_id"):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = dict(zip(columns, rows[-1]))
+        next_cursor = encode_student_list_cursor(last['student_name'], last['master_id'])
+    if columnar:
+        return {'columns': columns, 'rows': rows}, next_cursor
+    return [dict(zip(columns, row)) for row in rows], next_cursor
+
+def iter_filtered_student_rows(filters, batch_size=1000):
     """
-    Fetch complete student details with all fields from the database
+    Streams the full filtered student list for exports.
+    The first item yielded is the cursor description (column names and types), followed by batches of row tuples
+    read from an unbuffered cursor, so the result set is never held in memory at once.
     """
+    db_conn = None
+    cursor = None
     try:
-        print(f"DEBUG: Looking for student with {identifier_type} = {student_identifier}")
-        
         db_conn = get_db_connection()
-        cursor = db_conn.cursor(dictionary=True)
-        
-        # Query to get ALL fields from the students_details_master table
-        query = f"""
-            SELECT 
-                master_id, student_reference_id, institution_code, admission_no, 
-                admission_date, admission_feepayment_time, class, section, stream, 
-                batch_year, admission_scheme, pr_no, roll_number, student_name, 
-                gender, student_category, date_of_birth, religion, blood_group, 
-                email_address, full_address, city, state, pin_code, mobile_number, 
-                alt_mobile_number, fathers_mobile_number, mothers_mobile_number, 
-                fathers_name, fathers_occupation, mothers_name, mothers_occupation, 
-                fathers_occupation_category, mothers_occupation_category, nationality, 
-                mother_tongue, name_of_the_institution_attended_earlier, 
-                passsing_percentage, board_name, passing_year, xii_stream, 
-                xii_max_marks, xii_marks_obtained, xii_sub_combination, 
-                xii_passing_class, pwd_category_and_Percentage, urban_rural_category, 
-                created_at, is_active, updated_at, uploaded_file_id
-            FROM students_details_master 
-            WHERE {identifier_type} = %s
-        """
-        
-        cursor.execute(query, (student_identifier,))
-        student_data = cursor.fetchone()
-        
-        if student_data:
-            print(f"DEBUG: Found student: {student_data['student_name']}")
-            # Also fetch fee information if needed
-            fee_query = """
-                SELECT fees_trans_id, fees_paid_date, amt_paid, tot_amt, 
-                       payment_status, payment_mode, installment_no
-                FROM fees_transaction 
-                WHERE student_reference_id = %s OR master_id = %s
-                ORDER BY fees_paid_date DESC
-            """
-            cursor.execute(fee_query, (student_data.get('student_reference_id'), student_data.get('master_id')))
-            fees_data = cursor.fetchall()
-            
-            return {'details': student_data, 'fees': fees_data}
-        else:
-            print(f"DEBUG: No student found with {identifier_type} = {student_identifier}")
-            return None
-            
-    except Exception as e:
-        print(f"CRITICAL ERROR in get_student_details_with_fees: {str(e)}")
-        return None
+        cursor = db_conn.cursor()
+        query, params = _build_student_list_query(filters, is_full_list=True)
+        cursor.execute(query, params)
+        yield cursor.description
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
     finally:
-        if cursor: 
-            cursor.close()
-        if db_conn and db_conn.is_connected(): 
-            db_conn.close()
+        if cursor:
+            try:
+                cursor.close()
+            except mysql.connector.Error:
+                # The export was abandoned part way through; unread rows are dropped with the connection.
+                pass
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+def get_student_details_with_fees(student_identifier, identifier_type="student_reference_id", institution_code=None):
+    """
+    Fetch complete student details with the linked fee transactions, or None when no student matches.
+    See student_details_utils for batches of students.
+    """
+    return student_details_utils.get_student_profile(student_identifier, identifier_type, institution_code)
 
 def get_distinct_filter_values(column_name):
     db_conn = None
@@ -284,6 +357,9 @@ def get_distinct_filter_values(column_name):
         if db_conn and db_conn.is_connected(): db_conn.close()
 
 def export_students_to_excel(students):
+    # Imported here so pandas is only loaded when an export is requested.
+    import pandas as pd
+
     df = pd.DataFrame(students)
     output = io.BytesIO()
     with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
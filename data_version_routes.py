@@ -0,0 +1,115 @@
+"""
+Routes that tell the dashboard when the master tables change: the current data-version token and a
+Server-Sent Events stream announcing new versions, so clients re-query only after an upload or edit.
+"""
+import json
+import os
+import threading
+import time
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+import data_version_utils
+from auth_utils import apply_default_institution, token_required
+
+data_version_bp = Blueprint('data_version', __name__)
+
+# An open stream holds a worker thread (gthread) for as long as the client stays connected. It checks the
+# version every STREAM_POLL_SECONDS (the version itself is cached for data_version_utils.DATA_VERSION_TTL
+# seconds) and writes an event or a keep-alive comment each time, so a client that went away is noticed
+# on the next write and its thread released. Streams end after STREAM_MAX_SECONDS; clients reconnect with
+# ?since=<last version>. At most DATA_VERSION_STREAM_LIMIT streams are open per worker process, so open
+# dashboard tabs cannot take every thread; further clients get 503 and retry later.
+STREAM_POLL_SECONDS = 5
+STREAM_MAX_SECONDS = 300
+DATA_VERSION_STREAM_LIMIT = int(os.environ.get('DATA_VERSION_STREAM_LIMIT', 4))
+STREAM_BUSY_RETRY_SECONDS = 60
+
+_open_streams = 0
+_open_streams_lock = threading.Lock()
+
+
+def _acquire_stream_slot():
+    global _open_streams
+    with _open_streams_lock:
+        if _open_streams >= DATA_VERSION_STREAM_LIMIT:
+            return False
+        _open_streams += 1
+        return True
+
+
+def _release_stream_slot():
+    global _open_streams
+    with _open_streams_lock:
+        _open_streams -= 1
+
+
+def _requested_institution():
+    """institution_code from the query (the user's institution by default); None means all institutions."""
+    institution_code = apply_default_institution({'institution_code': request.args.get('institution_code')})['institution_code']
+    return None if institution_code in (None, '', 'all') else institution_code
+
+
+def _version_payload(institution_code, version):
+    upload_id, students_updated, fees_updated = data_version_utils.parse_data_version(version)
+    return {
+        'institution_code': institution_code or 'all',
+        'version': version,
+        'upload_id': upload_id,
+        'students_updated_at': students_updated,
+        'fees_updated_at': fees_updated,
+    }
+
+
+@data_version_bp.route('/api/data-version', methods=['GET'])
+@token_required
+def get_data_version():
+    try:
+        institution_code = _requested_institution()
+        version = data_version_utils.get_data_version(institution_code)
+        return jsonify(_version_payload(institution_code, version))
+    except Exception as e:
+        print(f"Data Version Error: {e}")
+        return jsonify({'error': 'Could not fetch data version.'}), 500
+
+
+@data_version_bp.route('/api/data-version/stream', methods=['GET'])
+@token_required
+def stream_data_version():
+    """
+    text/event-stream of 'data-version' events, one whenever the institution's version changes.
+    The current version is sent on connect unless it equals ?since= (or Last-Event-ID).
+    """
+    institution_code = _requested_institution()
+    last_version = request.args.get('since') or request.headers.get('Last-Event-ID')
+    if not _acquire_stream_slot():
+        response = jsonify({'error': 'Too many open data version streams; retry later.'})
+        response.headers['Retry-After'] = str(STREAM_BUSY_RETRY_SECONDS)
+        return response, 503
+
+    def events(last_version):
+        yield f"retry: {STREAM_POLL_SECONDS * 1000}\n\n"
+        started = time.monotonic()
+        while time.monotonic() - started < STREAM_MAX_SECONDS:
+            try:
+                version = data_version_utils.get_data_version(institution_code)
+            except Exception as e:
+                print(f"Data Version Stream Error: {e}")
+                yield f"event: error\ndata: {json.dumps({'error': 'Could not fetch data version.'})}\n\n"
+                return
+
+            if version != last_version:
+                last_version = version
+                yield f"id: {version}\nevent: data-version\ndata: {json.dumps(_version_payload(institution_code, version))}\n\n"
+            else:
+                # Written on every poll: writing to a closed connection is how a disconnect is detected
+                yield ": keep-alive\n\n"
+            time.sleep(STREAM_POLL_SECONDS)
+
+    response = Response(stream_with_context(events(last_version)), mimetype='text/event-stream')
+    # Runs when the server closes the response, including when the client disconnected before the first write
+    response.call_on_close(_release_stream_slot)
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stops nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,82 @@
+"""
+This module computes a data-version token for the master tables. The token changes whenever a new file
+is uploaded or a student/fee record is updated, so it can be used to key caches of derived data
+(exports, dashboard payloads) without re-running the underlying queries.
+"""
+import threading
+import time
+
+from db_utils import get_db_connection
+
+# How long a computed token is trusted before the database is asked again (seconds).
+# Writes made through this process invalidate the token immediately.
+DATA_VERSION_TTL = 30
+
+_version_cache = {}
+_version_lock = threading.Lock()
+
+
+def _query_data_version(institution_code=None):
+    """Reads the upload and updated_at watermarks, optionally for a single institution."""
+    db_conn = None
+    cursor = None
+    try:
+        db_conn = get_db_connection()
+        cursor = db_conn.cursor()
+
+        where_clause = ""
+        params = ()
+        if institution_code:
+            where_clause = "WHERE institution_code = %s"
+            params = (institution_code,)
+
+        query = f"""
+            SELECT
+                (SELECT MAX(upload_id) FROM user_upload_details {where_clause}),
+                (SELECT UNIX_TIMESTAMP(MAX(updated_at)) FROM students_details_master {where_clause}),
+                (SELECT UNIX_TIMESTAMP(MAX(updated_at)) FROM student_fee_transactions {where_clause})
+        """
+        cursor.execute(query, params * 3)
+        max_upload_id, students_updated, fees_updated = cursor.fetchone()
+        return f"{max_upload_id or 0}-{int(students_updated or 0)}-{int(fees_updated or 0)}"
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+
+def get_data_version(institution_code=None):
+    """
+    Returns the data-version token for one institution, or for all data when no institution is given.
+    Tokens are cached in-process for DATA_VERSION_TTL seconds.
+    """
+    if institution_code == 'all':
+        institution_code = None
+
+    now = time.monotonic()
+    with _version_lock:
+        cached = _version_cache.get(institution_code)
+        if cached and cached[1] > now:
+            return cached[0]
+
+    version = _query_data_version(institution_code)
+    with _version_lock:
+        _version_cache[institution_code] = (version, now + DATA_VERSION_TTL)
+    return version
+
+
+def parse_data_version(version):
+    """
+    Splits a token into (max upload id, students updated_at, fees updated_at), the timestamps as unix seconds.
+    Raises ValueError for anything that is not a token from get_data_version.
+    """
+    try:
+        upload_id, students_updated, fees_updated = (int(part) for part in str(version).split('-'))
+    except ValueError:
+        raise ValueError("since must be a data version returned by /api/data-version.")
+    return upload_id, students_updated, fees_updated
+
+
+def invalidate_data_version():
+    """Drops all cached tokens. Call after committing writes to the master tables."""
+    with _version_lock:
+        _version_cache.clear()
@@ -0,0 +1,162 @@
+"""
+Routes for the database viewer: table schema, paginated and searchable table data and single-record edits.
+"""
+import mysql.connector
+from flask import Blueprint, jsonify, request
+
+import data_version_utils
+import fees_dashboard_utils
+from auth_utils import token_required
+from db_utils import get_db_connection
+
+data_viewer_bp = Blueprint('data_viewer', __name__)
+
+@data_viewer_bp.route('/api/table-schema/<table_name>', methods=['GET'])
+@token_required
+def get_table_schema(table_name):
+    """Gets the column names for a given table."""
+    if table_name not in ['students_details_master', 'student_fee_transactions']:
+        return jsonify({'error': 'Invalid table name'}), 400
+    
+    db_conn = None
+    cursor = None
+    try:
+        db_conn = get_db_connection()
+        cursor = db_conn.cursor()
+        cursor.execute(f"SHOW COLUMNS FROM {table_name}")
+        columns = [row[0] for row in cursor.fetchall()]
+        
+        return jsonify(columns)
+    except Exception as e:
+        print(f"Schema Fetch Error: {e}")
+        return jsonify({'error': 'Could not fetch table schema.'}), 500
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+
+@data_viewer_bp.route('/api/table-data/<table_name>', methods=['GET'])
+@token_required
+def get_table_data(table_name):
+    """Fetches paginated and searchable data from the specified table."""
+    if table_name not in ['students_details_master', 'student_fee_transactions']:
+        return jsonify({'error': 'Invalid table name'}), 400
+    
+    page = request.args.get('page', 1, type=int)
+    limit = request.args.get('limit', 20, type=int)
+    search_term = request.args.get('search', '')
+    search_column = request.args.get('column', '')
+    offset = (page - 1) * limit
+
+    db_conn = None
+    cursor = None
+    try:
+        db_conn = get_db_connection()
+        cursor = db_conn.cursor(dictionary=True)
+
+        # Base queries
+        count_query = f"SELECT COUNT(*) as total FROM {table_name}"
+        data_query = f"SELECT * FROM {table_name}"
+
+        where_clauses = []
+        params = []
+
+        # Handle search logic
+        if search_term:
+            search_like_term = f"%{search_term}%"
+            if search_column:
+                where_clauses.append(f"{search_column} LIKE %s")
+                params.append(search_like_term)
+            else:
+                cursor.execute(f"SHOW COLUMNS FROM {table_name}")
+                columns = [row['Field'] for row in cursor.fetchall()]
+                search_clauses = [f"{col} LIKE %s" for col in columns]
+                where_clauses.append(f"({' OR '.join(search_clauses)})")
+                params.extend([search_like_term] * len(columns))
+        
+        if where_clauses:
+            query_where_part = " WHERE " + " AND ".join(where_clauses)
+            count_query += query_where_part
+            data_query += query_where_part
+
+        # Get total count for pagination
+        cursor.execute(count_query, params)
+        total_records = cursor.fetchone()['total']
+        
+        # Add ordering and pagination
+        id_column = 'master_id' if table_name == 'students_details_master' else 'fees_trans_id'
+        data_query += f" ORDER BY {id_column} DESC LIMIT %s OFFSET %s"
+        params.extend([limit, offset])
+        
+        cursor.execute(data_query, params)
+        data = cursor.fetchall()
+
+        # Dates and TIME values are encoded by the app's JSON provider (json_utils)
+        return jsonify({
+            'data': data,
+            'total': total_records,
+            'page': page,
+            'limit': limit
+        })
+
+    except mysql.connector.Error as err:
+        print(f"Data Fetch Error: {err}")
+        return jsonify({'error': f'Database error: {err.msg}'}), 500
+    except Exception as e:
+        print(f"Data Fetch Error: {e}")
+        return jsonify({'error': 'Could not fetch data.'}), 500
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+
+@data_viewer_bp.route('/api/update-record/<table_name>', methods=['POST'])
+@token_required
+def update_record(table_name):
+    """Updates a single record in a table."""
+    if table_name not in ['students_details_master', 'student_fee_transactions']:
+        return jsonify({'error': 'Invalid table name'}), 400
+    
+    data = request.get_json()
+    record_id = data.get('id')
+    column = data.get('column')
+    value = data.get('value')
+    
+    # Allow empty strings
+    if not all([record_id, column]) or value is None:
+         return jsonify({'error': 'Missing data for update'}), 400
+
+    db_conn = None
+    cursor = None
+    try:
+        db_conn = get_db_connection()
+        cursor = db_conn.cursor()
+        
+        id_column = 'master_id' if table_name == 'students_details_master' else 'fees_trans_id'
+
+        updates_revenue = table_name == 'student_fee_transactions' and column in fees_dashboard_utils.FEE_REVENUE_COLUMNS
+        previous_dates = fees_dashboard_utils.fee_revenue_dates(cursor, [record_id]) if updates_revenue else set()
+
+        query = f"UPDATE {table_name} SET {column} = %s WHERE {id_column} = %s"
+        cursor.execute(query, (value, record_id))
+        if table_name == 'student_fee_transactions' and column in fees_dashboard_utils.FEE_COMPONENTS:
+            fees_dashboard_utils.sync_fee_component_lines(cursor, [record_id])
+        if updates_revenue:
+            fees_dashboard_utils.refresh_fee_revenue_daily(cursor, [record_id], previous_dates)
+        db_conn.commit()
+        data_version_utils.invalidate_data_version()
+
+        return jsonify({'message': 'Record updated successfully'}), 200
+
+    except mysql.connector.Error as err:
+        print(f"Record Update Error: {err}")
+        db_conn.rollback()
+        return jsonify({'error': f"Failed to update record: {err.msg}"}), 500
+    except Exception as e:
+        print(f"Record Update Error: {e}")
+        db_conn.rollback()
+        return jsonify({'error': 'Failed to update record.'}), 500
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
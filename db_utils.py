@@ -0,0 +1,305 @@
+"""
+This module holds the shared database configuration and connection helper. Connections returned by
+get_db_connection() hand out instrumented cursors that time every statement, count the rows it returns,
+feed the query histograms in metrics_utils and write statements slower than SLOW_QUERY_MS to the
+slow-query log. run_queries() fans independent read queries out over pooled connections on a thread pool.
+"""
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+from mysql.connector import pooling
+from flask import g, has_request_context, request
+
+import metrics_utils
+import tracing_utils
+
+# --- Database Connection ---
+DB_CONFIG = {
+    'host': 'localhost',
+    'user': 'root',
+    'password': '',
+    'database': 'new_VVM_Process_db'
+}
+
+# Connections kept open per worker process for run_queries(). When the pool is exhausted, extra
+# connections are opened (and closed) as usual instead of waiting for one to be returned.
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 8))
+# Threads per process that run independent dashboard queries at the same time. 1 runs them serially.
+DASHBOARD_QUERY_WORKERS = int(os.environ.get('DASHBOARD_QUERY_WORKERS', 4))
+
+# Statements slower than this (milliseconds) are written to the slow-query log.
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 500))
+SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'slow_queries.log'))
+# The longest statement text kept in metric labels and log lines.
+MAX_STATEMENT_LENGTH = 500
+
+QUERY_DURATION = metrics_utils.histogram(
+    'db_query_duration_seconds', "Time spent executing a statement and fetching its rows.", ('query',))
+QUERY_ROWS = metrics_utils.counter(
+    'db_query_rows_total', "Rows fetched, per statement template.", ('query',))
+QUERY_ERRORS = metrics_utils.counter(
+    'db_query_errors_total', "Statements that raised a database error.", ('query',))
+QUERY_INFO = metrics_utils.counter(
+    'db_query_statements_total', "Executions per statement template, with the normalized SQL.", ('query', 'statement'))
+
+slow_query_logger = logging.getLogger('vvm.slow_query')
+slow_query_logger.propagate = False
+
+
+def _get_slow_query_logger():
+    if not slow_query_logger.handlers:
+        handler = logging.FileHandler(SLOW_QUERY_LOG, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        slow_query_logger.addHandler(handler)
+        slow_query_logger.setLevel(logging.INFO)
+    return slow_query_logger
+
+
+# --- SQL normalization ---
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\(\s*(?:\?\s*,\s*)+\?\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_sql(statement):
+    """Turns a statement into a template: literals and placeholders become '?', IN lists collapse to one entry."""
+    if isinstance(statement, (bytes, bytearray)):
+        statement = statement.decode('utf-8', errors='replace')
+    sql = _STRING_LITERAL.sub('?', statement)
+    sql = sql.replace('%s', '?')
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub('IN (?)', sql)
+    sql = _WHITESPACE.sub(' ', sql).strip()
+    return sql[:MAX_STATEMENT_LENGTH]
+
+
+def query_fingerprint(template):
+    return hashlib.sha1(template.encode('utf-8')).hexdigest()[:12]
+
+
+# --- Instrumented cursor ---
+class InstrumentedCursor:
+    """
+    Wraps a mysql.connector cursor. Time is measured from execute() until the result set has been read
+    (or the next execute()/close()), so unbuffered cursors are not under-reported.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._statement = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def _begin(self, operation, params):
+        self._finish()
+        self._statement = {'sql': operation, 'params': params, 'elapsed': 0.0, 'rows': 0}
+
+    def _finish(self):
+        statement = self._statement
+        if statement is None:
+            return
+        self._statement = None
+        record_query(statement['sql'], statement['params'], statement['elapsed'], statement['rows'])
+
+    def _timed(self, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except mysql.connector.Error:
+            if self._statement is not None:
+                QUERY_ERRORS.inc((query_fingerprint(normalize_sql(self._statement['sql'])),))
+            raise
+        finally:
+            if self._statement is not None:
+                self._statement['elapsed'] += time.perf_counter() - start
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._begin(operation, params)
+        return self._timed(self._cursor.execute, operation, params, *args, **kwargs)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        self._begin(operation, None)
+        return self._timed(self._cursor.executemany, operation, seq_params, *args, **kwargs)
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is None:
+            self._finish()
+        elif self._statement is not None:
+            self._statement['rows'] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(self._cursor.fetchmany, size) if size is not None else self._timed(self._cursor.fetchmany)
+        if not rows:
+            self._finish()
+        elif self._statement is not None:
+            self._statement['rows'] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        if self._statement is not None:
+            self._statement['rows'] += len(rows)
+        self._finish()
+        return rows
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+
+class InstrumentedConnection:
+    """Wraps a mysql.connector connection so that cursor() returns an InstrumentedCursor."""
+
+    def __init__(self, connection):
+        object.__setattr__(self, '_connection', connection)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __setattr__(self, name, value):
+        # e.g. db_conn.autocommit = False
+        setattr(self._connection, name, value)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._connection.cursor(*args, **kwargs))
+
+
+def record_query(sql, params, elapsed, rows):
+    """Records one finished statement in the metrics, the per-request query list and the slow-query log."""
+    template = normalize_sql(sql)
+    fingerprint = query_fingerprint(template)
+    QUERY_DURATION.observe((fingerprint,), elapsed)
+    QUERY_ROWS.inc((fingerprint,), rows)
+    QUERY_INFO.inc((fingerprint, template))
+
+    tracing_utils.add_span('query', elapsed, query=fingerprint, rows=rows)
+    if has_request_context():
+        if 'db_queries' not in g:
+            g.db_queries = []
+        g.db_queries.append({'query': fingerprint, 'statement': template, 'elapsed': elapsed, 'rows': rows})
+
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'duration_ms': round(elapsed * 1000, 1),
+            'rows': rows,
+            'query': fingerprint,
+            'statement': template,
+            'params': _loggable_params(params),
+        }
+        if has_request_context():
+            entry['path'] = request.path
+            entry['args'] = request.args.to_dict()
+        try:
+            _get_slow_query_logger().info(json.dumps(entry, default=str))
+        except OSError as e:
+            print(f"Could not write slow-query log: {e}")
+
+
+def _loggable_params(params):
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {k: str(v)[:100] for k, v in params.items()}
+    return [str(v)[:100] for v in params]
+
+
+def get_db_connection():
+    """Establishes a connection to the MySQL database."""
+    with tracing_utils.span('db_connect'):
+        return InstrumentedConnection(mysql.connector.connect(**DB_CONFIG))
+
+
+# --- Pooled connections and concurrent queries ---
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+_query_executor = None
+
+
+def _get_pool():
+    """Creates the pool on first use in each process, so gunicorn workers never share the master's sockets."""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = pooling.MySQLConnectionPool(pool_name=f'vvm-{os.getpid()}', pool_size=DB_POOL_SIZE, **DB_CONFIG)
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def get_pooled_connection():
+    """Takes a connection from the per-process pool; close() returns it to the pool."""
+    # Timed by hand rather than with tracing_utils.span(): this runs on query threads, which must not push
+    # onto the request's span stack.
+    start = time.perf_counter()
+    try:
+        connection = _get_pool().get_connection()
+        pooled = True
+    except mysql.connector.errors.PoolError:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        pooled = False
+    tracing_utils.add_span('db_connect', time.perf_counter() - start, pooled=pooled)
+    return InstrumentedConnection(connection)
+
+
+def _get_query_executor():
+    global _query_executor
+    with _pool_lock:
+        if _query_executor is None:
+            _query_executor = ThreadPoolExecutor(max_workers=DASHBOARD_QUERY_WORKERS, thread_name_prefix='db-query')
+        return _query_executor
+
+
+def _run_on_pooled_connection(func):
+    db_conn = None
+    cursor = None
+    try:
+        db_conn = get_pooled_connection()
+        cursor = db_conn.cursor(dictionary=True)
+        return func(cursor)
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+
+def run_queries(tasks):
+    """
+    Runs independent read queries and returns {key: result}. tasks maps a key to a function that takes a
+    dictionary cursor. With DASHBOARD_QUERY_WORKERS > 1 every task gets its own pooled connection and the
+    tasks run on the query thread pool, so the wall-clock time approaches that of the slowest query.
+    Otherwise they run one after another on a single connection.
+    """
+    if DASHBOARD_QUERY_WORKERS <= 1 or len(tasks) <= 1:
+        db_conn = None
+        cursor = None
+        try:
+            db_conn = get_db_connection()
+            cursor = db_conn.cursor(dictionary=True)
+            return {key: func(cursor) for key, func in tasks.items()}
+        finally:
+            if cursor: cursor.close()
+            if db_conn and db_conn.is_connected(): db_conn.close()
+
+    executor = _get_query_executor()
+    with tracing_utils.span('concurrent_queries', tasks=len(tasks)):
+        # Each task runs in a copy of the caller's context so the request's g, metrics and trace are visible.
+        futures = {
+            key: executor.submit(contextvars.copy_context().run, _run_on_pooled_connection, func)
+            for key, func in tasks.items()
+        }
+        return {key: future.result() for key, future in futures.items()}
@@ -0,0 +1,139 @@
+"""
+Routes for exporting the filtered student and transaction lists: direct Excel export of posted rows,
+streamed exports straight from the database and background export jobs.
+"""
+from flask import Blueprint, Response, jsonify, request, send_file, stream_with_context
+
+import dashboard_utils
+import data_version_utils
+import export_utils
+import fees_dashboard_utils
+from auth_utils import apply_default_institution, token_required
+
+exports_bp = Blueprint('exports', __name__)
+
+@exports_bp.route('/api/export/excel', methods=['POST'])
+@token_required
+def export_excel():
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No data provided for export'}), 400
+        
+        excel_file = dashboard_utils.export_students_to_excel(data)
+        return send_file(
+            excel_file,
+            as_attachment=True,
+            download_name='export_data.xlsx',
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+    except Exception as e:
+        return jsonify({'error': 'Failed to export data.'}), 500
+
+# Datasets that can be exported from the database: (row source, worksheet name)
+EXPORT_ROW_SOURCES = {
+    'students': (dashboard_utils.iter_filtered_student_rows, 'Students'),
+    'transactions': (fees_dashboard_utils.iter_filtered_transaction_rows, 'Transactions'),
+}
+
+@exports_bp.route('/api/export/stream/<dataset>', methods=['GET'])
+@token_required
+def export_filtered_data(dataset):
+    """
+    Exports the full filtered student or transaction list straight from the database.
+    Takes the same filters as the list endpoints plus `format` (xlsx or csv) and streams
+    the file as a chunked response, so the client never has to download and re-upload the rows.
+    """
+    if dataset not in EXPORT_ROW_SOURCES:
+        return jsonify({'error': 'Invalid export dataset'}), 400
+
+    try:
+        filters = apply_default_institution({key: request.args.get(key) for key in request.args})
+        export_format = filters.pop('format', 'xlsx')
+        # Handle empty date parameters
+        if 'start_date' in filters and filters['start_date'] == '':
+            del filters['start_date']
+        if 'end_date' in filters and filters['end_date'] == '':
+            del filters['end_date']
+
+        iter_rows, sheet_name = EXPORT_ROW_SOURCES[dataset]
+        mimetype, extension, chunks = export_utils.stream_export(iter_rows(filters), export_format, sheet_name)
+
+        filename = f"{dataset}_export.{extension}"
+        response = Response(stream_with_context(chunks), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        print(f"Streaming Export Error: {e}")
+        return jsonify({'error': 'Failed to export data.'}), 500
+
+def _export_job_response(job):
+    return {
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'format': job['format'],
+        'cache_hit': job['cache_hit'],
+        'error': job['error'],
+    }
+
+@exports_bp.route('/api/export/jobs', methods=['POST'])
+@token_required
+def create_export_job():
+    """
+    Queues a background export of the filtered student or transaction list and returns a job id.
+    Body: {"dataset": "students" | "transactions", "format": "xlsx" | "csv", "filters": {...}}
+    """
+    data = request.get_json() or {}
+    dataset = data.get('dataset')
+    export_format = data.get('format', 'xlsx')
+    filters = apply_default_institution(
+        {key: value for key, value in (data.get('filters') or {}).items() if value not in (None, '')})
+
+    if dataset not in EXPORT_ROW_SOURCES:
+        return jsonify({'error': 'Invalid export dataset'}), 400
+
+    try:
+        iter_rows, sheet_name = EXPORT_ROW_SOURCES[dataset]
+        data_version = data_version_utils.get_data_version(filters.get('institution_code'))
+        job = export_utils.submit_export_job(
+            dataset, export_format, filters, data_version,
+            lambda: iter_rows(filters), sheet_name
+        )
+        return jsonify(_export_job_response(job)), 200 if job['status'] == 'done' else 202
+    except ValueError as ve:
+        return jsonify({'error': str(ve)}), 400
+    except Exception as e:
+        print(f"Export Job Error: {e}")
+        return jsonify({'error': 'Failed to queue export.'}), 500
+
+@exports_bp.route('/api/export/jobs/<job_id>', methods=['GET'])
+@token_required
+def get_export_job_status(job_id):
+    job = export_utils.get_export_job(job_id)
+    if not job:
+        return jsonify({'error': 'Export job not found'}), 404
+    return jsonify(_export_job_response(job))
+
+@exports_bp.route('/api/export/jobs/<job_id>/download', methods=['GET'])
+@token_required
+def download_export_job(job_id):
+    job = export_utils.get_export_job(job_id)
+    if not job:
+        return jsonify({'error': 'Export job not found'}), 404
+    if job['status'] != 'done':
+        return jsonify(_export_job_response(job)), 409
+
+    mimetype, extension = export_utils.EXPORT_FORMATS[job['format']]
+    # send_file hands the open file to the WSGI server, which can use sendfile() for it.
+    response = send_file(
+        job['path'],
+        as_attachment=True,
+        download_name=f"{job['dataset'] or 'data'}_export.{extension}",
+        mimetype=mimetype
+    )
+    return response
+
+
+#-----------------------------dashboard ends-----------------------------------------------------------
@@ -0,0 +1,368 @@
+"""
+This module contains helper functions for writing exports (CSV, Excel, Parquet and Arrow) from batches of
+database rows. The writers consume the (cursor description, row batches...) sequence produced by the
+iter_filtered_*_rows functions in dashboard_utils and fees_dashboard_utils, so exports never build a full
+in-memory copy of the data.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mysql.connector import FieldType
+
+# pyarrow is optional; the Parquet and Arrow formats are only available when it is installed.
+# It is slow to import, so it is loaded by _require_pyarrow on the first Parquet or Arrow export.
+pa = None
+pq = None
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+ARROW_FORMATS = ('parquet', 'arrow')
+
+# Column widths are estimated from the data while streaming and capped so free-text columns stay readable.
+MAX_COLUMN_WIDTH = 60
+FILE_CHUNK_SIZE = 64 * 1024
+
+# --- Background export jobs ---
+# Finished exports are kept in a local artifact directory, keyed by a hash of the export
+# request and the data version, so repeated exports of unchanged data are served from disk.
+EXPORT_CACHE_DIR = os.environ.get('EXPORT_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'export_cache'))
+EXPORT_CACHE_MAX_AGE = int(os.environ.get('EXPORT_CACHE_MAX_AGE', 24 * 60 * 60))
+EXPORT_JOB_WORKERS = int(os.environ.get('EXPORT_JOB_WORKERS', 2))
+
+_job_executor = ThreadPoolExecutor(max_workers=EXPORT_JOB_WORKERS, thread_name_prefix='export-job')
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def _column_names(description):
+    return [col[0] for col in description]
+
+
+def stream_csv(columns, row_batches):
+    """Yields the export as UTF-8 encoded CSV chunks, one chunk per batch of rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    # The BOM lets Excel detect UTF-8 when the CSV is opened directly.
+    buffer.write('\ufeff')
+    writer.writerow(columns)
+    for rows in row_batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    remaining = buffer.getvalue()
+    if remaining:
+        yield remaining.encode('utf-8')
+
+
+def write_excel(columns, row_batches, output_path, sheet_name='Export'):
+    """
+    Writes the rows to an .xlsx file using xlsxwriter's constant_memory mode, which flushes
+    each row to disk as it is written. Column widths are tracked while writing instead of
+    being computed from a DataFrame afterwards.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(output_path, {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd',
+        'strings_to_urls': False,
+    })
+    try:
+        worksheet = workbook.add_worksheet(sheet_name)
+        header_format = workbook.add_format({'bold': True})
+        widths = [len(str(col)) for col in columns]
+
+        worksheet.write_row(0, 0, columns, header_format)
+        row_idx = 1
+        for rows in row_batches:
+            for row in rows:
+                for col_idx, value in enumerate(row):
+                    if value is None:
+                        continue
+                    worksheet.write(row_idx, col_idx, value)
+                    value_len = len(str(value))
+                    if value_len > widths[col_idx]:
+                        widths[col_idx] = value_len
+                row_idx += 1
+
+        for col_idx, width in enumerate(widths):
+            worksheet.set_column(col_idx, col_idx, min(width, MAX_COLUMN_WIDTH) + 2)
+    finally:
+        workbook.close()
+
+
+# --- Arrow / Parquet ---
+_ARROW_INTEGER_TYPES = {'TINY', 'SHORT', 'LONG', 'LONGLONG', 'INT24', 'YEAR', 'BIT'}
+_ARROW_FLOAT_TYPES = {'DECIMAL', 'NEWDECIMAL', 'FLOAT', 'DOUBLE'}
+
+
+def _arrow_type(type_code):
+    """Maps a MySQL column type from the cursor description to an Arrow type."""
+    type_name = FieldType.get_info(type_code)
+    if type_name in _ARROW_INTEGER_TYPES:
+        return pa.int64()
+    if type_name in _ARROW_FLOAT_TYPES:
+        # DECIMAL amounts are sent as floats, matching the JSON API.
+        return pa.float64()
+    if type_name in ('DATE', 'NEWDATE'):
+        return pa.date32()
+    if type_name in ('DATETIME', 'TIMESTAMP'):
+        return pa.timestamp('us')
+    if type_name == 'TIME':
+        return pa.duration('us')
+    return pa.string()
+
+
+def _arrow_schema(description):
+    return pa.schema([pa.field(col[0], _arrow_type(col[1])) for col in description])
+
+
+def _arrow_record_batch(schema, rows):
+    """Transposes one batch of row tuples into an Arrow record batch."""
+    columns = list(zip(*rows))
+    arrays = []
+    for field, values in zip(schema, columns):
+        if pa.types.is_floating(field.type):
+            values = [None if v is None else float(v) for v in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _require_pyarrow(export_format):
+    global pa, pq
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ValueError(f"The '{export_format}' export format requires pyarrow, which is not installed on the server.")
+        pa, pq = pyarrow, pyarrow.parquet
+
+
+def stream_arrow(description, row_batches):
+    """Yields the export in the Arrow IPC streaming format, one record batch per batch of rows."""
+    _require_pyarrow('arrow')
+    schema = _arrow_schema(description)
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+    for rows in row_batches:
+        writer.write_batch(_arrow_record_batch(schema, rows))
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate(0)
+    writer.close()
+    yield sink.getvalue()
+
+
+def write_parquet(description, row_batches, output_path):
+    """Writes the rows to a Parquet file, one row group per batch of rows."""
+    _require_pyarrow('parquet')
+    schema = _arrow_schema(description)
+    writer = pq.ParquetWriter(output_path, schema)
+    try:
+        for rows in row_batches:
+            writer.write_batch(_arrow_record_batch(schema, rows))
+    finally:
+        writer.close()
+
+
+def write_export_file(description, row_batches, export_format, output_path, sheet_name='Export'):
+    """Writes a complete export file in the given format."""
+    if export_format == 'csv':
+        with open(output_path, 'wb') as f:
+            for chunk in stream_csv(_column_names(description), row_batches):
+                f.write(chunk)
+    elif export_format == 'xlsx':
+        write_excel(_column_names(description), row_batches, output_path, sheet_name)
+    elif export_format == 'parquet':
+        write_parquet(description, row_batches, output_path)
+    else:
+        with open(output_path, 'wb') as f:
+            for chunk in stream_arrow(description, row_batches):
+                f.write(chunk)
+
+
+def _stream_via_file(description, row_batches, export_format, sheet_name):
+    """
+    Builds formats that can only be sent once complete (.xlsx is a zip archive, Parquet has a footer)
+    in a temporary file and then yields it in chunks. The temporary file is removed afterwards.
+    """
+    fd, path = tempfile.mkstemp(suffix=f".{EXPORT_FORMATS[export_format][1]}")
+    os.close(fd)
+    try:
+        write_export_file(description, row_batches, export_format, path, sheet_name)
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(FILE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
+
+
+def _check_export_format(export_format):
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}.")
+    if export_format in ARROW_FORMATS:
+        _require_pyarrow(export_format)
+
+
+def stream_export(row_source, export_format, sheet_name='Export'):
+    """
+    Returns (mimetype, file_extension, chunk_generator) for the given row source.
+    The first item of the row source (the cursor description) is read eagerly so that query errors
+    surface before the response starts streaming.
+    """
+    _check_export_format(export_format)
+
+    description = next(row_source)
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    if export_format == 'csv':
+        chunks = stream_csv(_column_names(description), row_source)
+    elif export_format == 'arrow':
+        chunks = stream_arrow(description, row_source)
+    else:
+        chunks = _stream_via_file(description, row_source, export_format, sheet_name)
+    return mimetype, extension, chunks
+
+
+def _artifact_key(dataset, export_format, filters, data_version):
+    payload = json.dumps({
+        'dataset': dataset,
+        'format': export_format,
+        'filters': filters,
+        'data_version': data_version,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _artifact_path(job_id, export_format):
+    return os.path.join(EXPORT_CACHE_DIR, f"{job_id}.{EXPORT_FORMATS[export_format][1]}")
+
+
+def _prune_artifacts():
+    """Removes artifacts and finished job records older than EXPORT_CACHE_MAX_AGE; stale data versions age out this way."""
+    cutoff = time.time() - EXPORT_CACHE_MAX_AGE
+    for name in os.listdir(EXPORT_CACHE_DIR):
+        path = os.path.join(EXPORT_CACHE_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+    with _jobs_lock:
+        for job_id in [job_id for job_id, job in _jobs.items() if job['finished_at'] and job['finished_at'] < cutoff]:
+            del _jobs[job_id]
+
+
+def _run_export_job(job_id, row_source, sheet_name):
+    with _jobs_lock:
+        job = _jobs[job_id]
+        job['status'] = 'running'
+
+    # Write to a temporary name first so a half-written file is never served from the cache.
+    fd, tmp_path = tempfile.mkstemp(dir=EXPORT_CACHE_DIR, suffix='.part')
+    os.close(fd)
+    try:
+        description = next(row_source)
+        write_export_file(description, row_source, job['format'], tmp_path, sheet_name)
+        os.replace(tmp_path, job['path'])
+        status, error = 'done', None
+    except Exception as e:
+        print(f"Export job {job_id} failed: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        status, error = 'failed', str(e)
+
+    with _jobs_lock:
+        job.update(status=status, error=error, finished_at=time.time())
+
+
+def submit_export_job(dataset, export_format, filters, data_version, row_source_factory, sheet_name='Export'):
+    """
+    Queues an export and returns its job record. The job id is the artifact key, so an identical
+    request for unchanged data gets the same job: it is completed immediately when the artifact is
+    already on disk, and joins the running job when it is still being produced.
+    row_source_factory is only called when the export actually has to be produced.
+    """
+    _check_export_format(export_format)
+
+    os.makedirs(EXPORT_CACHE_DIR, exist_ok=True)
+    _prune_artifacts()
+
+    job_id = _artifact_key(dataset, export_format, filters, data_version)
+    path = _artifact_path(job_id, export_format)
+
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job and job['status'] in ('queued', 'running'):
+            return dict(job)
+
+        job = {
+            'job_id': job_id,
+            'dataset': dataset,
+            'format': export_format,
+            'path': path,
+            'status': 'queued',
+            'cache_hit': False,
+            'error': None,
+            'created_at': time.time(),
+            'finished_at': None,
+        }
+        _jobs[job_id] = job
+
+        if os.path.exists(path):
+            # Refresh the mtime so frequently requested artifacts are not pruned.
+            os.utime(path)
+            job.update(status='done', cache_hit=True, finished_at=job['created_at'])
+            return dict(job)
+
+    _job_executor.submit(_run_export_job, job_id, row_source_factory(), sheet_name)
+    return dict(job)
+
+
+def get_export_job(job_id):
+    """
+    Returns a copy of the job record. Jobs started by another worker process are still found
+    through their artifact on disk once they have finished.
+    """
+    if not re.fullmatch(r'[0-9a-f]{64}', job_id or ''):
+        return None
+
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job:
+            return dict(job)
+
+    for export_format in EXPORT_FORMATS:
+        path = _artifact_path(job_id, export_format)
+        if os.path.exists(path):
+            return {
+                'job_id': job_id,
+                'dataset': None,
+                'format': export_format,
+                'path': path,
+                'status': 'done',
+                'cache_hit': True,
+                'error': None,
+                'created_at': None,
+                'finished_at': os.path.getmtime(path),
+            }
+    return None
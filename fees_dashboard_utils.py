@@ -1,33 +1,120 @@
+import os
+import time
+from operator import itemgetter
+
 import mysql.connector
 from datetime import date, datetime, timedelta
 from decimal import Decimal
 
 
+# Fee component columns of student_fee_transactions, shared by the dashboard and the list/export queries
+FEE_COMPONENTS = [
+    'tuition_fees', 'term_fees', 'library_fees', 'gymkhana_fees', 'other_fees',
+    'examination_fees', 'development_fees', 'registration_fees', 'laboratory_fee',
+    'pupils_fund', 'activity_fees', 'admission_fees', 'development_fund',
+    'refundable_deposit', 'general_deposit', 'enrolment_fee', 'laboratory_deposit',
+    'uni_registration_fees', 'student_aid_fees', 'library_deposit',
+    'caution_money_deposit', 'lab_fees', 'uni_administration_fees',
+    'it_fees', 'pta_fees', 'university_registration_fees', 'laboratory_fees',
+    'university_administration_fees', 'library_id_card_etc', 'computer_lab_fees',
+    'information_technology_fees', 'iaims_fees_dhe', 'iams_fees',
+    'alumni_registration_fees', 'academic_restructuring_and_development_fees',
+    'magazine_academic_diary_placement_brochure', 'id_card_fees', 'iaims_fees'
+]
+
 # --- Database Connection ---
-DB_CONFIG = {
-    'host': 'localhost',
-    'user': 'root',
-    'password': '',
-    'database': 'new_VVM_Process_db'
-}
+from db_utils import get_db_connection, run_queries
+import data_version_utils
+import partition_utils
 
-def _convert_decimals_to_floats(data):
-    """Recursively convert Decimal objects to floats in a dictionary or list."""
-    if isinstance(data, dict):
-        return {k: _convert_decimals_to_floats(v) for k, v in data.items()}
-    elif isinstance(data, list):
-        return [_convert_decimals_to_floats(item) for item in data]
-    elif isinstance(data, Decimal):
-        return float(data)
-    else:
-        return data
+# --- Optional tables ---
+# Tables added by later migrations are used when present; a missing table is re-checked every minute.
+OPTIONAL_TABLE_RECHECK_SECONDS = 60
+_available_tables = set()
+_missing_tables_checked_at = {}
+
+def _table_available(cursor, table_name):
+    """True once table_name exists in the database."""
+    if table_name in _available_tables:
+        return True
+    now = time.monotonic()
+    checked_at = _missing_tables_checked_at.get(table_name)
+    if checked_at is not None and now - checked_at < OPTIONAL_TABLE_RECHECK_SECONDS:
+        return False
+    cursor.execute("SHOW TABLES LIKE %s", (table_name,))
+    if cursor.fetchall():
+        _available_tables.add(table_name)
+        return True
+    _missing_tables_checked_at[table_name] = now
+    return False
+
+# --- Normalized fee component lines ---
+# fee_component_lines (migrations/0002_fee_component_lines.sql) holds one (fees_trans_id, component, amount)
+# row per non-zero fee component of a transaction. Until that migration has been applied, the component
+# totals and per-transaction breakdowns fall back to the wide component columns.
+FEE_COMPONENT_LINES_CHUNK_SIZE = 1000
+
+def fee_component_lines_available(cursor):
+    return _table_available(cursor, 'fee_component_lines')
+
+def _fee_component_lines_select(where_clause):
+    """Unpivots the component columns of the matching transactions into (fees_trans_id, component, amount) rows."""
+    components = " UNION ALL ".join(
+        [f"SELECT '{FEE_COMPONENTS[0]}' AS component"] + [f"SELECT '{comp}'" for comp in FEE_COMPONENTS[1:]]
+    )
+    amount_case = " ".join(f"WHEN '{comp}' THEN ft.{comp}" for comp in FEE_COMPONENTS)
+    return f"""
+        SELECT fees_trans_id, component, amount FROM (
+            SELECT ft.fees_trans_id, c.component, CASE c.component {amount_case} END AS amount
+            FROM student_fee_transactions ft
+            CROSS JOIN ({components}) c
+            WHERE {where_clause}
+        ) component_lines
+        WHERE amount IS NOT NULL AND amount <> 0
+    """
+
+def sync_fee_component_lines(cursor, fees_trans_ids):
+    """
+    Rewrites the fee_component_lines rows of the given transactions from their component columns.
+    Call it in the same transaction as the insert or update. Does nothing until the table exists.
+    """
+    fees_trans_ids = list(fees_trans_ids)
+    if not fees_trans_ids or not fee_component_lines_available(cursor):
+        return
+    for i in range(0, len(fees_trans_ids), FEE_COMPONENT_LINES_CHUNK_SIZE):
+        chunk = fees_trans_ids[i:i + FEE_COMPONENT_LINES_CHUNK_SIZE]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f"DELETE FROM fee_component_lines WHERE fees_trans_id IN ({placeholders})", chunk)
+        cursor.execute(
+            "INSERT INTO fee_component_lines (fees_trans_id, component, amount) "
+            + _fee_component_lines_select(f"ft.fees_trans_id IN ({placeholders})"),
+            chunk
+        )
 
-def get_db_connection():
-    """Establishes a connection to the MySQL database."""
-    return mysql.connector.connect(**DB_CONFIG)
+def _fetch_fee_component_breakdown(db_conn, fees_trans_ids):
+    """Returns {fees_trans_id: {component: amount}} with the positive components of each transaction."""
+    breakdown = {}
+    fees_trans_ids = list(fees_trans_ids)
+    cursor = db_conn.cursor()
+    try:
+        for i in range(0, len(fees_trans_ids), FEE_COMPONENT_LINES_CHUNK_SIZE):
+            chunk = fees_trans_ids[i:i + FEE_COMPONENT_LINES_CHUNK_SIZE]
+            cursor.execute(
+                f"SELECT fees_trans_id, component, amount FROM fee_component_lines "
+                f"WHERE fees_trans_id IN ({', '.join(['%s'] * len(chunk))}) AND amount > 0",
+                chunk
+            )
+            for fees_trans_id, component, amount in cursor.fetchall():
+                breakdown.setdefault(fees_trans_id, {})[component] = amount
+    finally:
+        cursor.close()
+    return breakdown
 
-def _build_fees_where_clause(filters):
-    """Builds the WHERE clause for fees-related queries."""
+def _build_fees_where_clause(filters, include_dates=True):
+    """
+    Builds the WHERE clause for fees-related queries.
+    include_dates=False leaves out the start_date/end_date filter (for trend series that set their own range).
+    """
     where_clauses = []
     params = []
     
@@ -51,11 +138,11 @@ def _build_fees_where_clause(filters):
         params.append(filters['payment_mode'])
         
     # Add date range filter
-    if filters.get('start_date'):
+    if include_dates and filters.get('start_date'):
         where_clauses.append("ft.fees_paid_date >= %s")
         params.append(filters['start_date'])
     
-    if filters.get('end_date'):
+    if include_dates and filters.get('end_date'):
         where_clauses.append("ft.fees_paid_date <= %s")
         params.append(filters['end_date'])
         
@@ -67,294 +154,514 @@ def _build_fees_where_clause(filters):
     where_clause_str = " AND ".join(where_clauses) if where_clauses else "1=1"
     return where_clause_str, params
 
-def get_daily_trend_data(cursor, where_clause, params, filters):
+# --- Trend series ---
+# calendar_dates (migrations/0003_calendar_dates.sql) has one row per day. Trend queries LEFT JOIN it, so
+# buckets without transactions come back from the same query as zero rows. Until that migration has been
+# applied, the buckets are aggregated from the transactions alone and the gaps are filled in Python.
+TREND_BUCKETS = {
+    # granularity: (calendar column, bucket expression over ft.fees_paid_date, DATE_FORMAT label format)
+    'day': ('cal.cal_date', 'ft.fees_paid_date', '%Y-%m-%d'),
+    'week': ('cal.week_start', 'DATE_SUB(ft.fees_paid_date, INTERVAL WEEKDAY(ft.fees_paid_date) DAY)', '%Y-%m-%d'),
+    'month': ('cal.month_start', "DATE_FORMAT(ft.fees_paid_date, '%Y-%m-01')", '%Y-%m'),
+}
+
+def _bucket_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+def _bucket_labels(start_date, end_date, granularity):
+    """Labels of every bucket from start_date to end_date, formatted like the SQL labels."""
+    label_format = TREND_BUCKETS[granularity][2]
+    labels = []
+    current = _bucket_start(start_date, granularity)
+    while current <= end_date:
+        labels.append(current.strftime(label_format))
+        if granularity == 'day':
+            current += timedelta(days=1)
+        elif granularity == 'week':
+            current += timedelta(days=7)
+        else:
+            current = (current + timedelta(days=32)).replace(day=1)
+    return labels
+
+def get_trend_series(cursor, where_clause, params, start_date, end_date, granularity='day', paid_only=False):
+    """
+    Returns [{'label', 'count', 'amount'}] for every day, week (starting Monday) or month from start_date
+    to end_date, zero-filled, ordered by label. Transactions are bucketed by fees_paid_date.
+    """
+    if start_date > end_date:
+        return []
+    calendar_column, bucket_expr, label_format = TREND_BUCKETS[granularity]
+    paid_filter = " AND ft.payment_status = 'PAID'" if paid_only else ""
+
+    if _table_available(cursor, 'calendar_dates'):
+        query = f"""
+            SELECT DATE_FORMAT({calendar_column}, '{label_format}') as label,
+                   COUNT(ft.fees_trans_id) as count,
+                   COALESCE(SUM(ft.amount_paid), 0) as amount
+            FROM calendar_dates cal
+            LEFT JOIN student_fee_transactions ft
+                ON ft.fees_paid_date = cal.cal_date AND {where_clause}{paid_filter}
+            WHERE cal.cal_date BETWEEN %s AND %s
+            GROUP BY label
+            ORDER BY label ASC
+        """
+        cursor.execute(query, list(params) + [start_date, end_date])
+        return cursor.fetchall()
+
+    query = f"""
+        SELECT DATE_FORMAT({bucket_expr}, '{label_format}') as label,
+               COUNT(ft.fees_trans_id) as count,
+               COALESCE(SUM(ft.amount_paid), 0) as amount
+        FROM student_fee_transactions ft
+        WHERE {where_clause}{paid_filter} AND ft.fees_paid_date BETWEEN %s AND %s
+        GROUP BY label
+    """
+    cursor.execute(query, list(params) + [start_date, end_date])
+    rows = {row['label']: row for row in cursor.fetchall()}
+    return [rows.get(label) or {'label': label, 'count': 0, 'amount': 0}
+            for label in _bucket_labels(start_date, end_date, granularity)]
+
+def get_daily_trend_data(cursor, filters):
     """Get daily trend data for the date range specified in filters, showing all days including those with no transactions"""
-    
-    # Extract date range from filters
     start_date_str = filters.get('start_date')
     end_date_str = filters.get('end_date')
-    
+    today = date.today()
+
     # If no date range is specified, default to current month
     if not start_date_str and not end_date_str:
-        # Get current month and year
-        today = date.today()
-        current_month = today.month
-        current_year = today.year
-        
-        # Get the number of days in the current month
-        if current_month == 12:
-            next_month = 1
-            next_year = current_year + 1
-        else:
-            next_month = current_month + 1
-            next_year = current_year
-        
-        # First day of current month
-        start_date = date(current_year, current_month, 1)
-        # First day of next month (to get the last day of current month)
-        first_day_next_month = date(next_year, next_month, 1)
-        # Last day of current month
-        end_date = first_day_next_month - timedelta(days=1)
+        start_date = today.replace(day=1)
+        end_date = (start_date + timedelta(days=32)).replace(day=1) - timedelta(days=1)
     else:
         # Use the provided date range
-        start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else date.today()
-        end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else date.today()
-    
+        start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date() if start_date_str else today
+        end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else today
+
     # Ensure end_date is not in the future
-    today = date.today()
-    if end_date > today:
-        end_date = today
-    
-    # Generate all days in the date range
-    days_in_range = []
-    current_day = start_date
-    while current_day <= end_date:
-        days_in_range.append(current_day.strftime('%Y-%m-%d'))
-        current_day += timedelta(days=1)
-    
-    # If no valid days, return empty
-    if not days_in_range:
-        return []
-    
-    # Get data for the date range
-    # We need to modify the where clause to remove any date filters since we're handling them separately
-    # Create a copy of the original where clause without date filters
-    where_clause_parts = where_clause.split(" AND ")
-    filtered_where_parts = []
-    date_filter_params = []
-    
-    for part in where_clause_parts:
-        if "ft.fees_paid_date" not in part:
-            filtered_where_parts.append(part)
-        else:
-            # Extract the parameter if it's a date filter
-            if "ft.fees_paid_date >= %s" in part:
-                date_filter_params.append(start_date_str)
-            elif "ft.fees_paid_date <= %s" in part:
-                date_filter_params.append(end_date_str)
-    
-    # Rebuild the where clause without date filters
-    clean_where_clause = " AND ".join(filtered_where_parts) if filtered_where_parts else "1=1"
-    
-    # Add our specific date range filter
-    clean_where_clause += " AND ft.fees_paid_date >= %s AND ft.fees_paid_date <= %s"
-    
-    # Update parameters - remove any date filter params and add our new ones
-    clean_params = [p for p in params if p not in date_filter_params]
-    clean_params.extend([start_date, end_date])
-    
-    daily_trend_query = f"""
-        SELECT DATE(ft.fees_paid_date) as label, 
-               COUNT(ft.fees_trans_id) as count,
-               SUM(ft.amount_paid) as amount
-        FROM student_fee_transactions ft
-        WHERE {clean_where_clause} AND ft.fees_paid_date IS NOT NULL 
-        GROUP BY DATE(ft.fees_paid_date)
-        ORDER BY label ASC
-    """
-    
-    cursor.execute(daily_trend_query, clean_params)
-    daily_data = {row['label'].strftime('%Y-%m-%d'): row for row in cursor.fetchall()}
-    
-    # Create result with all days in the range, filling zeros for missing days
-    result = []
-    for day in days_in_range:
-        if day in daily_data:
-            result.append(daily_data[day])
-        else:
-            result.append({
-                'label': day,
-                'count': 0,
-                'amount': 0
-            })
-    
-    return result
+    end_date = min(end_date, today)
+
+    # The series sets its own date range, so the date filters are left out of the WHERE clause
+    where_clause, params = _build_fees_where_clause(filters, include_dates=False)
+    return get_trend_series(cursor, where_clause, params, start_date, end_date, 'day')
 
 def get_monthly_trend_data(cursor, where_clause, params):
     """Get monthly trend data for all months in current year, including empty ones"""
-    # First get all months in the current year
-    months_query = """
-        WITH months AS (
-            SELECT DATE_FORMAT(DATE_ADD(CONCAT(YEAR(CURDATE()), '-01-01'), INTERVAL n MONTH), '%Y-%m') as month
-            FROM (
-                SELECT 0 as n UNION SELECT 1 UNION SELECT 2 UNION SELECT 3 
-                UNION SELECT 4 UNION SELECT 5 UNION SELECT 6 UNION SELECT 7 
-                UNION SELECT 8 UNION SELECT 9 UNION SELECT 10 UNION SELECT 11
-            ) numbers
-            WHERE YEAR(DATE_ADD(CONCAT(YEAR(CURDATE()), '-01-01'), INTERVAL n MONTH)) = YEAR(CURDATE())
+    year = date.today().year
+    return get_trend_series(cursor, where_clause, params, date(year, 1, 1), date(year, 12, 31), 'month', paid_only=True)
+
+# --- Revenue series ---
+# Generic time series of transaction counts and amount paid, bucketed by fees_paid_date and optionally split
+# by institution or course. fee_revenue_daily (migrations/0004_fee_revenue_daily.sql) pre-aggregates the
+# transactions per day; it is read whenever the filters only touch its columns and the migration has been
+# applied, otherwise the transactions are aggregated directly.
+# Academic years start on the first of ACADEMIC_YEAR_START_MONTH (June by default) and are split into terms of
+# ACADEMIC_TERM_MONTHS months (6: two semesters, 3: quarters).
+ACADEMIC_YEAR_START_MONTH = int(os.environ.get('ACADEMIC_YEAR_START_MONTH', 6))
+ACADEMIC_TERM_MONTHS = int(os.environ.get('ACADEMIC_TERM_MONTHS', 6))
+if not 1 <= ACADEMIC_YEAR_START_MONTH <= 12 or ACADEMIC_TERM_MONTHS not in (1, 2, 3, 4, 6, 12):
+    raise ValueError("ACADEMIC_YEAR_START_MONTH must be 1-12 and ACADEMIC_TERM_MONTHS must divide 12.")
+
+SERIES_BUCKETS = ('day', 'week', 'month', 'term', 'academic_year')
+SERIES_GROUP_COLUMNS = ('institution_code', 'course_name')
+SERIES_MAX_BUCKETS = 1000
+# Columns of student_fee_transactions copied into fee_revenue_daily; edits to them refresh the rollup.
+FEE_REVENUE_COLUMNS = ('fees_paid_date', 'institution_code', 'course_name', 'payment_status', 'payment_mode', 'amount_paid')
+
+# Period the SQL aggregates to before the rows are assigned to buckets; terms and academic years are whole months.
+_SERIES_PERIOD_EXPRESSIONS = {
+    'day': 'ft.fees_paid_date',
+    'week': 'DATE_SUB(ft.fees_paid_date, INTERVAL WEEKDAY(ft.fees_paid_date) DAY)',
+    'month': 'DATE_SUB(ft.fees_paid_date, INTERVAL DAYOFMONTH(ft.fees_paid_date) - 1 DAY)',
+}
+_SERIES_PERIOD_EXPRESSIONS['term'] = _SERIES_PERIOD_EXPRESSIONS['academic_year'] = _SERIES_PERIOD_EXPRESSIONS['month']
+
+def fee_revenue_daily_available(cursor):
+    return _table_available(cursor, 'fee_revenue_daily')
+
+def fee_revenue_dates(cursor, fees_trans_ids):
+    """Paid dates of the given transactions, or an empty set until fee_revenue_daily exists."""
+    fees_trans_ids = list(fees_trans_ids)
+    dates = set()
+    if not fees_trans_ids or not fee_revenue_daily_available(cursor):
+        return dates
+    for i in range(0, len(fees_trans_ids), FEE_COMPONENT_LINES_CHUNK_SIZE):
+        chunk = fees_trans_ids[i:i + FEE_COMPONENT_LINES_CHUNK_SIZE]
+        cursor.execute(
+            f"SELECT DISTINCT fees_paid_date FROM student_fee_transactions "
+            f"WHERE fees_trans_id IN ({', '.join(['%s'] * len(chunk))}) AND fees_paid_date IS NOT NULL",
+            chunk
         )
-        SELECT month FROM months ORDER BY month
+        dates.update(row[0] for row in cursor.fetchall())
+    return dates
+
+def refresh_fee_revenue_daily(cursor, fees_trans_ids, previous_dates=()):
     """
-    cursor.execute(months_query)
-    all_months = [row['month'] for row in cursor.fetchall()]
-    
-    # Get actual data for months that have transactions
-    monthly_query = f"""
-        SELECT DATE_FORMAT(ft.fees_paid_date, '%Y-%m') as label, 
-               SUM(ft.amount_paid) as amount,
-               COUNT(ft.fees_trans_id) as count
-        FROM student_fee_transactions ft
-        WHERE {where_clause} AND ft.payment_status = 'PAID' 
-        AND ft.fees_paid_date IS NOT NULL
-        AND YEAR(ft.fees_paid_date) = YEAR(CURDATE())
-        GROUP BY DATE_FORMAT(ft.fees_paid_date, '%Y-%m')
-        ORDER BY label ASC
+    Re-aggregates the fee_revenue_daily rows of the dates the given transactions were paid on, plus
+    previous_dates (their dates before an edit of fees_paid_date, from fee_revenue_dates).
+    Call it in the same transaction as the insert or update. Does nothing until the table exists.
     """
-    cursor.execute(monthly_query, params)
-    monthly_data = {row['label']: row for row in cursor.fetchall()}
-    
-    # Create result with all months, filling zeros for missing months
-    result = []
-    for month in all_months:
-        if month in monthly_data:
-            result.append(monthly_data[month])
-        else:
-            result.append({
-                'label': month,
-                'amount': 0,
-                'count': 0
-            })
-    
-    return result
+    dates = sorted(fee_revenue_dates(cursor, fees_trans_ids) | set(previous_dates))
+    for i in range(0, len(dates), FEE_COMPONENT_LINES_CHUNK_SIZE):
+        chunk = dates[i:i + FEE_COMPONENT_LINES_CHUNK_SIZE]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f"DELETE FROM fee_revenue_daily WHERE fees_paid_date IN ({placeholders})", chunk)
+        cursor.execute(f"""
+            INSERT INTO fee_revenue_daily
+                (fees_paid_date, institution_code, course_name, payment_status, payment_mode, transaction_count, amount_paid)
+            SELECT fees_paid_date, institution_code, course_name, payment_status, payment_mode,
+                   COUNT(*), COALESCE(SUM(amount_paid), 0)
+            FROM student_fee_transactions
+            WHERE fees_paid_date IN ({placeholders})
+            GROUP BY fees_paid_date, institution_code, course_name, payment_status, payment_mode
+        """, chunk)
+
+def _add_months(day, months):
+    month_index = day.month - 1 + months
+    return day.replace(year=day.year + month_index // 12, month=month_index % 12 + 1, day=1)
+
+def _series_bucket_start(day, bucket):
+    if bucket in ('term', 'academic_year'):
+        year_start = date(day.year if day.month >= ACADEMIC_YEAR_START_MONTH else day.year - 1, ACADEMIC_YEAR_START_MONTH, 1)
+        if bucket == 'academic_year':
+            return year_start
+        months_in = (day.month - ACADEMIC_YEAR_START_MONTH) % 12
+        return _add_months(year_start, months_in - months_in % ACADEMIC_TERM_MONTHS)
+    return _bucket_start(day, bucket)
+
+def _next_series_bucket(start, bucket):
+    if bucket == 'day':
+        return start + timedelta(days=1)
+    if bucket == 'week':
+        return start + timedelta(days=7)
+    return _add_months(start, {'month': 1, 'term': ACADEMIC_TERM_MONTHS, 'academic_year': 12}[bucket])
+
+def _series_bucket_label(start, bucket):
+    """2025-06-03 (day, week), 2025-06 (month), 2025-26 (academic year), 2025-26 T1 (term)."""
+    if bucket in ('day', 'week'):
+        return start.strftime('%Y-%m-%d')
+    if bucket == 'month':
+        return start.strftime('%Y-%m')
+    year_start = _series_bucket_start(start, 'academic_year')
+    year_label = str(year_start.year) if ACADEMIC_YEAR_START_MONTH == 1 else f"{year_start.year}-{(year_start.year + 1) % 100:02d}"
+    if bucket == 'academic_year':
+        return year_label
+    months_in = (start.month - ACADEMIC_YEAR_START_MONTH) % 12
+    return f"{year_label} T{months_in // ACADEMIC_TERM_MONTHS + 1}"
+
+def _parse_series_date(value, default):
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else default
+
+def get_revenue_series(filters):
+    """
+    Returns the transaction count and amount paid per bucket from start_date to end_date (default: the start of
+    the current academic year to today), zero-filled.
+    filters: the fees dashboard filters plus bucket (day, week, month, term, academic_year; default month),
+    group_by (institution_code or course_name; default none, one 'all' series) and cumulative (running totals).
+    Raises ValueError for an unknown bucket or group_by, or a range of more than SERIES_MAX_BUCKETS buckets.
+    """
+    bucket = filters.get('bucket') or 'month'
+    group_by = filters.get('group_by') or None
+    cumulative = str(filters.get('cumulative', '')).lower() in ('1', 'true', 'yes')
+    if bucket not in SERIES_BUCKETS:
+        raise ValueError(f"bucket must be one of: {', '.join(SERIES_BUCKETS)}.")
+    if group_by is not None and group_by not in SERIES_GROUP_COLUMNS:
+        raise ValueError(f"group_by must be one of: {', '.join(SERIES_GROUP_COLUMNS)}.")
+
+    today = date.today()
+    try:
+        start_date = _parse_series_date(filters.get('start_date'), _series_bucket_start(today, 'academic_year'))
+        end_date = _parse_series_date(filters.get('end_date'), today)
+    except ValueError:
+        raise ValueError("start_date and end_date must be dates in YYYY-MM-DD format.")
+    if start_date > end_date:
+        raise ValueError("start_date must not be after end_date.")
+
+    bucket_starts = []
+    current = _series_bucket_start(start_date, bucket)
+    while current <= end_date:
+        bucket_starts.append(current)
+        if len(bucket_starts) > SERIES_MAX_BUCKETS:
+            raise ValueError(f"The range covers more than {SERIES_MAX_BUCKETS} buckets; use a larger bucket.")
+        current = _next_series_bucket(current, bucket)
+
+    # The date range is applied below, on the whole requested range rather than the first and last bucket
+    where_clause, params = _build_fees_where_clause(filters, include_dates=False)
+    group_expr = f"ft.{group_by}" if group_by else "NULL"
+    period_expr = _SERIES_PERIOD_EXPRESSIONS[bucket]
 
-def get_fees_dashboard_data(filters):
-    """Fetches all aggregated data for the fees analytics dashboard."""
     db_conn = None
     cursor = None
     try:
         db_conn = get_db_connection()
-        cursor = db_conn.cursor(dictionary=True)
-        
-        where_clause, params = _build_fees_where_clause(filters)
-
-        # --- KPIs ---
-        kpi_query = f"""
-            SELECT
-                COALESCE(SUM(ft.total_amt), 0) as total_amount,
-                COALESCE(SUM(CASE WHEN ft.payment_status IN ('PAID', 'PARTIAL_PAID') THEN ft.amount_paid ELSE 0 END), 0) as total_paid,
-                COALESCE(SUM(ft.total_amt - ft.amount_paid), 0) as total_unpaid,
-                COUNT(ft.fees_trans_id) as total_transactions,
-                COUNT(CASE WHEN ft.payment_status = 'PAID' THEN 1 END) as successful_transactions,
-                COUNT(CASE WHEN ft.payment_status IN ('UNPAID', 'PARTIAL_PAID') THEN 1 END) as pending_transactions,
-                COUNT(CASE WHEN ft.payment_status = 'REFUNDED' THEN 1 END) as refunded_transactions,
-                COALESCE(SUM(ft.refund_amount), 0) as total_refunded
-            FROM student_fee_transactions ft
-            WHERE {where_clause}
-        """
-        cursor.execute(kpi_query, params)
-        kpis = cursor.fetchone()
-        
-        def fetch_chart_data(group_by_col, label, count_col='COUNT(*)', sum_col=None, where_extra=""):
-            base_query = f"SELECT {group_by_col} as label, {count_col} as count"
-            if sum_col:
-                base_query += f", COALESCE(SUM({sum_col}), 0) as amount"
-            
-            query = f"""
-                {base_query}
-                FROM student_fee_transactions ft
-                WHERE {where_clause} AND {group_by_col} IS NOT NULL AND {group_by_col} != '' {where_extra}
-                GROUP BY {group_by_col}
-                ORDER BY count DESC
-                LIMIT 15
-            """
-            cursor.execute(query, params)
-            return cursor.fetchall()
+        cursor = db_conn.cursor()
 
-        # --- Payment Status Distribution ---
-        payment_status_dist = fetch_chart_data('ft.payment_status', 'Payment Status')
-        
-        # --- Payment Mode Distribution ---
-        payment_mode_dist = fetch_chart_data('ft.payment_mode', 'Payment Mode')
-        
-        # --- Course-wise Revenue Distribution ---
-        course_revenue_dist = fetch_chart_data('ft.course_name', 'Course Revenue', sum_col='ft.amount_paid', where_extra="AND ft.payment_status = 'PAID'")
-        
-        # --- Installment Distribution ---
-        installment_dist = fetch_chart_data('ft.installment_no', 'Installments')
-        
-        # --- Fee Components Distribution ---
-        fee_components = [
-            'tuition_fees', 'term_fees', 'library_fees', 'gymkhana_fees', 'other_fees',
-            'examination_fees', 'development_fees', 'registration_fees', 'laboratory_fee',
-            'pupils_fund', 'activity_fees', 'admission_fees', 'development_fund',
-            'refundable_deposit', 'general_deposit', 'enrolment_fee', 'laboratory_deposit',
-            'uni_registration_fees', 'student_aid_fees', 'library_deposit',
-            'caution_money_deposit', 'lab_fees', 'uni_administration_fees',
-            'it_fees', 'pta_fees', 'university_registration_fees', 'laboratory_fees',
-            'university_administration_fees', 'library_id_card_etc', 'computer_lab_fees',
-            'information_technology_fees', 'iaims_fees_dhe', 'iams_fees',
-            'alumni_registration_fees', 'academic_restructuring_and_development_fees',
-            'magazine_academic_diary_placement_brochure', 'id_card_fees', 'iaims_fees'
-        ]
-        
-        select_sums = ", ".join([f"COALESCE(SUM({comp}), 0) as {comp}" for comp in fee_components])
+        # The due-date drill-down filters on columns the rollup does not have
+        if filters.get('filterType') != 'due_date_status' and fee_revenue_daily_available(cursor):
+            source, count_expr, amount_expr = 'fee_revenue_daily', 'SUM(ft.transaction_count)', 'SUM(ft.amount_paid)'
+        else:
+            source, count_expr, amount_expr = 'student_fee_transactions', 'COUNT(*)', 'COALESCE(SUM(ft.amount_paid), 0)'
+
+        cursor.execute(f"""
+            SELECT {period_expr} as period, {group_expr} as group_value, {count_expr} as count, {amount_expr} as amount
+            FROM {source} ft
+            WHERE {where_clause} AND ft.fees_paid_date BETWEEN %s AND %s
+            GROUP BY period, group_value
+        """, params + [start_date, end_date])
+        rows = cursor.fetchall()
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+    # {group: {bucket start: [count, amount]}}, with the groups keyed case- and trailing-space-insensitively like MySQL
+    totals = {}
+    group_names = {}
+    for period, group_value, count, amount in rows:
+        key = _collation_key(group_value) if group_by else 'all'
+        group_names.setdefault(key, group_value if group_by else 'all')
+        bucket_total = totals.setdefault(key, {}).setdefault(_series_bucket_start(period, bucket), [0, Decimal(0)])
+        bucket_total[0] += int(count)
+        bucket_total[1] += amount
+    if not group_by and not totals:
+        totals['all'], group_names['all'] = {}, 'all'
+
+    series = []
+    for key, buckets in totals.items():
+        points = []
+        running_count, running_amount = 0, Decimal(0)
+        for start in bucket_starts:
+            count, amount = buckets.get(start, (0, Decimal(0)))
+            point = {'label': _series_bucket_label(start, bucket), 'start': start, 'count': count, 'amount': amount}
+            if cumulative:
+                running_count += count
+                running_amount += amount
+                point['cumulativeCount'] = running_count
+                point['cumulativeAmount'] = running_amount
+            points.append(point)
+        series.append({
+            'group': group_names[key],
+            'totalCount': sum(point['count'] for point in points),
+            'totalAmount': sum((point['amount'] for point in points), Decimal(0)),
+            'points': points,
+        })
+    # Largest groups first
+    series.sort(key=lambda item: item['totalAmount'], reverse=True)
+
+    return {
+        'bucket': bucket,
+        'groupBy': group_by,
+        'cumulative': cumulative,
+        'startDate': start_date,
+        'endDate': end_date,
+        'labels': [_series_bucket_label(start, bucket) for start in bucket_starts],
+        'series': series,
+    }
+
+# Distribution charts computed from the fee summary query: (result key, column, revenue chart).
+# Revenue charts only count PAID transactions and also report the amount paid.
+FEE_DISTRIBUTIONS = [
+    ('paymentStatusDistribution', 'payment_status', False),
+    ('paymentModeDistribution', 'payment_mode', False),
+    ('courseRevenueDistribution', 'course_name', True),
+    ('installmentDistribution', 'installment_no', False),
+    ('institutionRevenueDistribution', 'institution_code', True),
+    ('paymentOptionDistribution', 'payment_option', False),
+]
+FEE_DISTRIBUTION_LIMIT = 15
+
+def _build_fee_summary_query(where_clause):
+    """
+    One GROUP BY over the filtered rows that the KPIs, the six distribution charts and the due-date
+    buckets are all derived from. Each group is one combination of the charted columns and the
+    due-date status, so the result is small even when the filtered rows are not.
+    """
+    group_columns = ", ".join(f"ft.{column}" for _, column, _ in FEE_DISTRIBUTIONS)
+    return f"""
+        SELECT {group_columns},
+            CASE 
+                WHEN ft.due_date IS NULL THEN 'No Due Date'
+                WHEN ft.payment_status = 'PAID' AND ft.fees_paid_date <= ft.due_date THEN 'Paid On Time'
+                WHEN ft.payment_status = 'PAID' AND ft.fees_paid_date > ft.due_date THEN 'Paid Late'
+                WHEN ft.payment_status IN ('UNPAID', 'PARTIAL_PAID') AND ft.due_date < CURDATE() THEN 'Overdue Unpaid'
+                WHEN ft.payment_status IN ('UNPAID', 'PARTIAL_PAID') AND ft.due_date >= CURDATE() THEN 'Pending (Not Due)'
+                ELSE 'Other'
+            END as due_date_status,
+            COUNT(*) as row_count,
+            SUM(ft.total_amt) as total_amt,
+            SUM(ft.amount_paid) as amount_paid,
+            SUM(ft.total_amt - ft.amount_paid) as unpaid_amt,
+            SUM(ft.refund_amount) as refund_amount
+        FROM student_fee_transactions ft
+        WHERE {where_clause}
+        GROUP BY {group_columns}, due_date_status
+    """
+
+def _collation_key(value):
+    """
+    Groups values the way the table's utf8mb4_general_ci columns compare them: case-insensitively and
+    ignoring trailing spaces.
+    """
+    return value.rstrip(' ').casefold() if isinstance(value, str) else value
+
+def _add(total, value):
+    # SUM() skips NULLs and is NULL when every value is NULL.
+    if value is None:
+        return total
+    return value if total is None else total + value
+
+def _fetch_fee_summary_groups(cursor, where_clause, params):
+    cursor.execute(_build_fee_summary_query(where_clause), params)
+    return cursor.fetchall()
+
+def _summarize_fee_groups(groups):
+    """
+    Derives the KPIs, the six distribution charts and the due-date buckets from the summary query's groups.
+    The groups include institution_code, so groups queried per institution can be concatenated.
+    """
+    kpis = {
+        'total_amount': None, 'total_paid': None, 'total_unpaid': None, 'total_transactions': 0,
+        'successful_transactions': 0, 'pending_transactions': 0, 'refunded_transactions': 0, 'total_refunded': None,
+    }
+    # {result key: {collation key: {'label', 'count', 'amount'}}}, in first-seen order
+    distributions = {key: {} for key, _, _ in FEE_DISTRIBUTIONS}
+    due_date_status = {}
+
+    for group in groups:
+        status = _collation_key(group['payment_status'])
+        count = group['row_count']
+
+        kpis['total_amount'] = _add(kpis['total_amount'], group['total_amt'])
+        kpis['total_unpaid'] = _add(kpis['total_unpaid'], group['unpaid_amt'])
+        kpis['total_refunded'] = _add(kpis['total_refunded'], group['refund_amount'])
+        kpis['total_transactions'] += count
+        if status in ('paid', 'partial_paid'):
+            kpis['total_paid'] = _add(kpis['total_paid'], group['amount_paid'])
+        if status == 'paid':
+            kpis['successful_transactions'] += count
+        elif status in ('unpaid', 'partial_paid'):
+            kpis['pending_transactions'] += count
+        elif status == 'refunded':
+            kpis['refunded_transactions'] += count
+
+        for key, column, is_revenue in FEE_DISTRIBUTIONS:
+            label = group[column]
+            # Same rows as "col IS NOT NULL AND col != ''" (and "payment_status = 'PAID'" for revenue charts)
+            if label is None or _collation_key(label) == '' or (is_revenue and status != 'paid'):
+                continue
+            entry = distributions[key].setdefault(_collation_key(label), {'label': label, 'count': 0, 'amount': None})
+            entry['count'] += count
+            if is_revenue:
+                entry['amount'] = _add(entry['amount'], group['amount_paid'])
+
+        status_entry = due_date_status.setdefault(group['due_date_status'], {'status': group['due_date_status'], 'count': 0})
+        status_entry['count'] += count
+
+    # COALESCE(SUM(...), 0)
+    for name in ('total_amount', 'total_paid', 'total_unpaid', 'total_refunded'):
+        if kpis[name] is None:
+            kpis[name] = Decimal(0)
+
+    summary = {'kpis': kpis, 'dueDateStatusDistribution': list(due_date_status.values())}
+    for key, _, is_revenue in FEE_DISTRIBUTIONS:
+        entries = sorted(distributions[key].values(), key=lambda entry: entry['count'], reverse=True)
+        chart = []
+        for entry in entries[:FEE_DISTRIBUTION_LIMIT]:
+            item = {'label': entry['label'], 'count': entry['count']}
+            if is_revenue:
+                item['amount'] = entry['amount'] if entry['amount'] is not None else Decimal(0)
+            chart.append(item)
+        summary[key] = chart
+    return summary
+
+def _fetch_fee_component_totals(cursor, where_clause, params):
+    """Returns {component: amount paid} over the PAID transactions, in FEE_COMPONENTS order."""
+    if fee_component_lines_available(cursor):
+        cursor.execute(f"""
+            SELECT fcl.component, SUM(fcl.amount) as amount
+            FROM fee_component_lines fcl
+            JOIN student_fee_transactions ft ON ft.fees_trans_id = fcl.fees_trans_id
+            WHERE {where_clause} AND ft.payment_status = 'PAID'
+            GROUP BY fcl.component
+        """, params)
+        totals = {row['component']: row['amount'] for row in cursor.fetchall()}
+        # Same shape and order as the wide-column query below
+        return {comp: totals.get(comp, 0) for comp in FEE_COMPONENTS}
+    else:
+        select_sums = ", ".join([f"COALESCE(SUM({comp}), 0) as {comp}" for comp in FEE_COMPONENTS])
         fee_comp_query = f"""
             SELECT {select_sums} 
             FROM student_fee_transactions ft 
             WHERE {where_clause} AND ft.payment_status = 'PAID'
         """
         cursor.execute(fee_comp_query, params)
-        fee_comp_data_raw = cursor.fetchone()
-        fee_components_dist = []
-        if fee_comp_data_raw:
-            fee_components_dist = [
-                {'label': key.replace('_', ' ').title(), 'amount': value} 
-                for key, value in fee_comp_data_raw.items() 
-                if value and value > 0
-            ]
-            # Sort by amount descending
-            fee_components_dist.sort(key=lambda x: x['amount'], reverse=True)
-        
-        
-        # --- Daily Transaction Trend (Date Range with All Days) ---
-        daily_transaction_trend = get_daily_trend_data(cursor, where_clause, params, filters)
-        # --- Institution-wise Revenue Distribution ---
-        institution_revenue_dist = fetch_chart_data('ft.institution_code', 'Institution Revenue', sum_col='ft.amount_paid', where_extra="AND ft.payment_status = 'PAID'")
-        
-        # --- Monthly Revenue Trend (All months in current year) ---
-        monthly_revenue_trend = get_monthly_trend_data(cursor, where_clause, params)
-        
-        # --- Payment Option Distribution ---
-        payment_option_dist = fetch_chart_data('ft.payment_option', 'Payment Option')
-        
-        # --- Due Date Status Distribution (Count Only) ---
-        due_date_query = f"""
-            SELECT 
-                CASE 
-                    WHEN ft.due_date IS NULL THEN 'No Due Date'
-                    WHEN ft.payment_status = 'PAID' AND ft.fees_paid_date <= ft.due_date THEN 'Paid On Time'
-                    WHEN ft.payment_status = 'PAID' AND ft.fees_paid_date > ft.due_date THEN 'Paid Late'
-                    WHEN ft.payment_status IN ('UNPAID', 'PARTIAL_PAID') AND ft.due_date < CURDATE() THEN 'Overdue Unpaid'
-                    WHEN ft.payment_status IN ('UNPAID', 'PARTIAL_PAID') AND ft.due_date >= CURDATE() THEN 'Pending (Not Due)'
-                    ELSE 'Other'
-                END as status,
-                COUNT(*) as count
-            FROM student_fee_transactions ft
-            WHERE {where_clause}
-            GROUP BY status
-        """
-        cursor.execute(due_date_query, params)
-        due_date_status_dist = cursor.fetchall()
-
-        # Convert all Decimal objects to floats
-        result = {
-            'kpis': _convert_decimals_to_floats(kpis),
-            'paymentStatusDistribution': _convert_decimals_to_floats(payment_status_dist),
-            'paymentModeDistribution': _convert_decimals_to_floats(payment_mode_dist),
-            'courseRevenueDistribution': _convert_decimals_to_floats(course_revenue_dist),
-            'installmentDistribution': _convert_decimals_to_floats(installment_dist),
-            'feeComponentsDistribution': _convert_decimals_to_floats(fee_components_dist),
-            'dailyTransactionTrend': _convert_decimals_to_floats(daily_transaction_trend),
-            'institutionRevenueDistribution': _convert_decimals_to_floats(institution_revenue_dist),
-            'monthlyRevenueTrend': _convert_decimals_to_floats(monthly_revenue_trend),
-            'paymentOptionDistribution': _convert_decimals_to_floats(payment_option_dist),
-            'dueDateStatusDistribution': _convert_decimals_to_floats(due_date_status_dist),
-        }
+        return cursor.fetchone()
 
-        return result
-    finally:
-        if cursor: cursor.close()
-        if db_conn and db_conn.is_connected(): db_conn.close()
+def _fee_components_chart(fee_comp_data_raw):
+    fee_components_dist = []
+    if fee_comp_data_raw:
+        fee_components_dist = [
+            {'label': key.replace('_', ' ').title(), 'amount': value} 
+            for key, value in fee_comp_data_raw.items() 
+            if value and value > 0
+        ]
+        # Sort by amount descending
+        fee_components_dist.sort(key=lambda x: x['amount'], reverse=True)
+    return fee_components_dist
+
+def _partition_fan_out(filters):
+    """Institution codes to query one by one when an all-institutions view reads a partitioned fees table, else []."""
+    if filters.get('institution_code') and filters['institution_code'] != 'all':
+        return []
+    return partition_utils.institution_partitions('student_fee_transactions')
+
+def get_fees_dashboard_data(filters):
+    """
+    Fetches all aggregated data for the fees analytics dashboard.
+    The KPIs, distributions and due-date buckets come from one summary query; it and the remaining
+    queries are independent, so they are handed to run_queries, which runs them concurrently on pooled
+    connections (see DASHBOARD_QUERY_WORKERS in db_utils). When student_fee_transactions is partitioned by
+    institution, an all-institutions view runs the summary and component queries per partition.
+    """
+    where_clause, params = _build_fees_where_clause(filters)
+
+    tasks = {
+        # Date range with all days
+        'dailyTransactionTrend': lambda cursor: get_daily_trend_data(cursor, filters),
+        # All months in current year
+        'monthlyRevenueTrend': lambda cursor: get_monthly_trend_data(cursor, where_clause, params),
+    }
+    # Over all institutions of a partitioned table, the summary and component queries run once per
+    # institution (each pruned to its partition) and the results are merged
+    institution_codes = _partition_fan_out(filters)
+    scopes = [(code, _build_fees_where_clause(dict(filters, institution_code=code))) for code in institution_codes] \
+        or [(None, (where_clause, params))]
+    for code, (scope_where, scope_params) in scopes:
+        tasks[('summary', code)] = lambda cursor, w=scope_where, p=scope_params: _fetch_fee_summary_groups(cursor, w, p)
+        tasks[('components', code)] = lambda cursor, w=scope_where, p=scope_params: _fetch_fee_component_totals(cursor, w, p)
+    results = run_queries(tasks)
+
+    summary = _summarize_fee_groups([group for code, _ in scopes for group in results[('summary', code)]])
+    component_totals = {}
+    for code, _ in scopes:
+        for comp, amount in (results[('components', code)] or {}).items():
+            component_totals[comp] = component_totals.get(comp, 0) + amount
+
+    # Decimal values are encoded as floats by the app's JSON provider (json_utils)
+    return {
+        'kpis': summary['kpis'],
+        'paymentStatusDistribution': summary['paymentStatusDistribution'],
+        'paymentModeDistribution': summary['paymentModeDistribution'],
+        'courseRevenueDistribution': summary['courseRevenueDistribution'],
+        'installmentDistribution': summary['installmentDistribution'],
+        'feeComponentsDistribution': _fee_components_chart(component_totals),
+        'dailyTransactionTrend': results['dailyTransactionTrend'],
+        'institutionRevenueDistribution': summary['institutionRevenueDistribution'],
+        'monthlyRevenueTrend': results['monthlyRevenueTrend'],
+        'paymentOptionDistribution': summary['paymentOptionDistribution'],
+        'dueDateStatusDistribution': summary['dueDateStatusDistribution'],
+    }
 
 def get_fees_filter_options():
     db_conn = None
@@ -397,118 +704,173 @@ def get_fees_filter_options():
         if cursor: cursor.close()
         if db_conn and db_conn.is_connected(): db_conn.close()
 
-def get_filtered_transaction_list(filters, is_full_list=False):
+def _build_transaction_list_query(filters, is_full_list=False, include_components=True):
+    """
+    Builds the transaction list query (including drill-down filters) and its parameters without executing it.
+    include_components=False leaves out the fee component columns (they are read from fee_component_lines).
+    filters['since'] (a data version) keeps only the transactions updated since that version was read.
+    """
+    where_clause, params = _build_fees_where_clause(filters)
+
+    if filters.get('since'):
+        _, _, fees_updated = data_version_utils.parse_data_version(filters['since'])
+        # >= because updated_at has one-second resolution; rows written in that second are sent again
+        where_clause += " AND ft.updated_at >= FROM_UNIXTIME(%s)"
+        params.append(fees_updated)
+
+    # Add drill-down logic
+    filter_type = filters.get('filterType')
+    filter_value = filters.get('filterValue')
+    if filter_type and filter_value:
+        # Handle special cases if any, otherwise map directly
+        allowed_columns = [
+            'payment_status', 'payment_mode', 'course_name', 'installment_no',
+            'institution_code', 'payment_option', 'division_name'
+        ]
+
+        # Handle special filter types
+        if filter_type == 'fees_paid_date':
+            where_clause += " AND DATE(ft.fees_paid_date) = %s"
+            params.append(filter_value)
+        elif filter_type == 'month_range':
+            # Extract year and month from YYYY-MM format
+            year, month = filter_value.split('-')
+            where_clause += " AND YEAR(ft.fees_paid_date) = %s AND MONTH(ft.fees_paid_date) = %s"
+            params.extend([year, month])
+        elif filter_type == 'due_date_status':
+            # Special handling for due date status
+            if filter_value == 'Overdue Unpaid':
+                where_clause += " AND ft.due_date < CURDATE() AND ft.payment_status IN ('UNPAID', 'PARTIAL_PAID')"
+            elif filter_value == 'Paid On Time':
+                where_clause += " AND ft.payment_status = 'PAID' AND ft.fees_paid_date <= ft.due_date"
+            elif filter_value == 'Paid Late':
+                where_clause += " AND ft.payment_status = 'PAID' AND ft.fees_paid_date > ft.due_date"
+            elif filter_value == 'Pending (Not Due)':
+                where_clause += " AND ft.payment_status IN ('UNPAID', 'PARTIAL_PAID') AND ft.due_date >= CURDATE()"
+            elif filter_value == 'No Due Date':
+                where_clause += " AND ft.due_date IS NULL"
+        elif filter_type in allowed_columns:
+            where_clause += f" AND ft.{filter_type} = %s"
+            params.append(filter_value)
+
+    limit_clause = "" if is_full_list else "LIMIT 100"
+    component_columns = "".join(f",\n            ft.{comp}" for comp in FEE_COMPONENTS) if include_components else ""
+
+    # Update the query to include all requested fields
+    query = f"""
+        SELECT
+            ft.fees_trans_id,
+            ft.registration_code,
+            ft.student_name,
+            ft.fees_paid_date,
+            ft.amount_paid,
+            ft.total_amt,
+            ft.payment_status,
+            ft.payment_mode,
+            ft.course_name,
+            ft.installment_no,
+            ft.payment_option,
+            ft.institution_code,
+            ft.division_name,
+            ft.refund_amount,
+            ft.due_date,
+            ft.qfix_ref_no,
+            ft.fees_category,
+            ft.payment_details,
+            ft.payment_reference_details,
+            ft.settlement_date,
+            ft.bank_reference_no,
+            ft.late_payment_charges{component_columns}
+        FROM student_fee_transactions ft
+        WHERE {where_clause}
+        ORDER BY ft.registration_code, ft.fees_paid_date DESC
+        {limit_clause}
+    """
+    return query, params
+
+def get_filtered_transaction_list(filters, is_full_list=False, columnar=False):
+    """
+    Returns the filtered transaction list as a list of dicts with a nested fee_components object.
+    With columnar=True the result is {'columns': [...], 'rows': [[...], ...]} instead, with
+    fee_components as the last column. Raises ValueError for an invalid since.
+    """
     db_conn = None
     cursor = None
     try:
         db_conn = get_db_connection()
-        cursor = db_conn.cursor(dictionary=True)
+        # Rows are read as tuples and reshaped in bulk; dicts are only built at the end if requested.
+        cursor = db_conn.cursor()
 
-        where_clause, params = _build_fees_where_clause(filters)
-        
-        # Add drill-down logic
-        filter_type = filters.get('filterType')
-        filter_value = filters.get('filterValue')
-        if filter_type and filter_value:
-            # Handle special cases if any, otherwise map directly
-            allowed_columns = [
-                'payment_status', 'payment_mode', 'course_name', 'installment_no',
-                'institution_code', 'payment_option', 'division_name'
-            ]
-            
-            # Handle special filter types
-            if filter_type == 'fees_paid_date':
-                where_clause += " AND DATE(ft.fees_paid_date) = %s"
-                params.append(filter_value)
-            elif filter_type == 'month_range':
-                # Extract year and month from YYYY-MM format
-                year, month = filter_value.split('-')
-                where_clause += " AND YEAR(ft.fees_paid_date) = %s AND MONTH(ft.fees_paid_date) = %s"
-                params.extend([year, month])
-            elif filter_type == 'due_date_status':
-                # Special handling for due date status
-                if filter_value == 'Overdue Unpaid':
-                    where_clause += " AND ft.due_date < CURDATE() AND ft.payment_status IN ('UNPAID', 'PARTIAL_PAID')"
-                elif filter_value == 'Paid On Time':
-                    where_clause += " AND ft.payment_status = 'PAID' AND ft.fees_paid_date <= ft.due_date"
-                elif filter_value == 'Paid Late':
-                    where_clause += " AND ft.payment_status = 'PAID' AND ft.fees_paid_date > ft.due_date"
-                elif filter_value == 'Pending (Not Due)':
-                    where_clause += " AND ft.payment_status IN ('UNPAID', 'PARTIAL_PAID') AND ft.due_date >= CURDATE()"
-                elif filter_value == 'No Due Date':
-                    where_clause += " AND ft.due_date IS NULL"
-            elif filter_type in allowed_columns:
-                where_clause += f" AND ft.{filter_type} = %s"
-                params.append(filter_value)
-
-        limit_clause = "" if is_full_list else "LIMIT 100"
-        
-        # List of fee components to include
-        fee_components = [
-            'tuition_fees', 'term_fees', 'library_fees', 'gymkhana_fees', 'other_fees',
-            'examination_fees', 'development_fees', 'registration_fees', 'laboratory_fee',
-            'pupils_fund', 'activity_fees', 'admission_fees', 'development_fund',
-            'refundable_deposit', 'general_deposit', 'enrolment_fee', 'laboratory_deposit',
-            'uni_registration_fees', 'student_aid_fees', 'library_deposit',
-            'caution_money_deposit', 'lab_fees', 'uni_administration_fees',
-            'it_fees', 'pta_fees', 'university_registration_fees', 'laboratory_fees',
-            'university_administration_fees', 'library_id_card_etc', 'computer_lab_fees',
-            'information_technology_fees', 'iaims_fees_dhe', 'iams_fees',
-            'alumni_registration_fees', 'academic_restructuring_and_development_fees',
-            'magazine_academic_diary_placement_brochure', 'id_card_fees', 'iaims_fees'
-        ]
-        
-        # Update the query to include all requested fields
-        query = f"""
-            SELECT 
-                ft.fees_trans_id,
-                ft.registration_code,
-                ft.student_name,
-                ft.fees_paid_date,
-                ft.amount_paid,
-                ft.total_amt,
-                ft.payment_status,
-                ft.payment_mode,
-                ft.course_name,
-                ft.installment_no,
-                ft.payment_option,
-                ft.institution_code,
-                ft.division_name,
-                ft.refund_amount,
-                ft.due_date,
-                ft.qfix_ref_no,
-                ft.fees_category,
-                ft.payment_details,
-                ft.payment_reference_details,
-                ft.settlement_date,
-                ft.bank_reference_no,
-                ft.late_payment_charges,
-                {', '.join([f'ft.{comp}' for comp in fee_components])}
-            FROM student_fee_transactions ft
-            WHERE {where_clause}
-            ORDER BY ft.registration_code, ft.fees_paid_date DESC
-            {limit_clause}
-        """
-        cursor.execute(query, params)
-        transactions = cursor.fetchall()
-        
-        # Convert Decimal objects to floats and structure fee components
-        processed_transactions = []
-        for transaction in transactions:
-            # Extract fee components into a separate object
-            fee_components_data = {}
-            for comp in fee_components:
-                if transaction.get(comp) and transaction[comp] > 0:
-                    fee_components_data[comp] = float(transaction[comp])
-                # Remove the component from the main transaction object
-                if comp in transaction:
-                    del transaction[comp]
-            
-            # Add fee components as a nested object
-            transaction['fee_components'] = fee_components_data
-            processed_transactions.append(transaction)
-        
-        return _convert_decimals_to_floats(processed_transactions)
+        if fee_component_lines_available(cursor):
+            query, params = _build_transaction_list_query(filters, is_full_list, include_components=False)
+            cursor.execute(query, params)
+            transactions = cursor.fetchall()
+            column_names = list(cursor.column_names)
+            id_idx = column_names.index('fees_trans_id')
+            breakdown = _fetch_fee_component_breakdown(db_conn, [row[id_idx] for row in transactions])
+            result = {
+                'columns': column_names + ['fee_components'],
+                'rows': [list(row) + [breakdown.get(row[id_idx], {})] for row in transactions],
+            }
+        else:
+            query, params = _build_transaction_list_query(filters, is_full_list)
+            cursor.execute(query, params)
+            result = _to_columnar_transactions(list(cursor.column_names), cursor.fetchall())
+
+        if columnar:
+            return result
+        columns = result['columns']
+        return [dict(zip(columns, row)) for row in result['rows']]
     finally:
         if cursor: cursor.close()
-        if db_conn and db_conn.is_connected(): db_conn.close()
\ No newline at end of file
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+def _to_columnar_transactions(column_names, rows):
+    """
+    Moves the flat fee component columns of each row into a fee_components dict column, keeping only
+    positive amounts. The column positions are resolved once and read with itemgetter, instead of
+    testing and deleting each component key per row.
+    """
+    component_set = set(FEE_COMPONENTS)
+    base_idx = [i for i, name in enumerate(column_names) if name not in component_set]
+    comp_idx = [i for i, name in enumerate(column_names) if name in component_set]
+    columns = [column_names[i] for i in base_idx] + ['fee_components']
+    comp_names = [column_names[i] for i in comp_idx]
+    get_base = itemgetter(*base_idx)
+    get_components = itemgetter(*comp_idx)
+
+    columnar_rows = []
+    for row in rows:
+        values = list(get_base(row))
+        values.append({name: amount for name, amount in zip(comp_names, get_components(row)) if amount and amount > 0})
+        columnar_rows.append(values)
+
+    return {'columns': columns, 'rows': columnar_rows}
+
+def iter_filtered_transaction_rows(filters, batch_size=1000):
+    """
+    Streams the full filtered transaction list for exports, with one flat column per fee component.
+    The first item yielded is the cursor description (column names and types), followed by batches of row tuples
+    read from an unbuffered cursor.
+    """
+    db_conn = None
+    cursor = None
+    try:
+        db_conn = get_db_connection()
+        cursor = db_conn.cursor()
+        query, params = _build_transaction_list_query(filters, is_full_list=True)
+        cursor.execute(query, params)
+        yield cursor.description
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        if cursor:
+            try:
+                cursor.close()
+            except mysql.connector.Error:
+                # The export was abandoned part way through; unread rows are dropped with the connection.
+                pass
+        if db_conn and db_conn.is_connected(): db_conn.close()
@@ -10,6 +10,7 @@ import {
   BarElement,
 } from "chart.js";
 import "./Dashboard.css";
+import { fetchJsonCached, useDataVersion } from "../useDataVersion";
 
 ChartJS.register(
   ArcElement,
@@ -20,6 +21,10 @@ ChartJS.register(
   BarElement
 );
 
+// The overview covers every institution. The API scopes requests without institution_code to the
+// user's own institution, so every request from this page sends institution_code=all.
+const ALL_INSTITUTIONS = { institution_code: "all" };
+
 const Dashboard = () => {
   // State for student data
   const [studentData, setStudentData] = useState(null);
@@ -132,30 +137,20 @@ const Dashboard = () => {
     return amount.toLocaleString("en-IN");
   };
 
+  // Changes after uploads and edits; the effect below then re-queries
+  const dataVersion = useDataVersion("all");
+
   useEffect(() => {
     const fetchAllData = async () => {
       setLoading(true);
       setError("");
       try {
-        const token = localStorage.getItem("token");
-
-        // Fetch both student and fees data
-        const [studentResponse, feesResponse] = await Promise.all([
-          fetch(`http://localhost:5000/api/dashboard/students`, {
-            headers: { "x-access-token": token },
-          }),
-          fetch(`http://localhost:5000/api/dashboard/fees`, {
-            headers: { "x-access-token": token },
-          }),
+        // Fetch both student and fees data (reused until the data version changes)
+        const [studentResult, feesResult] = await Promise.all([
+          fetchJsonCached(`http://localhost:5000/api/dashboard/students?institution_code=all`, dataVersion),
+          fetchJsonCached(`http://localhost:5000/api/dashboard/fees?institution_code=all`, dataVersion),
         ]);
 
-        if (!studentResponse.ok || !feesResponse.ok) {
-          throw new Error("Failed to fetch dashboard data");
-        }
-
-        const studentResult = await studentResponse.json();
-        const feesResult = await feesResponse.json();
-
         setStudentData(studentResult);
         setFeesData(feesResult);
       } catch (err) {
@@ -166,7 +161,7 @@ const Dashboard = () => {
     };
 
     fetchAllData();
-  }, []);
+  }, [dataVersion]);
 
   // Student chart data
   const studentChartDataSets = useMemo(() => {
@@ -367,6 +362,7 @@ const Dashboard = () => {
 
     setLoading(true);
     const filterParams = {
+      ...ALL_INSTITUTIONS,
       filterType,
       filterValue,
     };
@@ -420,6 +416,7 @@ const Dashboard = () => {
 
     setLoading(true);
     const filterParams = {
+      ...ALL_INSTITUTIONS,
       filterType: actualFilterType,
       filterValue: actualFilterValue,
       ...additionalFilters,
@@ -454,7 +451,7 @@ const Dashboard = () => {
   };
 
   // Student detail view handler
-  const handleViewStudentDetails = async (studentRefId, masterId) => {
+  const handleViewStudentDetails = async (studentRefId, masterId, institutionCode) => {
     // Prefer masterId if available, otherwise fall back to studentRefId
     const identifier = masterId || studentRefId;
     const identifierType = masterId ? "master_id" : "student_reference_id";
@@ -469,7 +466,11 @@ const Dashboard = () => {
       const token = localStorage.getItem("token");
 
       const response = await fetch(
-        `http://localhost:5000/api/students/details/${identifier}?identifier_type=${identifierType}`,
+        `http://localhost:5000/api/students/details/${identifier}?${new URLSearchParams({
+          identifier_type: identifierType,
+          // Identifiers are only unique within an institution
+          institution_code: institutionCode || "all",
+        }).toString()}`,
         { headers: { "x-access-token": token } }
       );
 
@@ -507,7 +508,7 @@ const Dashboard = () => {
   const handleStudentKpiClick = async (kpiType) => {
     setLoading(true);
 
-    const filterParams = {};
+    const filterParams = { ...ALL_INSTITUTIONS };
 
     // Add gender filter for male/female KPIs
     if (kpiType === "male_students") {
@@ -562,7 +563,7 @@ const Dashboard = () => {
     setLoading(true);
 
     // Set filter parameters based on KPI type
-    const filterParams = {};
+    const filterParams = { ...ALL_INSTITUTIONS };
 
     // Set payment status filter based on KPI type
     switch (kpiType) {
@@ -950,7 +951,8 @@ const Dashboard = () => {
                         onClick={() =>
                           handleViewStudentDetails(
                             s.student_reference_id,
-                            s.master_id
+                            s.master_id,
+                            s.institution_code
                           )
                         }
                       >
@@ -1024,7 +1026,8 @@ const Dashboard = () => {
                         onClick={() =>
                           handleViewStudentDetails(
                             s.student_reference_id,
-                            s.master_id
+                            s.master_id,
+                            s.institution_code
                           )
                         }
                       >
@@ -13,6 +13,7 @@ import {
   Filler,
 } from "chart.js";
 import "./Fees.css";
+import { fetchJsonCached, useDataVersion } from "../useDataVersion";
 
 ChartJS.register(
   ArcElement,
@@ -229,11 +230,13 @@ const formatAmount = (amount) => {
     };
   };
 
+  // Changes after uploads and edits for the selected institution; fetchData then re-queries
+  const dataVersion = useDataVersion(selectedInstitution);
+
   const fetchData = useCallback(async () => {
     setLoading(true);
     setError("");
     try {
-      const token = localStorage.getItem("token");
       const params = new URLSearchParams({
         institution_code: selectedInstitution,
         batch_year: selectedBatch,
@@ -249,25 +252,17 @@ const formatAmount = (amount) => {
         params.append('end_date', appliedEndDate);
       }
 
-      const response = await fetch(
+      const result = await fetchJsonCached(
         `http://localhost:5000/api/dashboard/fees?${params.toString()}`,
-        { headers: { "x-access-token": token } }
+        dataVersion
       );
-
-      if (!response.ok) {
-        const errData = await response.json();
-        throw new Error(
-          errData.message || `HTTP error! status: ${response.status}`
-        );
-      }
-      const result = await response.json();
       setData(result);
     } catch (err) {
       setError(`Failed to fetch fees data: ${err.message}`);
     } finally {
       setLoading(false);
     }
-  }, [selectedInstitution, selectedBatch, selectedStatus, selectedMode, appliedStartDate, appliedEndDate]);
+  }, [selectedInstitution, selectedBatch, selectedStatus, selectedMode, appliedStartDate, appliedEndDate, dataVersion]);
 
   // Debounced version of fetchData
   const debouncedFetchData = useMemo(() => debounce(fetchData, 300), [fetchData]);
@@ -663,17 +658,26 @@ const formatAmount = (amount) => {
     openModal('detail', transaction);
   };
 
-  const exportData = async (data) => {
+  const exportData = async (data, filterParams = null) => {
     const token = localStorage.getItem("token");
     try {
-      const response = await fetch("http://localhost:5000/api/export/excel", {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-          "x-access-token": token,
-        },
-        body: JSON.stringify(data),
-      });
+      // When the popup's filters are known and no search term narrows the rows,
+      // the server runs the query itself and streams the file.
+      const response = filterParams && !popupSearchTerm
+        ? await fetch(
+            `http://localhost:5000/api/export/stream/transactions?${new URLSearchParams(
+              { ...filterParams, format: "xlsx" }
+            ).toString()}`,
+            { headers: { "x-access-token": token } }
+          )
+        : await fetch("http://localhost:5000/api/export/excel", {
+            method: "POST",
+            headers: {
+              "Content-Type": "application/json",
+              "x-access-token": token,
+            },
+            body: JSON.stringify(data),
+          });
       if (!response.ok) throw new Error("Excel export failed");
       const blob = await response.blob();
       const url = window.URL.createObjectURL(blob);
@@ -1174,7 +1178,7 @@ const formatAmount = (amount) => {
             <div className="modal-body">
               <div className="modal-controls">
                 <button
-                  onClick={() => exportData(filteredPopupTransactions)}
+                  onClick={() => exportData(filteredPopupTransactions, popupData.filterParams)}
                   className="view-full-list-btn"
                 >
                   Export Excel
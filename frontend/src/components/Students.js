@@ -14,6 +14,7 @@ import {
   RadialLinearScale,
 } from "chart.js";
 import "./Students.css";
+import { fetchJsonCached, useDataVersion } from "../useDataVersion";
 
 ChartJS.register(
   ArcElement,
@@ -172,12 +173,14 @@ const Students = () => {
     fetchInitialData();
   }, []);
 
+  // Changes after uploads and edits for the selected institution; the effect below then re-queries
+  const dataVersion = useDataVersion(selectedInstitution);
+
   useEffect(() => {
     const fetchData = async () => {
       setLoading(true);
       setError("");
       try {
-        const token = localStorage.getItem("token");
         const params = new URLSearchParams({
           institution_code: selectedInstitution,
           batch_year: selectedBatch,
@@ -185,18 +188,10 @@ const Students = () => {
           student_category: selectedCategory,
         });
 
-        const response = await fetch(
+        const result = await fetchJsonCached(
           `http://localhost:5000/api/dashboard/students?${params.toString()}`,
-          { headers: { "x-access-token": token } }
+          dataVersion
         );
-
-        if (!response.ok) {
-          const errData = await response.json();
-          throw new Error(
-            errData.message || `HTTP error! status: ${response.status}`
-          );
-        }
-        const result = await response.json();
         setData(result);
       } catch (err) {
         setError(`Failed to fetch student data: ${err.message}`);
@@ -205,7 +200,7 @@ const Students = () => {
       }
     };
     fetchData();
-  }, [selectedInstitution, selectedBatch, selectedGender, selectedCategory]);
+  }, [selectedInstitution, selectedBatch, selectedGender, selectedCategory, dataVersion]);
 
   const chartDataSets = useMemo(() => {
     if (!data) return {};
@@ -476,7 +471,7 @@ const Students = () => {
     }
   };
 
-  const handleViewStudentDetails = async (studentRefId, masterId) => {
+  const handleViewStudentDetails = async (studentRefId, masterId, institutionCode) => {
     // Prefer masterId if available, otherwise fall back to studentRefId
     const identifier = masterId || studentRefId;
     const identifierType = masterId ? "master_id" : "student_reference_id";
@@ -491,7 +486,11 @@ const Students = () => {
       const token = localStorage.getItem("token");
 
       const response = await fetch(
-        `http://localhost:5000/api/students/details/${identifier}?identifier_type=${identifierType}`,
+        `http://localhost:5000/api/students/details/${identifier}?${new URLSearchParams({
+          identifier_type: identifierType,
+          // Identifiers are only unique within an institution
+          institution_code: institutionCode || "all",
+        }).toString()}`,
         { headers: { "x-access-token": token } }
       );
 
@@ -522,14 +521,23 @@ const Students = () => {
     if (format === "excel") {
       const token = localStorage.getItem("token");
       try {
-        const response = await fetch("http://localhost:5000/api/export/excel", {
-          method: "POST",
-          headers: {
-            "Content-Type": "application/json",
-            "x-access-token": token,
-          },
-          body: JSON.stringify(data),
-        });
+        // Without a search term the export covers the popup's filters, so let the
+        // server run the query and stream the file instead of posting the rows back.
+        const response = popupSearchTerm
+          ? await fetch("http://localhost:5000/api/export/excel", {
+              method: "POST",
+              headers: {
+                "Content-Type": "application/json",
+                "x-access-token": token,
+              },
+              body: JSON.stringify(data),
+            })
+          : await fetch(
+              `http://localhost:5000/api/export/stream/students?${new URLSearchParams(
+                { ...popupData.filterParams, format: "xlsx" }
+              ).toString()}`,
+              { headers: { "x-access-token": token } }
+            );
         if (!response.ok) throw new Error("Excel export failed");
         const blob = await response.blob();
         const url = window.URL.createObjectURL(blob);
@@ -927,7 +935,8 @@ const Students = () => {
                         onClick={() =>
                           handleViewStudentDetails(
                             s.student_reference_id,
-                            s.master_id
+                            s.master_id,
+                            s.institution_code
                           )
                         }
                       >
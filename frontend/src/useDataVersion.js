@@ -0,0 +1,115 @@
+import { useEffect, useState } from "react";
+
+const API_BASE = "http://localhost:5000";
+const RECONNECT_DELAY_MS = 5000;
+// The server caps open streams per worker and answers 503 when they are all taken
+const BUSY_RECONNECT_DELAY_MS = 60000;
+
+// Last response per token, day and URL, with the data version it was read at (X-Data-Version header)
+const responseCache = new Map();
+let responseCacheDay = null;
+
+/**
+ * Follows /api/data-version/stream and returns the current data-version token for the institution
+ * (null until the first event). Components add it to their fetch effect dependencies so they re-query
+ * only after an upload or edit. EventSource cannot send the x-access-token header, so the stream is
+ * read with fetch.
+ */
+export function useDataVersion(institutionCode) {
+  const [version, setVersion] = useState(null);
+
+  useEffect(() => {
+    const controller = new AbortController();
+    let reconnectTimer = null;
+    let lastVersion = null;
+
+    const connect = async () => {
+      let delay = RECONNECT_DELAY_MS;
+      const params = new URLSearchParams();
+      if (institutionCode) params.append("institution_code", institutionCode);
+      if (lastVersion) params.append("since", lastVersion);
+
+      try {
+        const response = await fetch(
+          `${API_BASE}/api/data-version/stream?${params.toString()}`,
+          {
+            headers: { "x-access-token": localStorage.getItem("token") },
+            signal: controller.signal,
+          }
+        );
+        // Logged out or token expired: stop until the component mounts again
+        if (response.status === 401) return;
+        if (response.status === 503) delay = BUSY_RECONNECT_DELAY_MS;
+        if (!response.ok || !response.body) throw new Error(`HTTP ${response.status}`);
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+
+          let boundary;
+          while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+            const message = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            const lines = message.split("\n");
+            if (!lines.includes("event: data-version")) continue;
+            const data = lines
+              .filter((line) => line.startsWith("data:"))
+              .map((line) => line.slice(5).trim())
+              .join("\n");
+            const event = JSON.parse(data);
+            lastVersion = event.version;
+            setVersion(event.version);
+          }
+        }
+      } catch (err) {
+        if (controller.signal.aborted) return;
+        console.error("Data version stream error:", err);
+      }
+      // The server closes the stream periodically; reconnect with the last version seen
+      reconnectTimer = setTimeout(connect, delay);
+    };
+
+    connect();
+    return () => {
+      controller.abort();
+      clearTimeout(reconnectTimer);
+    };
+  }, [institutionCode]);
+
+  return version;
+}
+
+/**
+ * GETs a JSON API URL, reusing the previous response for the same URL while its X-Data-Version
+ * equals version. With version null (stream not connected yet) it always fetches. Responses are only
+ * reused on the day they were fetched: dashboard payloads compare against the current date (overdue
+ * fees, age groups, this year's trend), like the server's ETags.
+ */
+export async function fetchJsonCached(url, version) {
+  const token = localStorage.getItem("token");
+  const day = new Date().toDateString();
+  if (day !== responseCacheDay) {
+    responseCache.clear();
+    responseCacheDay = day;
+  }
+  const key = `${token}|${day}|${url}`;
+  const cached = responseCache.get(key);
+  if (cached && version !== null && cached.version === version) {
+    return cached.data;
+  }
+
+  const response = await fetch(url, { headers: { "x-access-token": token } });
+  if (!response.ok) {
+    const errData = await response.json().catch(() => ({}));
+    throw new Error(
+      errData.message || errData.error || `HTTP error! status: ${response.status}`
+    );
+  }
+  const data = await response.json();
+  responseCache.set(key, { version: response.headers.get("X-Data-Version"), data });
+  return data;
+}
@@ -0,0 +1,80 @@
+"""
+Gunicorn configuration for production serving.
+
+The same app runs in two roles, selected with GUNICORN_ROLE:
+  - api (default): dashboards, lists, exports and the data viewer. These routes mostly wait on MySQL,
+    so each worker process serves several requests at once on threads (gthread).
+  - uploads: /preview, /upload, /process_upload and the bulk update routes. These hold pandas
+    DataFrames and run the row validators, so each request gets a whole sync worker process, and
+    workers are recycled often to give the memory back to the OS.
+Route the upload paths to the uploads instance in the reverse proxy (see README).
+
+Usage:
+    gunicorn -c gunicorn.conf.py wsgi:app
+    GUNICORN_ROLE=uploads GUNICORN_BIND=0.0.0.0:8001 gunicorn -c gunicorn.conf.py wsgi:app
+
+Every setting below can be overridden with the matching environment variable.
+
+Reloading: the app is preloaded in the master (preload_app), so SIGHUP restarts the workers gracefully
+but they fork from the code the master already imported, which picks up configuration changes only. To
+deploy new code without downtime send SIGUSR2 (starts a new master and workers on the new code), then
+SIGTERM to the old master once the new workers are up; or restart the service. With GUNICORN_PRELOAD=0
+each worker imports the app itself and SIGHUP reloads code too, at the cost of per-worker import time
+and memory.
+"""
+import multiprocessing
+import os
+
+ROLE = os.environ.get('GUNICORN_ROLE', 'api')
+if ROLE not in ('api', 'uploads'):
+    raise ValueError(f"GUNICORN_ROLE must be 'api' or 'uploads', not '{ROLE}'.")
+
+_cpus = multiprocessing.cpu_count()
+
+if ROLE == 'api':
+    _defaults = {
+        'bind': '0.0.0.0:8000',
+        'worker_class': 'gthread',  # set GUNICORN_WORKER_CLASS=gevent to use greenlets instead
+        'workers': _cpus + 1,
+        # Each open dashboard tab holds one thread for its data-version stream, up to
+        # DATA_VERSION_STREAM_LIMIT (default 4) per worker; raise both together for more live tabs.
+        'threads': 8,
+        'timeout': 60,
+        'max_requests': 2000,
+    }
+else:
+    _defaults = {
+        'bind': '0.0.0.0:8001',
+        'worker_class': 'sync',
+        'workers': max(2, _cpus // 2),
+        'threads': 1,
+        'timeout': 600,  # large files can take minutes to validate
+        'max_requests': 50,
+    }
+
+
+def _setting(name, cast=str):
+    return cast(os.environ.get(f'GUNICORN_{name.upper()}', _defaults[name]))
+
+
+bind = _setting('bind')
+worker_class = _setting('worker_class')
+workers = _setting('workers', int)
+threads = _setting('threads', int)
+timeout = _setting('timeout', int)
+
+# Worker recycling: restart a worker after this many requests (plus jitter so they do not all restart at once).
+max_requests = _setting('max_requests', int)
+max_requests_jitter = max(1, max_requests // 10)
+
+# Import the app once in the master so workers fork with the modules already loaded.
+# No database connections or threads are created at import time, so this is safe to share.
+# Code changes then need SIGUSR2 or a restart rather than SIGHUP (see above).
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+proc_name = f'vvm-{ROLE}'
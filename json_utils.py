@@ -0,0 +1,75 @@
+"""
+This module contains the JSON provider used for all API responses. It encodes the types returned by
+mysql.connector (datetime, date, TIME values as timedelta, and DECIMAL values) directly during
+serialization, so query results can be passed to jsonify without converting every row first.
+orjson is used when it is installed; otherwise the standard json module is used.
+"""
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+import tracing_utils
+
+# orjson is optional and only used for speed; the output is the same with either backend.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _format_time(value):
+    """Formats a MySQL TIME value (returned as timedelta) as HH:MM:SS."""
+    total_seconds = int(value.total_seconds())
+    sign = '-' if total_seconds < 0 else ''
+    hours, remainder = divmod(abs(total_seconds), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{sign}{hours:02}:{minutes:02}:{seconds:02}"
+
+
+def encode_value(value):
+    """Converts a value the JSON encoder does not support natively."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return _format_time(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class JSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes database values in a single pass."""
+
+    def _orjson_dumps(self, obj):
+        # Datetimes are passed through to the default hook so both backends format them the same way.
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=encode_value, option=option)
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return self._orjson_dumps(obj).decode('utf-8')
+
+        kwargs.setdefault('default', encode_value)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        with tracing_utils.span('serialize') as serialize_span:
+            if orjson is not None:
+                body = self._orjson_dumps(obj)
+            else:
+                body = json.dumps(obj, default=encode_value, ensure_ascii=self.ensure_ascii,
+                                  sort_keys=self.sort_keys, separators=(',', ':'))
+            if serialize_span is not None:
+                serialize_span.attributes['bytes'] = len(body)
+        return self._app.response_class(body, mimetype=self.mimetype)
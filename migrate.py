@@ -0,0 +1,296 @@
+"""
+Schema migration tool.
+
+Migrations are the numbered .sql files in the migrations/ directory (e.g. 0001_analytics_indexes.sql).
+Applied versions are recorded in the schema_migrations table.
+
+Usage:
+    python migrate.py status     # list applied and pending migrations
+    python migrate.py upgrade    # apply pending migrations in order
+    python migrate.py check      # EXPLAIN the hot dashboard/upload queries and flag full table scans
+    python migrate.py partition  # LIST-partition the master tables by institution (after 0005), add new institutions
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+
+import mysql.connector
+
+import dashboard_utils
+import fees_dashboard_utils
+import partition_utils
+from db_utils import get_db_connection
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d{4})_([a-z0-9_]+)\.sql$')
+
+# Tables partitioned by institution_code (one LIST partition per institution) by the partition command
+PARTITIONED_TABLES = ('students_details_master', 'student_fee_transactions')
+INSTITUTION_CODE_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+
+# --- Migration files ---
+def load_migrations():
+    """Returns [(version, name, path)] for every migration file, sorted by version."""
+    migrations = []
+    for file_name in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = MIGRATION_FILE_PATTERN.match(file_name)
+        if match:
+            migrations.append((match.group(1), match.group(2), os.path.join(MIGRATIONS_DIR, file_name)))
+    return migrations
+
+
+def split_sql_statements(sql):
+    """Splits a migration file into statements, dropping '--' comment lines."""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [stmt.strip() for stmt in '\n'.join(lines).split(';') if stmt.strip()]
+
+
+def _checksum(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+# --- schema_migrations table ---
+def ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(20) NOT NULL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            checksum CHAR(64) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci
+    """)
+
+
+def get_applied_migrations(cursor):
+    cursor.execute("SELECT version, name, checksum, applied_at FROM schema_migrations ORDER BY version")
+    return {row['version']: row for row in cursor.fetchall()}
+
+
+# --- Commands ---
+def cmd_status(args):
+    db_conn = None
+    cursor = None
+    try:
+        db_conn = get_db_connection()
+        cursor = db_conn.cursor(dictionary=True)
+        ensure_migrations_table(cursor)
+        applied = get_applied_migrations(cursor)
+
+        for version, name, path in load_migrations():
+            row = applied.get(version)
+            if row is None:
+                print(f"  {version}  {name:<40} pending")
+            elif row['checksum'] != _checksum(path):
+                print(f"  {version}  {name:<40} applied {row['applied_at']} (file changed since it was applied)")
+            else:
+                print(f"  {version}  {name:<40} applied {row['applied_at']}")
+        return 0
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+
+def cmd_upgrade(args):
+    db_conn = None
+    cursor = None
+    try:
+        db_conn = get_db_connection()
+        cursor = db_conn.cursor(dictionary=True)
+        ensure_migrations_table(cursor)
+        applied = get_applied_migrations(cursor)
+
+        pending = [m for m in load_migrations() if m[0] not in applied]
+        if not pending:
+            print("Database is up to date.")
+            return 0
+
+        for version, name, path in pending:
+            print(f"Applying {version}_{name} ...")
+            with open(path, encoding='utf-8') as f:
+                statements = split_sql_statements(f.read())
+            # MySQL commits DDL implicitly, so a failed migration can leave earlier statements applied.
+            # The version is only recorded once every statement has succeeded.
+            for statement in statements:
+                try:
+                    cursor.execute(statement)
+                except mysql.connector.Error as err:
+                    print(f"Migration {version}_{name} failed: {err.msg}")
+                    print(f"Statement:\n{statement}")
+                    db_conn.rollback()
+                    return 1
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                (version, name, _checksum(path))
+            )
+            db_conn.commit()
+            print(f"Applied {version}_{name} ({len(statements)} statements).")
+        return 0
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+
+def hot_queries(institution_code):
+    """Returns [(label, query, params)] for the queries the dashboards and uploads run most often."""
+    student_filters = {'institution_code': institution_code, 'batch_year': 'all'}
+    fee_filters = {'institution_code': institution_code, 'start_date': '2024-01-01', 'end_date': '2024-12-31'}
+
+    student_where, student_params = dashboard_utils._build_where_clause(student_filters)
+    fee_where, fee_params = fees_dashboard_utils._build_fees_where_clause(fee_filters)
+    student_list_query, student_list_params = dashboard_utils._build_student_list_query(student_filters)
+    age_where, age_params = dashboard_utils._build_where_clause(
+        dict(student_filters, filterType='age_group', filterValue='18-20'))
+    transaction_list_query, transaction_list_params = fees_dashboard_utils._build_transaction_list_query(fee_filters)
+
+    return [
+        ('student dashboard KPIs',
+         f"SELECT COUNT(*) FROM students_details_master {student_where}", student_params),
+        ('student list', student_list_query, student_list_params),
+        ('student age drill-down', f"SELECT COUNT(*) FROM students_details_master {age_where}", age_params),
+        ('fees dashboard summary', fees_dashboard_utils._build_fee_summary_query(fee_where), fee_params),
+        ('transaction list', transaction_list_query, transaction_list_params),
+        ('overdue fees',
+         "SELECT COUNT(*) FROM student_fee_transactions WHERE due_date < CURDATE() AND payment_status IN ('UNPAID', 'PARTIAL_PAID')", []),
+        ('student duplicate check',
+         "SELECT 1 FROM students_details_master WHERE institution_code = %s AND admission_no = %s AND is_active = 1",
+         [institution_code, 'CHECK']),
+        ('fee duplicate check (registration)',
+         """SELECT 1 FROM student_fee_transactions WHERE institution_code <=> %s AND registration_code <=> %s
+            AND course_name <=> %s AND installment_no <=> %s AND fees_paid_date <=> %s""",
+         [institution_code, 'CHECK', 'CHECK', 'CHECK', '2024-01-01']),
+        ('fee duplicate check (student name)',
+         """SELECT 1 FROM student_fee_transactions WHERE institution_code <=> %s AND student_name <=> %s
+            AND installment_no <=> %s AND amount_paid <=> %s AND fees_paid_date <=> %s""",
+         [institution_code, 'CHECK', 'CHECK', 0, '2024-01-01']),
+        ('data version',
+         """SELECT (SELECT MAX(upload_id) FROM user_upload_details WHERE institution_code = %s),
+                   (SELECT MAX(updated_at) FROM students_details_master WHERE institution_code = %s),
+                   (SELECT MAX(updated_at) FROM student_fee_transactions WHERE institution_code = %s)""",
+         [institution_code] * 3),
+    ]
+
+
+def cmd_check(args):
+    db_conn = None
+    cursor = None
+    try:
+        db_conn = get_db_connection()
+        cursor = db_conn.cursor(dictionary=True)
+
+        institution_code = args.institution
+        if not institution_code:
+            cursor.execute("SELECT institution_code FROM institutions ORDER BY institution_code LIMIT 1")
+            row = cursor.fetchone()
+            institution_code = row['institution_code'] if row else 'VVM'
+
+        full_scans = 0
+        for label, query, params in hot_queries(institution_code):
+            cursor.execute(f"EXPLAIN {query}", params)
+            plan = cursor.fetchall()
+            flagged = [step for step in plan if step.get('type') == 'ALL']
+            full_scans += len(flagged)
+            print(f"{'FULL SCAN' if flagged else 'ok':<10} {label}")
+            for step in plan:
+                print(f"           table={step.get('table')} partitions={step.get('partitions')} type={step.get('type')} key={step.get('key')} rows={step.get('rows')}")
+
+        if full_scans:
+            print(f"\n{full_scans} full table scan(s) found. Note that MySQL may still scan very small tables even when an index exists.")
+            return 1
+        print("\nNo full table scans in the hot queries.")
+        return 0
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+
+def _partition_definitions(codes, taken_names):
+    """PARTITION clauses for the given institution codes, with names that do not clash with taken_names."""
+    definitions = []
+    for code in codes:
+        name = base_name = 'p_' + re.sub(r'[^a-z0-9_]', '_', code.lower())
+        suffix = 2
+        while name in taken_names:
+            name = f"{base_name}_{suffix}"
+            suffix += 1
+        taken_names.add(name)
+        definitions.append(f"PARTITION {name} VALUES IN ('{code}')")
+    return definitions
+
+
+def cmd_partition(args):
+    """
+    LIST COLUMNS-partitions the master tables on institution_code, one partition per institution, and adds
+    partitions for institutions added since. A row for an institution without a partition cannot be inserted,
+    so run this after adding an institution and before its first upload.
+    """
+    db_conn = None
+    cursor = None
+    try:
+        db_conn = get_db_connection()
+        cursor = db_conn.cursor()
+
+        cursor.execute("""
+            SELECT institution_code FROM institutions
+            UNION SELECT DISTINCT institution_code FROM students_details_master
+            UNION SELECT DISTINCT institution_code FROM student_fee_transactions
+        """)
+        codes = {}
+        for (code,) in cursor.fetchall():
+            if code is None:
+                continue
+            if not INSTITUTION_CODE_PATTERN.match(code):
+                print(f"Institution code {code!r} cannot be used as a partition value (letters, digits, '_' and '-' only).")
+                return 1
+            # The column collation compares case-insensitively, so 'sdcce' and 'SDCCE' share a partition
+            codes.setdefault(code.casefold(), code)
+
+        for table_name in PARTITIONED_TABLES:
+            partitions = partition_utils.read_institution_partitions(cursor, table_name)
+            partitioned = {code.casefold() for values in partitions.values() for code in values}
+            missing = [code for key, code in sorted(codes.items()) if key not in partitioned]
+            if not missing:
+                print(f"{table_name}: {len(partitions)} partitions, up to date.")
+                continue
+
+            definitions = _partition_definitions(missing, set(partitions))
+            if partitions:
+                statement = f"ALTER TABLE {table_name} ADD PARTITION ({', '.join(definitions)})"
+            else:
+                statement = f"ALTER TABLE {table_name} PARTITION BY LIST COLUMNS(institution_code) ({', '.join(definitions)})"
+            print(f"{table_name}: {statement}")
+            if args.dry_run:
+                continue
+            try:
+                cursor.execute(statement)
+            except mysql.connector.Error as err:
+                print(f"Partitioning {table_name} failed: {err.msg}")
+                print("Apply migration 0005 (python migrate.py upgrade) first if the error is about primary or unique keys.")
+                return 1
+        return 0
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply and inspect database migrations.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('status', help="List applied and pending migrations.")
+    subparsers.add_parser('upgrade', help="Apply pending migrations.")
+    check_parser = subparsers.add_parser('check', help="EXPLAIN the hot queries and flag full table scans.")
+    check_parser.add_argument('--institution', help="Institution code to use in the sample queries.")
+
+    partition_parser = subparsers.add_parser('partition', help="Partition the master tables by institution.")
+    partition_parser.add_argument('--dry-run', action='store_true', help="Print the ALTER statements without running them.")
+
+    args = parser.parse_args(argv)
+    commands = {'status': cmd_status, 'upgrade': cmd_upgrade, 'check': cmd_check, 'partition': cmd_partition}
+    return commands[args.command](args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,43 @@
+-- Secondary indexes for the dashboard filters, list endpoints and upload duplicate checks.
+-- The shipped schema only has primary keys and the unique key on student_reference_id.
+
+-- students_details_master: dashboard filters (institution, batch, gender, category)
+CREATE INDEX idx_sdm_inst_batch_gender_cat
+  ON students_details_master (institution_code, batch_year, gender, student_category);
+
+-- students_details_master: list endpoints ORDER BY student_name, with and without an institution filter
+CREATE INDEX idx_sdm_inst_name ON students_details_master (institution_code, student_name);
+CREATE INDEX idx_sdm_student_name ON students_details_master (student_name);
+
+-- students_details_master: process_upload duplicate check (institution_code, admission_no, is_active)
+CREATE INDEX idx_sdm_dup_admission ON students_details_master (institution_code, admission_no, is_active);
+
+-- students_details_master: data-version watermark
+CREATE INDEX idx_sdm_inst_updated_at ON students_details_master (institution_code, updated_at);
+CREATE INDEX idx_sdm_updated_at ON students_details_master (updated_at);
+
+-- student_fee_transactions: date-range dashboards; covers the KPI sums per institution
+CREATE INDEX idx_sft_inst_paid_date_cover
+  ON student_fee_transactions (institution_code, fees_paid_date, payment_status, payment_mode, amount_paid, total_amt);
+CREATE INDEX idx_sft_paid_date ON student_fee_transactions (fees_paid_date);
+
+-- student_fee_transactions: status / mode filters
+CREATE INDEX idx_sft_inst_status_mode ON student_fee_transactions (institution_code, payment_status, payment_mode);
+
+-- student_fee_transactions: due-date status buckets
+CREATE INDEX idx_sft_due_date_status ON student_fee_transactions (due_date, payment_status);
+
+-- student_fee_transactions: process_upload duplicate checks
+-- (VVA: registration_code; SDCCE/RMS: student_name). The registration index also serves the
+-- transaction list ORDER BY registration_code.
+CREATE INDEX idx_sft_dup_registration
+  ON student_fee_transactions (institution_code, registration_code, course_name, installment_no, fees_paid_date);
+CREATE INDEX idx_sft_dup_student
+  ON student_fee_transactions (institution_code, student_name, installment_no, fees_paid_date);
+
+-- student_fee_transactions: data-version watermark
+CREATE INDEX idx_sft_inst_updated_at ON student_fee_transactions (institution_code, updated_at);
+CREATE INDEX idx_sft_updated_at ON student_fee_transactions (updated_at);
+
+-- user_upload_details: data-version watermark per institution
+CREATE INDEX idx_uud_inst_upload ON user_upload_details (institution_code, upload_id);
@@ -0,0 +1,102 @@
+-- Normalized fee components: one row per non-zero fee component of a transaction, so component totals
+-- and per-transaction breakdowns are an indexed GROUP BY / lookup instead of a scan over 38 wide columns.
+-- The wide columns on student_fee_transactions stay the source of truth; process_upload, the data viewer
+-- and bulk updates rewrite a transaction's lines (fees_dashboard_utils.sync_fee_component_lines).
+
+CREATE TABLE fee_component_lines (
+  fees_trans_id int(11) NOT NULL,
+  component varchar(64) NOT NULL,
+  amount decimal(12,2) NOT NULL,
+  PRIMARY KEY (fees_trans_id, component),
+  KEY idx_fcl_component (component, fees_trans_id, amount),
+  CONSTRAINT fk_fcl_transaction FOREIGN KEY (fees_trans_id)
+    REFERENCES student_fee_transactions (fees_trans_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- Backfill from the existing transactions
+INSERT INTO fee_component_lines (fees_trans_id, component, amount)
+SELECT fees_trans_id, component, amount FROM (
+  SELECT ft.fees_trans_id, c.component,
+    CASE c.component
+      WHEN 'tuition_fees' THEN ft.tuition_fees
+      WHEN 'term_fees' THEN ft.term_fees
+      WHEN 'library_fees' THEN ft.library_fees
+      WHEN 'gymkhana_fees' THEN ft.gymkhana_fees
+      WHEN 'other_fees' THEN ft.other_fees
+      WHEN 'examination_fees' THEN ft.examination_fees
+      WHEN 'development_fees' THEN ft.development_fees
+      WHEN 'registration_fees' THEN ft.registration_fees
+      WHEN 'laboratory_fee' THEN ft.laboratory_fee
+      WHEN 'pupils_fund' THEN ft.pupils_fund
+      WHEN 'activity_fees' THEN ft.activity_fees
+      WHEN 'admission_fees' THEN ft.admission_fees
+      WHEN 'development_fund' THEN ft.development_fund
+      WHEN 'refundable_deposit' THEN ft.refundable_deposit
+      WHEN 'general_deposit' THEN ft.general_deposit
+      WHEN 'enrolment_fee' THEN ft.enrolment_fee
+      WHEN 'laboratory_deposit' THEN ft.laboratory_deposit
+      WHEN 'uni_registration_fees' THEN ft.uni_registration_fees
+      WHEN 'student_aid_fees' THEN ft.student_aid_fees
+      WHEN 'library_deposit' THEN ft.library_deposit
+      WHEN 'caution_money_deposit' THEN ft.caution_money_deposit
+      WHEN 'lab_fees' THEN ft.lab_fees
+      WHEN 'uni_administration_fees' THEN ft.uni_administration_fees
+      WHEN 'it_fees' THEN ft.it_fees
+      WHEN 'pta_fees' THEN ft.pta_fees
+      WHEN 'university_registration_fees' THEN ft.university_registration_fees
+      WHEN 'laboratory_fees' THEN ft.laboratory_fees
+      WHEN 'university_administration_fees' THEN ft.university_administration_fees
+      WHEN 'library_id_card_etc' THEN ft.library_id_card_etc
+      WHEN 'computer_lab_fees' THEN ft.computer_lab_fees
+      WHEN 'information_technology_fees' THEN ft.information_technology_fees
+      WHEN 'iaims_fees_dhe' THEN ft.iaims_fees_dhe
+      WHEN 'iams_fees' THEN ft.iams_fees
+      WHEN 'alumni_registration_fees' THEN ft.alumni_registration_fees
+      WHEN 'academic_restructuring_and_development_fees' THEN ft.academic_restructuring_and_development_fees
+      WHEN 'magazine_academic_diary_placement_brochure' THEN ft.magazine_academic_diary_placement_brochure
+      WHEN 'id_card_fees' THEN ft.id_card_fees
+      WHEN 'iaims_fees' THEN ft.iaims_fees
+    END AS amount
+  FROM student_fee_transactions ft
+  CROSS JOIN (
+      SELECT 'tuition_fees' AS component
+      UNION ALL SELECT 'term_fees'
+      UNION ALL SELECT 'library_fees'
+      UNION ALL SELECT 'gymkhana_fees'
+      UNION ALL SELECT 'other_fees'
+      UNION ALL SELECT 'examination_fees'
+      UNION ALL SELECT 'development_fees'
+      UNION ALL SELECT 'registration_fees'
+      UNION ALL SELECT 'laboratory_fee'
+      UNION ALL SELECT 'pupils_fund'
+      UNION ALL SELECT 'activity_fees'
+      UNION ALL SELECT 'admission_fees'
+      UNION ALL SELECT 'development_fund'
+      UNION ALL SELECT 'refundable_deposit'
+      UNION ALL SELECT 'general_deposit'
+      UNION ALL SELECT 'enrolment_fee'
+      UNION ALL SELECT 'laboratory_deposit'
+      UNION ALL SELECT 'uni_registration_fees'
+      UNION ALL SELECT 'student_aid_fees'
+      UNION ALL SELECT 'library_deposit'
+      UNION ALL SELECT 'caution_money_deposit'
+      UNION ALL SELECT 'lab_fees'
+      UNION ALL SELECT 'uni_administration_fees'
+      UNION ALL SELECT 'it_fees'
+      UNION ALL SELECT 'pta_fees'
+      UNION ALL SELECT 'university_registration_fees'
+      UNION ALL SELECT 'laboratory_fees'
+      UNION ALL SELECT 'university_administration_fees'
+      UNION ALL SELECT 'library_id_card_etc'
+      UNION ALL SELECT 'computer_lab_fees'
+      UNION ALL SELECT 'information_technology_fees'
+      UNION ALL SELECT 'iaims_fees_dhe'
+      UNION ALL SELECT 'iams_fees'
+      UNION ALL SELECT 'alumni_registration_fees'
+      UNION ALL SELECT 'academic_restructuring_and_development_fees'
+      UNION ALL SELECT 'magazine_academic_diary_placement_brochure'
+      UNION ALL SELECT 'id_card_fees'
+      UNION ALL SELECT 'iaims_fees'
+  ) c
+) component_lines
+WHERE amount IS NOT NULL AND amount <> 0;
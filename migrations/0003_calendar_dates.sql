@@ -0,0 +1,28 @@
+-- Calendar dimension: one row per day from 2015-01-01 to 2040-12-31, with the start of its week (Monday)
+-- and month. Trend series LEFT JOIN it so days, weeks and months without transactions come back as zero
+-- rows from the same query (fees_dashboard_utils.get_trend_series).
+
+CREATE TABLE calendar_dates (
+  cal_date date NOT NULL,
+  week_start date NOT NULL,
+  month_start date NOT NULL,
+  PRIMARY KEY (cal_date),
+  KEY idx_cal_week_start (week_start, cal_date),
+  KEY idx_cal_month_start (month_start, cal_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- 10,000 consecutive days from four cross-joined digit tables, cut off at the end of 2040
+INSERT INTO calendar_dates (cal_date, week_start, month_start)
+SELECT d, DATE_SUB(d, INTERVAL WEEKDAY(d) DAY), DATE_SUB(d, INTERVAL DAYOFMONTH(d) - 1 DAY)
+FROM (
+  SELECT DATE_ADD('2015-01-01', INTERVAL (ones.n + 10 * tens.n + 100 * hundreds.n + 1000 * thousands.n) DAY) AS d
+  FROM (SELECT 0 AS n UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4
+        UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7 UNION ALL SELECT 8 UNION ALL SELECT 9) ones
+  CROSS JOIN (SELECT 0 AS n UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4
+        UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7 UNION ALL SELECT 8 UNION ALL SELECT 9) tens
+  CROSS JOIN (SELECT 0 AS n UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4
+        UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7 UNION ALL SELECT 8 UNION ALL SELECT 9) hundreds
+  CROSS JOIN (SELECT 0 AS n UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4
+        UNION ALL SELECT 5 UNION ALL SELECT 6 UNION ALL SELECT 7 UNION ALL SELECT 8 UNION ALL SELECT 9) thousands
+) days
+WHERE d <= '2040-12-31';
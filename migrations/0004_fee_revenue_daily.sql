@@ -0,0 +1,27 @@
+-- Daily revenue rollup: one row per paid date and (institution, course, payment status, payment mode) with the
+-- number of transactions and the amount paid. The revenue series endpoint reads it instead of the transactions
+-- (fees_dashboard_utils.get_revenue_series); uploads and record edits refresh the affected dates
+-- (fees_dashboard_utils.refresh_fee_revenue_daily). The date column keeps the source column's name so the fees
+-- WHERE clause applies to both tables unchanged.
+
+CREATE TABLE fee_revenue_daily (
+  id int NOT NULL AUTO_INCREMENT,
+  fees_paid_date date NOT NULL,
+  institution_code varchar(50) NOT NULL,
+  course_name varchar(255) DEFAULT NULL,
+  payment_status varchar(15) DEFAULT NULL,
+  payment_mode varchar(100) DEFAULT NULL,
+  transaction_count int NOT NULL,
+  amount_paid decimal(14,2) NOT NULL,
+  PRIMARY KEY (id),
+  KEY idx_frd_date (fees_paid_date),
+  KEY idx_frd_institution_date (institution_code, fees_paid_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+INSERT INTO fee_revenue_daily
+  (fees_paid_date, institution_code, course_name, payment_status, payment_mode, transaction_count, amount_paid)
+SELECT fees_paid_date, institution_code, course_name, payment_status, payment_mode,
+       COUNT(*), COALESCE(SUM(amount_paid), 0)
+FROM student_fee_transactions
+WHERE fees_paid_date IS NOT NULL
+GROUP BY fees_paid_date, institution_code, course_name, payment_status, payment_mode;
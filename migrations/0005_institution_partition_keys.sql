@@ -0,0 +1,18 @@
+-- Prepares the master tables for LIST COLUMNS partitioning on institution_code, which
+-- `python migrate.py partition` applies from the institutions table. MySQL requires the partitioning column in
+-- every primary and unique key, and partitioned InnoDB tables cannot take part in foreign keys.
+
+-- The app never deletes transactions and rewrites a transaction's lines with it (sync_fee_component_lines),
+-- so the cascade is not needed; the primary key (fees_trans_id, component) still indexes the lookups.
+ALTER TABLE fee_component_lines DROP FOREIGN KEY fk_fcl_transaction;
+
+-- student_reference_id (gen_reg_no or admission_no) becomes unique per institution
+ALTER TABLE students_details_master
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (master_id, institution_code),
+  DROP INDEX student_reference_id,
+  ADD UNIQUE KEY student_reference_id (student_reference_id, institution_code);
+
+ALTER TABLE student_fee_transactions
+  DROP PRIMARY KEY,
+  ADD PRIMARY KEY (fees_trans_id, institution_code);
@@ -0,0 +1,8 @@
+-- Age groups are date_of_birth ranges (dashboard_utils.AGE_GROUPS), so the age drill-down and the age
+-- distribution read these indexes instead of computing TIMESTAMPDIFF on every row of the table.
+
+-- One institution: range scan of its birth dates; also covers the age distribution count
+CREATE INDEX idx_sdm_inst_dob ON students_details_master (institution_code, date_of_birth);
+
+-- All institutions
+CREATE INDEX idx_sdm_dob ON students_details_master (date_of_birth);
@@ -0,0 +1,14 @@
+-- Student list popup: WHERE institution_code [AND batch_year] ORDER BY student_name, master_id LIMIT n.
+-- The indexes are in that order and hold every popup column (dashboard_utils.STUDENT_POPUP_FIELDS), so a page
+-- is read in order from the index alone, without a filesort or table lookups. Keyset pages
+-- (student_name >= ? ...) start with a range seek on the same index.
+
+CREATE INDEX idx_sdm_inst_batch_name_cover ON students_details_master
+  (institution_code, batch_year, student_name, master_id,
+   student_reference_id, student_category, admission_date, gender, mobile_number);
+
+-- Replaces idx_sdm_inst_name (institution_code, student_name) for lists over all batches
+DROP INDEX idx_sdm_inst_name ON students_details_master;
+CREATE INDEX idx_sdm_inst_name_cover ON students_details_master
+  (institution_code, student_name, master_id,
+   student_reference_id, student_category, admission_date, gender, mobile_number);
@@ -0,0 +1,4 @@
+-- Student profiles link transactions by (institution_code, fees_table_ref_id) as well as by
+-- (institution_code, registration_code), which idx_sft_dup_registration already covers
+-- (student_details_utils._fetch_profiles).
+CREATE INDEX idx_sft_inst_fees_ref ON student_fee_transactions (institution_code, fees_table_ref_id);
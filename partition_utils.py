@@ -0,0 +1,62 @@
+"""
+This module reads how the master tables are partitioned by institution (see `python migrate.py partition`).
+Queries filtered to one institution are pruned to its partition by MySQL; views over all institutions use
+the partition list to run one query per institution concurrently and merge the results.
+"""
+import re
+import threading
+import time
+
+from db_utils import get_db_connection
+
+# How long the partition layout is trusted before information_schema is read again (seconds).
+PARTITION_INFO_TTL = 300
+
+_partition_cache = {}
+_partition_lock = threading.Lock()
+_PARTITION_VALUE_PATTERN = re.compile(r"'((?:[^']|'')*)'")
+
+
+def read_institution_partitions(cursor, table_name):
+    """
+    Returns {partition name: [institution codes]} for a table LIST COLUMNS-partitioned on institution_code,
+    in partition order, or {} when the table is not partitioned that way. Takes a tuple cursor.
+    """
+    cursor.execute("""
+        SELECT PARTITION_NAME, PARTITION_DESCRIPTION, PARTITION_ORDINAL_POSITION
+        FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+          AND PARTITION_METHOD = 'LIST COLUMNS' AND PARTITION_EXPRESSION LIKE %s
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """, (table_name, '%institution_code%'))
+    return {
+        name: [value.replace("''", "'") for value in _PARTITION_VALUE_PATTERN.findall(description or '')]
+        for name, description, _ in cursor.fetchall()
+    }
+
+
+def institution_partitions(table_name):
+    """
+    Institution codes of table_name's partitions, or [] when it is not partitioned by institution.
+    Cached in-process for PARTITION_INFO_TTL seconds.
+    """
+    now = time.monotonic()
+    with _partition_lock:
+        cached = _partition_cache.get(table_name)
+        if cached and cached[1] > now:
+            return cached[0]
+
+    db_conn = None
+    cursor = None
+    try:
+        db_conn = get_db_connection()
+        cursor = db_conn.cursor()
+        partitions = read_institution_partitions(cursor, table_name)
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+    codes = [code for values in partitions.values() for code in values]
+    with _partition_lock:
+        _partition_cache[table_name] = (codes, now + PARTITION_INFO_TTL)
+    return codes
@@ -0,0 +1,108 @@
+"""
+This module contains response middleware for the API: gzip/brotli compression of large responses and
+ETag-based conditional GETs for read-only endpoints. ETags are derived from the data-version token in
+data_version_utils, so an unchanged dashboard can be answered with 304 Not Modified before any of its
+queries run.
+"""
+import gzip
+import hashlib
+import os
+from datetime import date
+from functools import wraps
+
+from flask import make_response, request
+
+import auth_utils
+import data_version_utils
+
+# brotli is optional; without it responses are only gzip-compressed.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this (bytes) are sent uncompressed.
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_LEVEL = int(os.environ.get('COMPRESSION_LEVEL', 6))
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/csv', 'text/plain', 'text/html'}
+
+
+def _choose_encoding():
+    """Picks the best encoding the client accepts."""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response):
+    """after_request hook that compresses JSON and text responses above COMPRESSION_MIN_SIZE."""
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if response.content_length is None or response.content_length < COMPRESSION_MIN_SIZE:
+        return response
+
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    data = response.get_data()
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=min(COMPRESSION_LEVEL, 11))
+    else:
+        compressed = gzip.compress(data, compresslevel=COMPRESSION_LEVEL)
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def _compute_etag():
+    """
+    Builds the ETag for the current request from the data version, the date and the full query.
+    Returns (etag, data version).
+    """
+    # Without institution_code in the query the views scope the data to the user's institution (auth_utils)
+    institution_code = request.args.get('institution_code') or auth_utils.default_institution_code()
+    version = data_version_utils.get_data_version(institution_code)
+    # Several queries compare against CURDATE(), so the payload can also change at midnight.
+    key = '|'.join([version, date.today().isoformat(), institution_code or '', request.path,
+                    '&'.join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32], version
+
+
+def etag_by_data_version(f):
+    """
+    Decorator for read-only GET endpoints whose response depends only on the request's query string
+    and the master tables. Answers If-None-Match with 304 without calling the view.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        try:
+            etag, version = _compute_etag()
+        except Exception as e:
+            print(f"ETag computation failed, serving without it: {e}")
+            return f(*args, **kwargs)
+
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+        else:
+            response = make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        # Weak ETag: the same data may be sent with different content encodings.
+        response.set_etag(etag, weak=True)
+        # The version the data was read at, for ?since= delta queries and client caches (data_version_routes).
+        response.headers['X-Data-Version'] = version
+        # Browsers must revalidate every time, which is cheap when the data is unchanged.
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return decorated
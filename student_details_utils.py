@@ -0,0 +1,176 @@
+"""
+This module serves student profiles (details plus linked fee transactions) for the student popups.
+A batch of identifiers is answered with two indexed queries, and recently viewed profiles are kept in a
+short-lived in-process cache so clicking through a popup list does not hit the database every time.
+Lookups are scoped to one institution, because identifiers are only unique per institution.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from flask import has_app_context
+
+import auth_utils
+import data_version_utils
+from db_utils import get_db_connection
+
+# Identifier columns a profile can be looked up by; both are indexed together with institution_code
+# (primary key / unique key), which is what makes them unique.
+STUDENT_IDENTIFIER_TYPES = ('master_id', 'student_reference_id')
+STUDENT_DETAILS_BATCH_LIMIT = 200
+
+# Cached profiles are dropped after this many seconds or as soon as the data version changes.
+STUDENT_PROFILE_TTL = 60
+STUDENT_PROFILE_CACHE_SIZE = 512
+
+STUDENT_DETAIL_COLUMNS = """
+    master_id, student_reference_id, student_name, institution_code, admission_no, class, section, stream, batch_year,
+    admission_scheme, student_category, admission_date, gender, mobile_number, fathers_name, fathers_occupation,
+    mothers_name, pr_no, roll_number, email_address, religion, date_of_birth, blood_group, pin_code,
+    xii_marks_obtained, xii_sub_combination, full_address, city, state, alt_mobile_number, fathers_mobile_number,
+    mothers_mobile_number, pwd_category_and_Percentage, xii_passing_class, mothers_occupation, nationality,
+    mother_tongue, board_name, xii_stream, passing_year, name_of_the_institution_attended_earlier
+"""
+
+# amt_paid / tot_amt are the names the student detail view renders
+STUDENT_FEE_COLUMNS = """
+    fees_trans_id, institution_code, registration_code, fees_table_ref_id, course_name, installment_no,
+    payment_status, payment_mode, amount_paid as amt_paid, total_amt as tot_amt, remaining_amount,
+    fees_paid_date, due_date, transaction_id
+"""
+
+_profile_cache = OrderedDict()
+_profile_lock = threading.Lock()
+
+
+def _match_key(value):
+    # Compares like the utf8mb4_general_ci columns: case-insensitively, ignoring trailing spaces
+    return str(value).rstrip(' ').casefold()
+
+
+def _cached_profile(key, version, now):
+    with _profile_lock:
+        cached = _profile_cache.get(key)
+        if cached is None:
+            return None
+        profile, cached_version, expires_at = cached
+        if cached_version != version or expires_at <= now:
+            del _profile_cache[key]
+            return None
+        _profile_cache.move_to_end(key)
+        return profile
+
+
+def _cache_profile(key, profile, version, now):
+    with _profile_lock:
+        _profile_cache[key] = (profile, version, now + STUDENT_PROFILE_TTL)
+        while len(_profile_cache) > STUDENT_PROFILE_CACHE_SIZE:
+            _profile_cache.popitem(last=False)
+
+
+def _fetch_profiles(identifiers, identifier_type, institution_code=None):
+    """
+    Returns {match key of the identifier: [{'details', 'fees'}, ...]} for the students found, from two queries.
+    Without institution_code an identifier can match one student per institution.
+    """
+    db_conn = None
+    cursor = None
+    try:
+        db_conn = get_db_connection()
+        cursor = db_conn.cursor(dictionary=True)
+
+        institution_clause = ""
+        params = list(identifiers)
+        if institution_code:
+            institution_clause = "AND institution_code = %s"
+            params.append(institution_code)
+        cursor.execute(f"""
+            SELECT {STUDENT_DETAIL_COLUMNS}
+            FROM students_details_master
+            WHERE {identifier_type} IN ({', '.join(['%s'] * len(identifiers))}) {institution_clause}
+        """, params)
+        students = cursor.fetchall()
+        if not students:
+            return {}
+
+        # A student's transactions carry its reference id as the registration code (VVA) or the fees table
+        # reference, within the same institution. One lookup per column keeps each side on its index.
+        keys = [(student['institution_code'], student['student_reference_id'])
+                for student in students if student['student_reference_id']]
+        fees_by_student = {}
+        if keys:
+            pairs = ', '.join(['(%s, %s)'] * len(keys))
+            key_params = [value for key in keys for value in key]
+            cursor.execute(f"""
+                SELECT {STUDENT_FEE_COLUMNS} FROM student_fee_transactions
+                WHERE (institution_code, registration_code) IN ({pairs})
+                UNION
+                SELECT {STUDENT_FEE_COLUMNS} FROM student_fee_transactions
+                WHERE (institution_code, fees_table_ref_id) IN ({pairs})
+                ORDER BY fees_paid_date DESC, fees_trans_id DESC
+            """, key_params + key_params)
+            reference_ids = {(_match_key(institution), _match_key(reference)) for institution, reference in keys}
+            for fee in cursor.fetchall():
+                institution = _match_key(fee['institution_code'])
+                # Both columns can link the same transaction; the UNION already dropped duplicates
+                for reference in (fee['registration_code'], fee['fees_table_ref_id']):
+                    if reference and (institution, _match_key(reference)) in reference_ids:
+                        fees_by_student.setdefault((institution, _match_key(reference)), []).append(fee)
+                        break
+
+        profiles = {}
+        for student in students:
+            reference = student['student_reference_id']
+            fees = fees_by_student.get((_match_key(student['institution_code']), _match_key(reference)), []) if reference else []
+            profiles.setdefault(_match_key(student[identifier_type]), []).append({'details': student, 'fees': fees})
+        return profiles
+    finally:
+        if cursor: cursor.close()
+        if db_conn and db_conn.is_connected(): db_conn.close()
+
+
+def get_student_profiles(identifiers, identifier_type='student_reference_id', institution_code=None):
+    """
+    Returns {identifier: {'details': {...}, 'fees': [...]}} for the given identifiers; identifiers that match
+    no student are left out. institution_code defaults to the logged-in user's; 'all' searches every
+    institution. Raises ValueError for an unknown identifier_type, too many identifiers, or an identifier
+    that matches students in more than one institution.
+    """
+    if institution_code is None and has_app_context():
+        institution_code = auth_utils.default_institution_code()
+    if institution_code == 'all':
+        institution_code = None
+    if identifier_type not in STUDENT_IDENTIFIER_TYPES:
+        raise ValueError(f"identifier_type must be one of: {', '.join(STUDENT_IDENTIFIER_TYPES)}.")
+    identifiers = list(dict.fromkeys(str(identifier) for identifier in identifiers if str(identifier).strip()))
+    if len(identifiers) > STUDENT_DETAILS_BATCH_LIMIT:
+        raise ValueError(f"At most {STUDENT_DETAILS_BATCH_LIMIT} identifiers can be requested at once.")
+
+    version = data_version_utils.get_data_version()
+    now = time.monotonic()
+    profiles = {}
+    missing = []
+    for identifier in identifiers:
+        profile = _cached_profile((institution_code, identifier_type, identifier), version, now)
+        if profile is None:
+            missing.append(identifier)
+        else:
+            profiles[identifier] = profile
+
+    if missing:
+        fetched = _fetch_profiles(missing, identifier_type, institution_code)
+        ambiguous = [identifier for identifier in missing if len(fetched.get(_match_key(identifier), ())) > 1]
+        if ambiguous:
+            raise ValueError(f"{identifier_type} {', '.join(ambiguous)} matches students in several institutions; "
+                             "pass institution_code.")
+        for identifier in missing:
+            matches = fetched.get(_match_key(identifier))
+            if matches:
+                profiles[identifier] = matches[0]
+                _cache_profile((institution_code, identifier_type, identifier), matches[0], version, now)
+    return profiles
+
+
+def get_student_profile(identifier, identifier_type='student_reference_id', institution_code=None):
+    """Profile of one student, or None when no student matches. See get_student_profiles."""
+    return get_student_profiles([identifier], identifier_type, institution_code).get(str(identifier))
@@ -0,0 +1,131 @@
+"""
+This module contains the request tracing middleware. Every request gets a request id (taken from an incoming
+X-Request-ID header or generated), a latency histogram observation per endpoint and status code, and a span
+tree that records where the time went: JWT decode, DB connect, each query, JSON serialization and the final
+response size. When TRACE_LOG is set, each finished trace is appended to that file as one JSON line.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+import metrics_utils
+
+TRACE_LOG = os.environ.get('TRACE_LOG')
+
+REQUEST_DURATION = metrics_utils.histogram(
+    'http_request_duration_seconds', "Request latency per endpoint and status code.", ('endpoint', 'method', 'status'))
+RESPONSE_SIZE = metrics_utils.counter(
+    'http_response_bytes_total', "Response body bytes sent, per endpoint.", ('endpoint',))
+
+_trace_log_lock = threading.Lock()
+
+
+def _now_ms():
+    return time.perf_counter() * 1000
+
+
+class Span:
+    def __init__(self, name, start_ms, attributes=None):
+        self.name = name
+        self.start_ms = start_ms
+        self.duration_ms = None
+        self.attributes = attributes or {}
+        self.children = []
+
+    def to_dict(self, origin_ms):
+        return {
+            'name': self.name,
+            'start_ms': round(self.start_ms - origin_ms, 3),
+            'duration_ms': round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            'attributes': self.attributes,
+            'children': [child.to_dict(origin_ms) for child in self.children],
+        }
+
+
+def _current_span():
+    if not has_request_context() or 'span_stack' not in g:
+        return None
+    return g.span_stack[-1]
+
+
+@contextmanager
+def span(name, **attributes):
+    """Times a block as a child of the current span. Does nothing outside a traced request."""
+    parent = _current_span()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, _now_ms(), attributes)
+    parent.children.append(child)
+    g.span_stack.append(child)
+    try:
+        yield child
+    finally:
+        child.duration_ms = _now_ms() - child.start_ms
+        g.span_stack.pop()
+
+
+def add_span(name, duration_seconds, **attributes):
+    """Adds an already-finished span (e.g. a query timed by the instrumented cursor) under the current span."""
+    parent = _current_span()
+    if parent is None:
+        return
+    duration_ms = duration_seconds * 1000
+    child = Span(name, _now_ms() - duration_ms, attributes)
+    child.duration_ms = duration_ms
+    parent.children.append(child)
+
+
+# --- Flask hooks ---
+def start_trace():
+    """before_request hook."""
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+    root = Span('request', _now_ms(), {'method': request.method, 'path': request.path})
+    g.trace_root = root
+    g.span_stack = [root]
+
+
+def finish_trace(response):
+    """after_request hook. Register it before any other after_request hook so it runs last."""
+    root = g.get('trace_root')
+    if root is None:
+        return response
+
+    root.duration_ms = _now_ms() - root.start_ms
+    endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+    size = None if response.is_streamed else response.content_length
+    root.attributes.update({'endpoint': endpoint, 'status': response.status_code, 'response_bytes': size})
+
+    REQUEST_DURATION.observe((endpoint, request.method, response.status_code), root.duration_ms / 1000)
+    if size:
+        RESPONSE_SIZE.inc((endpoint,), size)
+
+    response.headers['X-Request-ID'] = g.request_id
+    if TRACE_LOG:
+        _write_trace(root)
+    return response
+
+
+def _write_trace(root):
+    record = {
+        'ts': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'request_id': g.request_id,
+        'trace': root.to_dict(root.start_ms),
+    }
+    try:
+        line = json.dumps(record, default=str)
+        with _trace_log_lock:
+            with open(TRACE_LOG, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+    except OSError as e:
+        print(f"Could not write trace log: {e}")
+
+
+def init_app(app):
+    app.before_request(start_trace)
+    app.after_request(finish_trace)
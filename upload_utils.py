@@ -0,0 +1,167 @@
+"""
+This module contains the file reading and column mapping helpers used by the upload routes.
+"""
+import os
+from collections import Counter
+
+import pandas as pd
+
+
+def sanitize_column_name(column_name):
+    """
+    Converts column names to lowercase and replaces spaces with underscores.
+    Removes dots, apostrophes, and parentheses.
+    """
+    sanitized = str(column_name).lower()
+    sanitized = sanitized.replace(' ', '_')
+    sanitized = sanitized.replace('-', '_')
+    sanitized = sanitized.replace('.', '')
+    sanitized = sanitized.replace("'", '')
+    sanitized = sanitized.replace("(", '')
+    sanitized = sanitized.replace(")", '')
+    sanitized = sanitized.replace("-", '')
+    sanitized = sanitized.replace("?", '')
+    return sanitized
+
+
+def resolve_empty_duplicates(df):
+    """
+    Pre-processes a DataFrame to resolve a specific duplicate column scenario.
+    
+    If a column name appears multiple times, and exactly ONE of those columns
+    contains data while the others are completely empty (all NaN), this function
+    will silently drop the empty duplicate(s).
+    
+    In all other cases (no duplicates, or multiple duplicates with data),
+    it does nothing, allowing the downstream logic to handle it.
+    
+    Args:
+        df (pd.DataFrame): The input DataFrame.
+    
+    Returns:
+        pd.DataFrame: The processed DataFrame with empty duplicates removed.
+    """
+    # Find column names that appear more than once
+    col_counts = Counter(df.columns)
+    duplicate_names = {name for name, count in col_counts.items() if count > 1}
+    
+    if not duplicate_names:
+        # No duplicates found, return the DataFrame as is.
+        return df
+
+    cols_to_drop_indices = []
+    
+    for name in duplicate_names:
+        # Get the integer indices of all columns with this duplicate name
+        all_indices = [i for i, col_name in enumerate(df.columns) if col_name == name]
+        
+        non_empty_indices = []
+        empty_indices = []
+        
+        for i in all_indices:
+            # Check if the column at this specific index is entirely empty
+            if df.iloc[:, i].isnull().all():
+                empty_indices.append(i)
+            else:
+                non_empty_indices.append(i)
+        
+        # This is the key condition: if there is EXACTLY one column with data
+        # among the duplicates, we mark the empty ones for removal.
+        if len(non_empty_indices) == 1:
+            print(f"Resolving duplicates for '{name}': Found one column with data. Dropping {len(empty_indices)} empty column(s).")
+            cols_to_drop_indices.extend(empty_indices)
+            
+    if cols_to_drop_indices:
+        # Drop the identified empty columns by their integer index
+        df = df.drop(df.columns[cols_to_drop_indices], axis=1)
+        
+    return df
+
+
+def read_file(file, file_name, column_map):
+    """
+    Reads an Excel or CSV file, identifies the header row based on a fixed number of key headers,
+    and returns the DataFrame.
+    """
+    file_extension = os.path.splitext(file_name)[1].lower()
+
+    if file_extension in ['.xlsx', '.xls']:
+        read_func = pd.read_excel
+    elif file_extension == '.csv':
+        read_func = pd.read_csv
+    else:
+        raise ValueError("Unsupported file type. Please upload an Excel (.xlsx, .xls) or CSV (.csv) file.")
+    
+    try:
+        # Read the first 20 rows to be sure we don't miss the header
+        df_test = read_func(file, header=None, nrows=20)
+        file.seek(0)
+    except Exception as e:
+        raise Exception(f"Error reading initial rows for header detection: {e}")
+
+    MIN_REQUIRED_MATCHES = 5
+    expected_sanitized_headers = {sanitize_column_name(k) for k in column_map.keys()}
+    
+    header_row_index = None
+    for i in range(df_test.shape[0]):
+        # If the first 10 columns are all empty, skip this row as it's likely a blank line.
+        if df_test.iloc[i, :10].isna().all():
+            print(f"Skipping row {i} because the first 10 columns are empty.")
+            continue
+        
+        row_values = df_test.iloc[i].dropna().apply(str).apply(sanitize_column_name).tolist()
+        matches = len(set(row_values) & expected_sanitized_headers)
+        
+        if matches >= MIN_REQUIRED_MATCHES:
+            header_row_index = i
+            break
+    
+    if header_row_index is None:
+        raise ValueError('Could not find a suitable header row. The file does not contain enough matching columns to be processed.')
+
+    df = read_func(file, header=header_row_index)
+    return df, header_row_index
+
+
+def process_and_validate_columns(df, column_map):
+    """
+    Processes and validates columns, correctly handling multiple source columns
+    (including duplicate column names and names with extra spaces) mapping to a
+    single destination column in a case-insensitive manner.
+    """
+    # --- Step 1: Standardize the DataFrame's column names ---
+    # Convert to lowercase AND strip any leading/trailing whitespace
+    df.columns = df.columns.str.lower().str.strip()
+    
+    # --- Step 2: Create a reverse map from destination DB col to a LIST of lowercase source cols ---
+    db_to_source_map = {}
+    for source_col, db_col in column_map.items():
+        # Sanitize the mapping key just like the column names
+        source_col_sanitized = source_col.lower().strip()
+        if db_col not in db_to_source_map:
+            db_to_source_map[db_col] = []
+        db_to_source_map[db_col].append(source_col_sanitized)
+
+    final_df = pd.DataFrame()
+    
+    # Get a unique, ordered list of expected database columns
+    expected_db_cols = list(dict.fromkeys(column_map.values()))
+
+    # --- Step 3: Iterate through each unique destination column ---
+    for db_col in expected_db_cols:
+        possible_source_cols = db_to_source_map.get(db_col, [])
+        source_cols_in_df = [col for col in possible_source_cols if col in df.columns]
+        
+        if not source_cols_in_df:
+            final_df[db_col] = pd.NA
+            continue
+
+        # --- Step 4: SIMPLIFIED AND HARDENED MERGE LOGIC ---
+        # This logic handles all cases: single columns, multiple different columns,
+        # and multiple columns with the SAME duplicate name.
+        sub_df = df[source_cols_in_df]
+        merged_series = sub_df.bfill(axis=1).iloc[:, 0]
+        final_df[db_col] = merged_series
+
+    # Ensure the final DataFrame has all expected columns in the correct order
+    return final_df.reindex(columns=expected_db_cols)